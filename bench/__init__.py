@@ -0,0 +1 @@
+"""페이지 성능 측정 도구 (AppTest 로 화면 없이 실행)."""
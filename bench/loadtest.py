@@ -0,0 +1,154 @@
+# 동시 접속 부하 시험: 세션 N 개가 동시에 페이지를 조작할 때 처리량 / 지연 분위수 / 메모리 증가
+#
+#   python -m bench.loadtest                              # 배율 1, 세션 1,2,4,8,16
+#   python -m bench.loadtest --scale 10 --sessions 1,4,16,32 --reruns 20 --pages 04,07
+#
+# 앱 서버 한 대처럼 한 프로세스 안에서 AppTest 세션을 스레드마다 하나씩 돌립니다
+# (Streamlit 서버도 세션마다 스크립트 스레드를 돌리고 캐시/공유 데이터셋은 프로세스가 같이 씀).
+# 세션은 bench.pages 의 페이지별 조작(SCENARIOS: 날짜/노선 바꾸기, 상품 바꾸기, 탭별 선택 바꾸기)을
+# 돌아가며 반복하고, rerun 마다 걸린 시간을 잽니다.
+# 배율마다 새 프로세스에서 돌리므로 첫 줄(warmup)에는 import 와 데이터셋 생성이 들어 있습니다.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from bench.pages import SCENARIOS, TIMEOUT
+from bench.synth import make_dataset
+from core.paths import ROOT
+from core.registry import process_rss
+
+DEFAULT_PAGES = "03,04,07"
+
+
+def _pages(spec):
+    wanted = [p for p in spec.split(",") if p]
+    return [p for p in SCENARIOS if SCENARIOS[p] and any(w in p for w in wanted)]
+
+
+def run_session(page, reruns, latencies, errors, start_barrier):
+    """세션 하나: 첫 실행 후 페이지 조작을 돌아가며 reruns 번 rerun."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=TIMEOUT)
+    start_barrier.wait()
+    steps = SCENARIOS[page]
+    try:
+        t = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - t)
+        for i in range(reruns):
+            _, act = steps[i % len(steps)]
+            t = time.perf_counter()
+            act(at)
+            at.run()
+            latencies.append(time.perf_counter() - t)
+            if at.exception:
+                errors.append(f"{page}: {at.exception[0].value}")
+                return
+    except Exception as e:
+        errors.append(f"{page}: {type(e).__name__}: {e}")
+
+
+def run_level(pages, sessions, reruns):
+    """세션 sessions 개를 동시에 돌리고 결과 한 줄을 돌려줍니다."""
+    latencies, errors = [], []
+    barrier = threading.Barrier(sessions + 1)
+    threads = [
+        threading.Thread(target=run_session, args=(pages[i % len(pages)], reruns, latencies, errors, barrier))
+        for i in range(sessions)
+    ]
+    rss_before = process_rss()
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    rss_after = process_rss()
+
+    lat = np.array(latencies) * 1000 if latencies else np.array([np.nan])
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        "seconds": round(wall, 3),
+        "throughput": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(float(np.percentile(lat, 50)), 1),
+        "p95_ms": round(float(np.percentile(lat, 95)), 1),
+        "p99_ms": round(float(np.percentile(lat, 99)), 1),
+        "max_ms": round(float(lat.max()), 1),
+        "rss_mb": round(rss_after / 2**20, 1) if rss_after else None,
+        "rss_growth_mb": round((rss_after - rss_before) / 2**20, 1) if rss_after and rss_before else None,
+        "errors": errors[:3],
+    }
+
+
+def worker(pages, levels, reruns):
+    """현재 프로세스(= 앱 서버 한 대)에서 워밍업 후 세션 수를 늘려 가며 잽니다."""
+    results = [dict(run_level(pages, len(pages), 1), sessions="warmup")]
+    for n in levels:
+        results.append(run_level(pages, n, reruns))
+    return results
+
+
+def print_table(scale, results, limit_ms):
+    print(f"{'scale':>5} {'sessions':>8} {'reruns':>6} {'rerun/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'RSS MB':>8} {'+RSS MB':>8}")
+    limit = None
+    for r in results:
+        print(f"{scale:>5} {r['sessions']:>8} {r['reruns']:>6} {r['throughput']:>8.2f} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['rss_mb'] or float('nan'):>8.1f} "
+              f"{r['rss_growth_mb'] if r['rss_growth_mb'] is not None else float('nan'):>8.1f}"
+              + (f"  ERROR {r['errors'][0]}" if r["errors"] else ""))
+        if r["sessions"] != "warmup" and limit is None and (r["p99_ms"] > limit_ms or r["errors"]):
+            limit = r["sessions"]
+    if limit is None:
+        print(f"p99 <= {limit_ms:.0f} ms 를 모든 단계에서 지켰습니다.")
+    else:
+        print(f"동시 세션 {limit} 개에서 p99 가 {limit_ms:.0f} ms 를 넘거나 오류가 났습니다.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="동시 세션 부하 시험 (처리량 / 지연 분위수 / 메모리)")
+    parser.add_argument("--scale", type=int, default=1, help="데이터 배율 (bench.synth)")
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="동시 세션 수 단계 (쉼표 구분)")
+    parser.add_argument("--reruns", type=int, default=10, help="세션마다 조작(rerun) 횟수")
+    parser.add_argument("--pages", default=DEFAULT_PAGES, help="페이지 이름 일부 (쉼표 구분)")
+    parser.add_argument("--p99-limit-ms", type=float, default=1000.0, help="허용할 p99 지연")
+    parser.add_argument("--json", help="결과를 저장할 파일")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    pages = _pages(args.pages)
+    levels = [int(n) for n in args.sessions.split(",")]
+    if args.worker:
+        print(json.dumps(worker(pages, levels, args.reruns), ensure_ascii=False))
+        return 0
+
+    data_dir = make_dataset(args.scale)
+    cmd = [sys.executable, "-m", "bench.loadtest", "--worker", "--pages", ",".join(pages),
+           "--sessions", args.sessions, "--reruns", str(args.reruns)]
+    proc = subprocess.run(
+        cmd, cwd=ROOT, env={**os.environ, "APP_DATA_DIR": data_dir, "APP_PROFILE_LOG": "0"},
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "worker failed")
+        return 1
+    results = json.loads(proc.stdout.strip().splitlines()[-1])
+    print(f"pages: {', '.join(pages)}")
+    print_table(args.scale, results, args.p99_limit_ms)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"scale": args.scale, "pages": pages, "results": results}, f, ensure_ascii=False, indent=1)
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
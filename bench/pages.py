@@ -0,0 +1,282 @@
+# 페이지별 벤치마크: 콜드 로드 / 웜 rerun / 위젯 조작마다 시간과 최대 메모리를 재고 기준값과 비교
+#
+#   python -m bench.pages                        # 배율 1, 10 으로 전체 페이지
+#   python -m bench.pages --scales 1,10,100 --pages 04,07
+#   python -m bench.pages --update-baselines     # 지금 결과를 이 컴퓨터의 기준값으로 저장
+#   python -m bench.pages --baselines other.json # 다른 기준값 파일과 비교
+#
+# (페이지, 배율) 마다 새 프로세스에서 AppTest 로 실행하므로 콜드 로드에는 import 와 캐시 미스가 포함됩니다.
+# cold 는 디스크 캐시(core/disk_cache.py)를 비운 상태, restart 는 디스크 캐시가 채워진 상태에서
+# 새 프로세스로 첫 실행만 잰 값입니다 (배포/재시작 직후 첫 요청).
+# first_visit 은 새 프로세스에서 main.py 를 먼저 열어 백그라운드 워밍업(core/warmup.py)이 끝난 뒤
+# 페이지를 처음 연 시간입니다 (배포 후 첫 방문자가 다른 페이지로 넘어갈 때). 나머지 단계는 워밍업을 끕니다.
+# tracemalloc 을 켜면 실행이 몇 배 느려지므로, 시간은 tracemalloc 없이 한 번,
+# 메모리(단계별 최대 할당량)는 tracemalloc 을 켜고 한 번 더 따로 잽니다.
+# 기준값보다 TIME_TOLERANCE / MEM_TOLERANCE 배 이상 나빠진 단계가 있으면 종료 코드 1.
+# 기준값은 잰 컴퓨터에서만 의미가 있으므로 git 에 넣지 않고 data/bench/baselines.json 에 둡니다
+# (처음 돌리면 모든 단계가 new 로 나오니 --update-baselines 로 한 번 저장하세요).
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from bench.synth import make_dataset
+from core.paths import ROOT
+
+BASELINES = os.path.join(ROOT, "data", "bench", "baselines.json")
+TIMEOUT = 600
+
+TIME_TOLERANCE = 1.5
+TIME_SLACK = 0.05      # 초. 아주 짧은 단계는 잡음이 커서 여유를 둠
+MEM_TOLERANCE = 1.25
+MEM_SLACK = 1.0        # MB
+
+
+def _by_label(widgets, label):
+    for w in widgets:
+        if w.label == label:
+            return w
+    raise LookupError(f"위젯을 찾을 수 없습니다: {label}")
+
+
+def select_next(label):
+    def act(at):
+        box = _by_label(at.selectbox, label)
+        box.select_index((box.index + 1) % len(box.options))
+    return act
+
+
+def narrow_range(label):
+    def act(at):
+        slider = _by_label(at.slider, label)
+        lo, hi = slider.value
+        slider.set_value((lo, lo + (hi - lo) // 2))
+    return act
+
+
+def set_slider(label, value):
+    return lambda at: _by_label(at.slider, label).set_value(value)
+
+
+def choose(label, option):
+    return lambda at: _by_label(at.radio, label).set_value(option)
+
+
+def pick_many(label, options):
+    return lambda at: _by_label(at.multiselect, label).set_value(options)
+
+
+def type_text(label, text):
+    return lambda at: _by_label(at.text_input, label).input(text)
+
+
+def click(label):
+    return lambda at: _by_label(at.button, label).click()
+
+
+# 페이지별 조작 순서 (단계 이름, 조작)
+SCENARIOS = {
+    "main.py": [
+        ("이름 입력", type_text("이름을 입력하세요:", "홍길동")),
+        ("인사말생성", click("인사말생성")),
+    ],
+    "pages/00MBTI진로.py": [
+        ("MBTI 선택", select_next("너의 MBTI를 골라줘 (또는 친구꺼 테스트해도 좋아!)")),
+        ("추천 보여줘", click("추천 보여줘 ✨")),
+        ("더 보기", click("더 보여줘 👀")),
+    ],
+    "pages/01_MBTI책영화추천.py": [
+        ("MBTI 선택", select_next("네 MBTI 골라줘 👇")),
+        ("다른 추천", click("다른 추천 보여줘")),
+    ],
+    "pages/02_관광지.py": [
+        ("확대 수준", set_slider("🔍 지도 확대 수준", 14)),
+        ("기준 관광지", select_next("기준 관광지")),
+        ("반경 검색", choose("검색 방식", "반경 R km")),
+        ("일정 200곳", set_slider("인기 상위 N곳 넣기", 200)),
+        ("인기 가중치", set_slider("인기 가중치", 0.0)),
+    ],
+    "pages/03_MBTI.py": [
+        ("selected_country", select_next("국가를 선택하세요")),
+        ("selected_mbti", select_next("MBTI 유형을 선택하세요")),
+        ("비슷한 국가", select_next("기준 국가")),
+    ],
+    "pages/04_지하철.py": [
+        ("selected_date", select_next("📅 날짜 선택")),
+        ("selected_line", select_next("🚇 호선 선택")),
+        ("기간 선택", narrow_range("기간 선택")),
+        ("역 검색", type_text("역 이름 (초성도 돼요: ㄱㄴ → 강남)", "ㄱㄴ")),
+        ("역 선택", select_next("역 선택")),
+    ],
+    "pages/05_지하철이상탐지.py": [
+        ("날짜 선택", select_next("📅 날짜 선택")),
+        ("|z| 기준", set_slider("|z| 기준", 5.0)),
+        ("노선 선택", select_next("노선 선택")),
+    ],
+    "pages/07_수행평가.py": [
+        ("selected", select_next("상품 선택")),
+        ("장바구니", pick_many("장바구니 품목", ["치킨", "라면", "자장면", "삼겹살"])),
+    ],
+}
+
+
+def run_page(page, trace=False, restart=False, first_visit=False):
+    """현재 프로세스에서 페이지 하나를 실행하며 단계별 측정값 목록을 돌려줍니다.
+
+    trace=True 면 peak_mb 를, 아니면 seconds 를 채웁니다. restart=True 면 첫 실행만,
+    first_visit=True 면 main.py 로 워밍업을 시작해 끝날 때까지 기다린 뒤 첫 실행만 잽니다.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    results = []
+    if trace:
+        tracemalloc.start()
+
+    def measure(step, fn):
+        if trace:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - before if trace else 0
+        error = at.exception[0].value if at.exception else None
+        results.append({"step": step, "seconds": seconds, "peak_mb": peak / 2**20, "error": error})
+        if "core.prefetch" in sys.modules:
+            # 다음 조작 전까지 미리 만들기가 끝나게 둠 (사용자가 화면을 보는 시간). 측정에는 넣지 않음
+            sys.modules["core.prefetch"].wait(TIMEOUT)
+
+    if first_visit:
+        from core import warmup
+        AppTest.from_file(os.path.join(ROOT, "main.py"), default_timeout=TIMEOUT).run()
+        warmup.wait(TIMEOUT)
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=TIMEOUT)
+    if restart or first_visit:
+        measure("first_visit" if first_visit else "restart", at.run)
+        return results
+    measure("cold", at.run)
+    measure("warm", at.run)
+    for step, act in SCENARIOS[page]:
+        measure(step, lambda: (act(at), at.run()))
+    if trace:
+        tracemalloc.stop()
+    return results
+
+
+def clear_disk_cache(data_dir):
+    shutil.rmtree(os.path.join(data_dir, "data", "cache"), ignore_errors=True)
+
+
+def _worker(page, data_dir, trace, restart=False, first_visit=False):
+    cmd = ([sys.executable, "-m", "bench.pages", "--worker", page]
+           + (["--trace"] if trace else []) + (["--restart"] if restart else [])
+           + (["--first-visit"] if first_visit else []))
+    env = {**os.environ, "APP_DATA_DIR": data_dir, "APP_WARMUP": "1" if first_visit else "0"}
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return [{"step": "cold", "seconds": float("nan"), "peak_mb": float("nan"),
+                 "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}]
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_in_subprocess(page, data_dir):
+    """시간 측정 프로세스와 메모리 측정 프로세스를 따로 돌려 결과를 합칩니다."""
+    clear_disk_cache(data_dir)
+    traced = {r["step"]: r for r in _worker(page, data_dir, trace=True)}
+    clear_disk_cache(data_dir)
+    timed = _worker(page, data_dir, trace=False)
+    # 디스크 캐시가 채워진 채로 새 프로세스에서 첫 실행
+    restart = _worker(page, data_dir, trace=False, restart=True)
+    restart_traced = _worker(page, data_dir, trace=True, restart=True)
+    traced.update({r["step"]: r for r in restart_traced})
+    # 워밍업이 끝난 뒤 첫 방문 (디스크 캐시를 비워 배포 직후와 같게)
+    clear_disk_cache(data_dir)
+    first_visit = _worker(page, data_dir, trace=False, first_visit=True)
+    clear_disk_cache(data_dir)
+    traced.update({r["step"]: r for r in _worker(page, data_dir, trace=True, first_visit=True)})
+    timed = timed[:1] + restart + first_visit + timed[1:]
+    for r in timed:
+        r["peak_mb"] = traced.get(r["step"], {}).get("peak_mb", float("nan"))
+        r["error"] = r["error"] or traced.get(r["step"], {}).get("error")
+    return timed
+
+
+def result_key(page, scale, step):
+    return f"{page}|x{scale}|{step}"
+
+
+def check(result, baseline):
+    """기준값 대비 상태 문자열."""
+    if result["error"]:
+        return "ERROR"
+    if baseline is None:
+        return "new"
+    slow = result["seconds"] > baseline["seconds"] * TIME_TOLERANCE + TIME_SLACK
+    fat = result["peak_mb"] > baseline["peak_mb"] * MEM_TOLERANCE + MEM_SLACK
+    if slow or fat:
+        return "REGRESSION" + (" (time)" if slow else "") + (" (mem)" if fat else "")
+    return "ok"
+
+
+def load_baselines(path=BASELINES):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="페이지별 지연 시간/메모리 벤치마크")
+    parser.add_argument("--scales", default="1,10", help="데이터 배율 (쉼표 구분)")
+    parser.add_argument("--pages", default="", help="페이지 이름 일부 (쉼표 구분, 비우면 전체)")
+    parser.add_argument("--baselines", default=BASELINES, help="기준값 파일 (기본: data/bench/baselines.json, git 밖)")
+    parser.add_argument("--update-baselines", action="store_true")
+    parser.add_argument("--json", help="측정 결과를 저장할 파일")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--restart", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--first-visit", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_page(args.worker, args.trace, args.restart, args.first_visit), ensure_ascii=False))
+        return 0
+
+    wanted = [p for p in args.pages.split(",") if p]
+    pages = [p for p in SCENARIOS if not wanted or any(w in p for w in wanted)]
+    baselines = load_baselines(args.baselines)
+    measured, failed = {}, False
+
+    print(f"{'page':<28} {'scale':>5} {'step':<18} {'sec':>8} {'peak MB':>9} {'base sec':>9}  status")
+    for scale in [int(s) for s in args.scales.split(",")]:
+        data_dir = make_dataset(scale)
+        for page in pages:
+            for r in run_in_subprocess(page, data_dir):
+                key = result_key(page, scale, r["step"])
+                base = baselines.get(key)
+                status = check(r, base)
+                failed |= status not in ("ok", "new")
+                measured[key] = {"seconds": round(r["seconds"], 4), "peak_mb": round(r["peak_mb"], 2)}
+                base_sec = f"{base['seconds']:.3f}" if base else "-"
+                print(f"{page:<28} {scale:>5} {r['step']:<18} {r['seconds']:>8.3f} "
+                      f"{r['peak_mb']:>9.1f} {base_sec:>9}  {status}"
+                      + (f"  {r['error']}" if r["error"] else ""))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(measured, f, ensure_ascii=False, indent=1)
+    if args.update_baselines:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baselines)), exist_ok=True)
+        with open(args.baselines, "w", encoding="utf-8") as f:
+            json.dump({**baselines, **measured}, f, ensure_ascii=False, indent=1, sort_keys=True)
+        print(f"기준값 저장: {args.baselines}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# 벤치마크용 합성 데이터: subway.csv, pp.csv, attractions.csv, mbti_catalog.csv 를 N배로 키운 데이터 폴더를 만듭니다.
+#
+#   python -m bench.synth 10 100       # data/bench/x10, data/bench/x100
+#
+# - 지하철: 원본 한 달치를 31일씩 밀어 N개월치 CARD_SUBWAY_MONTH_*.csv 로 (승객수는 ±10% 흔들기)
+# - 가격: 품목을 N배로 복제 ("설렁탕 #2" ...), 가격은 ±15% 흔들기, 빈 칸은 그대로
+# - 관광지: 관광지를 N × 100 배로 복제 ("경복궁 #2" ...), 위치는 원래 자리 주변 수 km 안으로 흩뜨림
+# - 추천 카탈로그: 항목을 N × 100 배로 복제 ("인셉션 #2" ...), 축 점수는 ±0.3 흔들기 (-1 ~ 1 로 자름)
+# 만든 뒤 지하철 파일은 그 폴더의 Parquet 저장소에 미리 넣어 둡니다.
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from core.csv_loader import read_csv
+from core.paths import ROOT
+from core.price_table import NON_REGION_COLS
+
+BENCH_DATA_DIR = os.path.join(ROOT, "data", "bench")
+SEED = 0
+
+
+def dataset_dir(scale):
+    """배율 1 은 원본 데이터(루트) 그대로 씁니다."""
+    return ROOT if scale == 1 else os.path.join(BENCH_DATA_DIR, f"x{scale}")
+
+
+def make_subway(scale, out_dir, rng):
+    base, encoding = read_csv(os.path.join(ROOT, "subway.csv"))
+    days = pd.to_datetime(base["사용일자"].astype(str), format="%Y%m%d")
+    for m in range(scale):
+        shifted = days + pd.Timedelta(days=31 * m)
+        month = base.copy()
+        month["사용일자"] = shifted.dt.strftime("%Y%m%d").astype(int)
+        for col in ["승차총승객수", "하차총승객수"]:
+            noise = rng.uniform(0.9, 1.1, len(month)) if m else 1.0
+            month[col] = (month[col] * noise).round().astype(int)
+        name = f"CARD_SUBWAY_MONTH_{shifted.min():%Y%m}.csv"
+        month.to_csv(os.path.join(out_dir, name), index=False, encoding=encoding)
+
+
+def make_prices(scale, out_dir, rng):
+    base, encoding = read_csv(os.path.join(ROOT, "pp.csv"), dtype=str)
+    region_cols = [c for c in base.columns if c not in NON_REGION_COLS]
+    copies = []
+    for k in range(scale):
+        part = base.copy()
+        if k:
+            part["품목"] = part["품목"] + f" #{k + 1}"
+            for col in region_cols + ["구평균가격"]:
+                values = pd.to_numeric(part[col].str.replace(",", ""), errors="coerce")
+                values = (values * rng.uniform(0.85, 1.15, len(part)) / 10).round() * 10
+                part[col] = values.map(lambda v: "" if np.isnan(v) else str(int(v)))
+        copies.append(part)
+    pd.concat(copies, ignore_index=True).to_csv(os.path.join(out_dir, "pp.csv"), index=False, encoding=encoding)
+
+
+def make_attractions(scale, out_dir, rng):
+    base, encoding = read_csv(os.path.join(ROOT, "attractions.csv"))
+    copies = [base]
+    for k in range(1, scale * 100 if scale > 1 else 1):
+        part = base.copy()
+        part["관광지"] = part["관광지"] + f" #{k + 1}"
+        part["위도"] = (part["위도"] + rng.normal(0, 0.03, len(part))).round(6)
+        part["경도"] = (part["경도"] + rng.normal(0, 0.04, len(part))).round(6)
+        part["인기지수(%)"] = rng.integers(1, 100, len(part))
+        copies.append(part)
+    pd.concat(copies, ignore_index=True).to_csv(
+        os.path.join(out_dir, "attractions.csv"), index=False, encoding=encoding
+    )
+
+
+def make_catalog(scale, out_dir, rng):
+    path = os.path.join(ROOT, "mbti_catalog.csv")
+    base = pd.read_csv(path, encoding="utf-8-sig")
+    copies = [base]
+    for k in range(1, scale * 100 if scale > 1 else 1):
+        part = base.copy()
+        part["제목"] = part["제목"] + f" #{k + 1}"
+        for axis in ["E", "N", "F", "P"]:
+            part[axis] = (part[axis] + rng.uniform(-0.3, 0.3, len(part))).clip(-1, 1).round(2)
+        copies.append(part)
+    pd.concat(copies, ignore_index=True).to_csv(
+        os.path.join(out_dir, "mbti_catalog.csv"), index=False, encoding="utf-8"
+    )
+
+
+def make_dataset(scale):
+    """배율 scale 의 데이터 폴더를 만들고 경로를 돌려줍니다. 이미 있으면 그대로 씁니다."""
+    out_dir = dataset_dir(scale)
+    if not os.path.exists(os.path.join(out_dir, "pp.csv")):
+        tmp_dir = out_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        rng = np.random.default_rng(SEED)
+        make_subway(scale, tmp_dir, rng)
+        make_prices(scale, tmp_dir, rng)
+        shutil.copy(os.path.join(ROOT, "countriesMBTI_16types.csv"), tmp_dir)
+        os.replace(tmp_dir, out_dir)
+    if not os.path.exists(os.path.join(out_dir, "attractions.csv")):
+        make_attractions(scale, out_dir, np.random.default_rng(SEED))
+    if not os.path.exists(os.path.join(out_dir, "mbti_catalog.csv")):
+        make_catalog(scale, out_dir, np.random.default_rng(SEED))
+    # 저장소 변환은 한 번만 하는 단계라 여기서 미리 해 둠 (페이지 콜드 로드에는 포함하지 않음)
+    subprocess.run(
+        [sys.executable, "-m", "core.subway_ingest"],
+        cwd=ROOT, env={**os.environ, "APP_DATA_DIR": out_dir}, check=True, stdout=subprocess.DEVNULL,
+    )
+    return out_dir
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:] or ["10"]:
+        print(make_dataset(int(arg)))
@@ -0,0 +1,198 @@
+# 페이지 계산 결과를 HTTP/JSON 으로 돌려주는 로컬 조회 서버 (asyncio, 표준 라이브러리만 사용)
+#
+#   python -m core.api_server                  # 127.0.0.1:8765
+#   python -m core.api_server --port 9000
+#
+#   GET  /health                                상태 + 응답 캐시 통계
+#   GET  /queries                               조회 이름과 인자 목록
+#   GET  /top_stations?date=20251001&line=2호선&k=5
+#   GET  /price_extremes?product=PC방이용료
+#   GET  /mbti_distribution?country=South%20Korea
+#   GET  /mbti_top_countries?mbti=INFJ&n=5
+#   POST /batch   [{"query": "price_extremes", "product": "..."}, ...]
+#                 → 같은 순서의 [{"ok": true, "result": ...} | {"ok": false, "status": 404, "error": ...}]
+#
+# 조회는 core/queries.py 의 함수를 그대로 쓰고(데이터셋은 Streamlit 페이지와 같은 방식으로 한 번만 만듦),
+# 무거운 계산은 스레드에서 돌려 이벤트 루프를 막지 않습니다.
+# 응답 캐시: (조회 이름, 인자) → 결과, LRU 로 cache_entries 개까지.
+# 원본 데이터 버전은 version_ttl 초마다 확인하고, 바뀌었으면 응답 캐시를 비웁니다.
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import sys
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from core import queries
+
+MAX_BATCH = 1000
+MAX_BODY_BYTES = 1 << 20
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+log = logging.getLogger("app.api")
+
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class QueryServer:
+    def __init__(self, cache_entries=4096, version_ttl=2.0):
+        self.cache = collections.OrderedDict()
+        self.cache_entries = cache_entries
+        self.version_ttl = version_ttl
+        self.hits = self.misses = 0
+        self._version = None
+        self._version_checked = 0.0
+        self._version_lock = asyncio.Lock()
+
+    async def _check_version(self):
+        if time.monotonic() - self._version_checked < self.version_ttl:
+            return
+        async with self._version_lock:
+            if time.monotonic() - self._version_checked < self.version_ttl:
+                return
+            version = await asyncio.to_thread(queries.data_version)
+            if version != self._version:
+                self.cache.clear()
+                self._version = version
+            self._version_checked = time.monotonic()
+
+    async def answer(self, name, params):
+        """조회 하나의 결과 (캐시 우선). 실패하면 QueryError."""
+        await self._check_version()
+        key = (name, tuple(sorted((k, str(v)) for k, v in params.items())))
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key]
+        self.misses += 1
+        version = self._version     # 조회 도중 버전이 바뀌면(캐시를 비웠으면) 옛 데이터 결과는 넣지 않음
+        try:
+            result = await asyncio.to_thread(queries.run_query, name, params)
+        except queries.NotFound as e:
+            raise QueryError(404, e.args[0]) from e
+        except ValueError as e:
+            raise QueryError(400, str(e)) from e
+        if version != self._version:
+            return result
+        self.cache[key] = result
+        if len(self.cache) > self.cache_entries:
+            self.cache.popitem(last=False)
+        return result
+
+    async def batch(self, items):
+        if not isinstance(items, list):
+            raise QueryError(400, "본문은 조회 목록(JSON 배열)이어야 합니다")
+        if len(items) > MAX_BATCH:
+            raise QueryError(413, f"한 번에 {MAX_BATCH}개까지 조회할 수 있습니다")
+
+        async def one(item):
+            if not isinstance(item, dict) or "query" not in item:
+                raise QueryError(400, "각 항목에 query 가 있어야 합니다")
+            return await self.answer(item["query"], {k: v for k, v in item.items() if k != "query"})
+
+        # 한 항목이 실패해도 나머지는 그대로 돌려줌 (예상 못 한 예외는 그 항목만 500)
+        results = await asyncio.gather(*(one(item) for item in items), return_exceptions=True)
+        out = []
+        for item, result in zip(items, results):
+            if isinstance(result, QueryError):
+                out.append({"ok": False, "status": result.status, "error": str(result)})
+            elif isinstance(result, Exception):
+                log.error("batch item failed: %r", item, exc_info=result)
+                out.append({"ok": False, "status": 500, "error": f"{type(result).__name__}: {result}"})
+            else:
+                out.append({"ok": True, "result": result})
+        return out
+
+    async def route(self, method, target, body):
+        url = urlsplit(target)
+        name = url.path.strip("/")
+        if method == "GET" and name == "health":
+            return {"status": "ok", "cache": {"entries": len(self.cache), "hits": self.hits, "misses": self.misses}}
+        if method == "GET" and name == "queries":
+            return {n: list(args) for n, (_, args) in queries.QUERIES.items()}
+        if method == "POST" and name == "batch":
+            try:
+                items = json.loads(body or b"null")
+            except ValueError as e:
+                raise QueryError(400, f"JSON 을 읽을 수 없습니다: {e}") from e
+            return await self.batch(items)
+        if name in queries.QUERIES:
+            if method != "GET":
+                raise QueryError(405, "GET 만 지원합니다 (여러 개는 POST /batch)")
+            return await self.answer(name, dict(parse_qsl(url.query)))
+        raise QueryError(404, f"없는 경로: {url.path}")
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await reader.readline()
+                if not request.strip():
+                    break
+                method, target, version = request.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload, body = 413, {"error": REASONS[413]}, b""
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = 200, await self.route(method, target, body)
+                    except QueryError as e:
+                        status, payload = e.status, {"error": str(e)}
+                    except Exception as e:     # 서버는 계속 돌아야 하므로 500 으로 돌려줌
+                        log.exception("query failed: %s", target)
+                        status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                keep_alive = (version.strip() == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                              and length <= MAX_BODY_BYTES)
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host, port, **kwargs):
+    server = QueryServer(**kwargs)
+    srv = await asyncio.start_server(server.handle, host, port)
+    print(f"listening on http://{host}:{port}", flush=True)
+    async with srv:
+        await srv.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="페이지 계산 결과 조회 서버 (JSON)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-entries", type=int, default=4096)
+    args = parser.parse_args(argv)
+    # Streamlit 밖에서 st.cache_resource 를 쓸 때 나오는 경고는 감춤
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    logging.getLogger("streamlit.runtime.caching.cache_data_api").setLevel(logging.ERROR)
+    try:
+        asyncio.run(serve(args.host, args.port, cache_entries=args.cache_entries))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
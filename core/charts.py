@@ -0,0 +1,265 @@
+# 페이지 그래프 공통 도우미: 만든 그래프 재사용 + 브라우저로 보내는 JSON 줄이기
+#
+#   fig = charts.cached_figure("mbti_country", (country,), build, depends=["mbti_matrix"])
+#   st.plotly_chart(fig)                          # 같은 입력이면 다른 세션/rerun 도 같은 그래프를 씀
+#
+#   charts.compact(values)                        # float32 / 작은 정수형 배열
+#   charts.downsample(frame, 500)                 # 시계열 점 줄이기 (LTTB)
+#   charts.top_n_with_others(series, 30)          # 막대 상위 N개 + "기타" 한 개
+#   spec = charts.cached_figure("price_bars", key, lambda: charts.vega_spec(chart))
+#   st.vega_lite_chart(frame, spec)               # Altair: 모양(spec)은 재사용, 값은 Arrow 로 따로
+#
+#   python -m core.charts                         # 페이지 그래프 JSON 크기 비교 (목록 / 압축)
+#
+# Plotly 는 NumPy 숫자 배열을 base64 typed array({"dtype": "f4", "bdata": ...})로 보내므로
+# 값을 float32 / 작은 정수형 배열로 건네면 숫자를 글자로 늘어놓는 것보다 JSON 이 몇 배 작아집니다.
+# 캐시: (이름, key, depends 데이터셋의 지금 버전) → 그래프, 프로세스 하나에 MAX_FIGURES 개 / MAX_FIGURE_BYTES 까지 LRU.
+# figure_job() 은 같은 캐시 항목을 다른 스레드에서 채우는 함수를 돌려줍니다 (core/prefetch.py).
+# 캐시에서 꺼낸 그래프는 세션끼리 공유하므로 페이지에서 고치지 말고 그대로 그립니다.
+import collections
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core import profiling, registry
+
+MAX_FIGURES = 256
+MAX_FIGURE_BYTES = 64 * 2**20
+MAX_LINE_POINTS = 500    # 선 그래프 하나에 보내는 점 수 상한
+MAX_BARS = 40            # 막대 그래프 막대 수 상한 (나머지는 "기타")
+# Plotly typed array 가 지원하는 정수형 (64비트 정수는 없어서 범위를 넘으면 float64)
+INT_DTYPES = (np.uint8, np.int8, np.uint16, np.int16, np.uint32, np.int32)
+
+
+class FigureCache:
+    """입력 key → 만든 그래프 (LRU). 항목 수 max_entries, 크기 합계 max_bytes 를 넘으면 오래된 것부터 버림."""
+
+    def __init__(self, max_entries=MAX_FIGURES, max_bytes=MAX_FIGURE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = self.misses = 0
+        self.nbytes = 0
+        self._entries = collections.OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+        # 만드는 동안은 잠그지 않음 (같은 key 를 두 세션이 동시에 만들면 나중 것이 남음)
+        value = build()
+        size = figure_nbytes(value)
+        with self._lock:
+            self.misses += 1
+            self.nbytes += size - self._sizes.get(key, 0)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._entries.move_to_end(key)
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self.nbytes > self.max_bytes
+            ):
+                old, _ = self._entries.popitem(last=False)
+                self.nbytes -= self._sizes.pop(old)
+        return False, value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def figure_nbytes(fig):
+    """그래프(또는 spec dict)가 차지하는 메모리 (바이트, 대략)."""
+    if hasattr(fig, "to_plotly_json"):
+        fig = fig.to_plotly_json()     # Figure 객체는 검증기 등 공유 객체를 물고 있어 안의 값만 셈
+    return registry.deep_nbytes(fig)
+
+
+@st.cache_resource
+def get_cache():
+    # 프로세스 안의 모든 세션이 같은 그래프 캐시를 씀
+    return FigureCache()
+
+
+def cached_figure(name, key, build, depends=()):
+    """(name, key) 그래프. depends 데이터셋(core/registry.py)이 새로 만들어지면 다시 그립니다."""
+    start = time.perf_counter()
+    full_key = (name, key, tuple(registry.version(d) for d in depends))
+    hit, fig = get_cache().get(full_key, build)
+    prof = profiling.current()
+    if prof is not None:
+        prof.caches.append({
+            "function": f"figure:{name}",
+            "hit": hit,
+            "seconds": round(time.perf_counter() - start, 4),
+        })
+    return fig
+
+
+def figure_job(name, key, build, depends=()):
+    """cached_figure(name, key, build, depends) 와 같은 캐시 항목을 채우는 함수. 이미 있으면 None.
+
+    key 는 지금(스크립트 스레드에서) 정해 두므로 돌려준 함수는 다른 스레드에서 불러도 됩니다.
+    """
+    cache = get_cache()
+    full_key = (name, key, tuple(registry.version(d) for d in depends))
+    if full_key in cache:
+        return None
+    return lambda: cache.get(full_key, build)[1]
+
+
+def vega_spec(chart):
+    """Altair 그래프의 Vega-Lite spec (데이터 빼고). 값은 st.vega_lite_chart(data, spec) 로 따로 넘깁니다."""
+    spec = chart.to_dict()
+    spec.pop("data", None)
+    spec.pop("datasets", None)
+    return spec
+
+
+# ------------------------------------
+# 배열 줄이기
+# ------------------------------------
+def compact(values):
+    """숫자 배열을 float32 / 값 범위에 맞는 가장 작은 정수형 NumPy 배열로. 숫자가 아니면 그대로."""
+    arr = np.asarray(values)
+    if arr.dtype.kind == "f":
+        return arr.astype(np.float32, copy=False)
+    if arr.dtype.kind in "iu":
+        if arr.size == 0:
+            return arr.astype(np.int32)
+        lo, hi = arr.min(), arr.max()
+        for dtype in INT_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= lo and hi <= info.max:
+                return arr.astype(dtype, copy=False)
+        return arr.astype(np.float64)
+    return values
+
+
+def compact_frame(df, columns=None):
+    """숫자 컬럼을 compact() 한 새 DataFrame (얕은 복사)."""
+    columns = df.columns if columns is None else columns
+    out = df.copy(deep=False)
+    for col in columns:
+        if pd.api.types.is_numeric_dtype(out[col]) and not pd.api.types.is_bool_dtype(out[col]):
+            out[col] = compact(out[col].to_numpy())
+    return out
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: 선 모양을 살리며 threshold 개로 줄일 점의 위치 (정렬됨)."""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    # 첫 점과 끝 점은 그대로 두고 가운데 n-2 개를 threshold-2 개 구간으로 나눔
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        # 이전에 고른 점 a, 다음 구간 평균점과 만드는 삼각형이 가장 큰 점
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(frame, max_points=MAX_LINE_POINTS):
+    """행(시간 순) 이 max_points 보다 많으면 컬럼별 LTTB 로 고른 행만 남깁니다."""
+    if len(frame) <= max_points:
+        return frame
+    x = np.arange(len(frame))
+    per_column = max(3, max_points // max(1, frame.shape[1]))
+    rows = np.unique(np.concatenate([lttb(x, frame[c].to_numpy(), per_column) for c in frame.columns]))
+    return frame.iloc[rows]
+
+
+def top_n_with_others(values, n=MAX_BARS, other_label="기타", agg="sum", keep=()):
+    """큰 값 n 개(+ keep 라벨)만 남기고 나머지는 other_label 막대 하나(agg: sum / mean)로 묶은 Series."""
+    values = values.sort_values(ascending=False)
+    if len(values) <= n:
+        return values
+    chosen = np.zeros(len(values), dtype=bool)
+    chosen[:n] = True
+    chosen |= values.index.isin(list(keep))
+    rest = values[~chosen]
+    if rest.empty:
+        return values
+    others = pd.Series([getattr(rest, agg)()], index=[f"{other_label} ({len(rest)})"])
+    # 정수 값의 평균은 소수로 남김 (합은 원래 dtype 그대로)
+    keep_dtype = agg != "mean" or pd.api.types.is_float_dtype(values.dtype)
+    dtype = values.dtype if keep_dtype else "float64"
+    return pd.concat([values[chosen], others]).astype(dtype)
+
+
+# ------------------------------------
+# JSON 크기
+# ------------------------------------
+def payload_bytes(fig):
+    """Streamlit 이 Plotly 그래프를 보낼 때의 JSON 크기 (바이트)."""
+    import plotly.io
+    return len(plotly.io.to_json(fig.to_dict(), validate=False))
+
+
+def _compare(label, plain, compacted):
+    a, b = payload_bytes(plain), payload_bytes(compacted)
+    print(f"{label:<28} {a / 1024:9.1f} KB → {b / 1024:9.1f} KB  ({b / a:.0%})")
+
+
+def main(argv=None):
+    import logging
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    from core import queries
+    from core.spatial import cluster_markers
+
+    # Streamlit 밖에서 st.cache_resource 를 쓸 때 나오는 경고는 감춤
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    attractions = queries.attractions()
+    markers = cluster_markers(attractions, 16, max_markers=10**6)
+    _compare(
+        f"관광지 지도 ({len(markers)}점)",
+        px.scatter_map(markers, lat="위도", lon="경도", size="개수"),
+        px.scatter_map(compact_frame(markers, ["위도", "경도", "개수"]), lat="위도", lon="경도", size="개수"),
+    )
+
+    dist, _ = queries.mbti_clusters("jensenshannon")
+    _compare(
+        f"MBTI 거리 행렬 ({len(dist)}²)",
+        go.Figure(go.Heatmap(z=dist.tolist())),
+        go.Figure(go.Heatmap(z=compact(dist))),
+    )
+
+    sources = queries.subway_sources()
+    prefix = queries.subway_prefix(sources)
+    rolling = pd.DataFrame({"7일 이동평균": prefix.rolling_series(0, 7, by_line=True)})
+    _compare(
+        f"노선 이동평균 ({len(rolling)}일)",
+        go.Figure(go.Scatter(y=rolling.iloc[:, 0].tolist())),
+        go.Figure(go.Scatter(y=compact(downsample(rolling).iloc[:, 0]))),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
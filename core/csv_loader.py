@@ -0,0 +1,64 @@
+# CSV 인코딩 판별 + 한 번만 파싱하는 공용 로더
+#
+# 인코딩마다 read_csv 를 다시 돌리지 않고, 앞부분 바이트 샘플만 보고 인코딩을 정합니다.
+#   1) BOM 확인  2) UTF-8 엄격 디코딩  3) CP949 디코딩
+# 셋 다 안 되면 latin1 로 억지로 읽지 않고 에러를 냅니다.
+import codecs
+
+import pandas as pd
+
+SAMPLE_BYTES = 64 * 1024
+MAX_SAMPLE_BYTES = 4 * 1024 * 1024
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def _decodes(sample, encoding, final):
+    # 샘플 끝에서 잘린 멀티바이트 글자는 final=False 로 허용
+    try:
+        codecs.getincrementaldecoder(encoding)("strict").decode(sample, final=final)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def read_sample(path, sample_size=SAMPLE_BYTES, max_size=MAX_SAMPLE_BYTES):
+    """앞부분 바이트 샘플과 파일 끝까지 읽었는지 여부를 돌려줍니다.
+
+    샘플이 전부 ASCII 면 인코딩을 가릴 수 없으므로 ASCII 가 아닌 바이트가 나올 때까지 더 읽습니다.
+    """
+    with open(path, "rb") as f:
+        sample = f.read(sample_size)
+        while sample.isascii() and len(sample) < max_size:
+            block = f.read(sample_size)
+            if not block:
+                return sample, True
+            sample += block
+        at_eof = not f.read(1)
+    return sample, at_eof
+
+
+def detect_encoding(path, sample_size=SAMPLE_BYTES):
+    """파일 앞부분만 보고 인코딩을 정합니다. 판별이 안 되면 ValueError."""
+    sample, at_eof = read_sample(path, sample_size)
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    if _decodes(sample, "utf-8", at_eof):
+        return "utf-8"
+    if _decodes(sample, "cp949", at_eof):
+        return "cp949"
+    raise ValueError(f"파일 인코딩을 알 수 없습니다: {path} (UTF-8/CP949 아님)")
+
+
+def read_csv(path, encoding=None, **kwargs):
+    """인코딩을 판별해 한 번만 파싱합니다. (DataFrame, 사용한 인코딩) 을 돌려줍니다."""
+    encoding = encoding or detect_encoding(path)
+    try:
+        return pd.read_csv(path, encoding=encoding, **kwargs), encoding
+    except UnicodeDecodeError as e:
+        raise ValueError(f"파일을 {encoding} 로 읽을 수 없습니다: {path} ({e})") from e
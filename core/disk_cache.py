@@ -0,0 +1,196 @@
+# 서버를 다시 띄워도 남는 파생 결과 디스크 캐시
+#
+#   table = disk_cache.artifact("price_table", build, files=[PP_CSV], modules=[price_table])
+#   state = disk_cache.checkpoint("subway_anomaly", modules=[...])     # 이어서 갱신하는 상태 (없으면 None)
+#   disk_cache.save_checkpoint("subway_anomaly", state, modules=[...])
+#
+#   python -m core.disk_cache            # 캐시 항목 목록
+#   python -m core.disk_cache --clear    # 전부 지우기
+#
+# key = 이름 + 원본 파일 내용 해시(files) / 원본 해시(sources) + 인자(params)
+#       + 만든 코드의 해시(modules) + CODE_VERSION
+# 이라서 CSV 나 계산 코드가 바뀌면 자동으로 새로 만듭니다 (옛 항목은 쓰이지 않다가 LRU 로 지워짐).
+# 항목은 pickle 파일 하나이고, 읽을 때마다 수정 시각을 갱신해 오래 안 쓴 것부터 MAX_BYTES 아래로 지웁니다.
+import hashlib
+import inspect
+import os
+import pickle
+import sys
+import threading
+import time
+
+from core import profiling
+from core.paths import STORE_DIR
+
+CACHE_DIR = os.path.join(STORE_DIR, "cache")
+MAX_BYTES = int(os.environ.get("APP_CACHE_MAX_MB", "512")) * 2**20
+CODE_VERSION = 1    # pickle 로 저장하는 객체 구조가 바뀌면 올림
+SUFFIX = ".pkl"
+
+_hash_lock = threading.Lock()
+_file_hashes = {}     # 경로 → (크기, 수정 시각, sha256)
+_module_hashes = {}
+
+
+def file_hash(path, block_size=1 << 20):
+    """파일 내용 sha256. 크기/수정 시각이 그대로면 다시 읽지 않습니다."""
+    path = os.path.abspath(path)
+    st_ = os.stat(path)
+    stat_key = (st_.st_size, st_.st_mtime_ns)
+    with _hash_lock:
+        known = _file_hashes.get(path)
+    if known and known[:2] == stat_key:
+        return known[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    with _hash_lock:
+        _file_hashes[path] = (*stat_key, digest)
+    return digest
+
+
+def module_hash(module):
+    """모듈 소스 코드 sha256 (코드가 바뀌면 캐시가 무효가 되도록)."""
+    name = module.__name__
+    if name not in _module_hashes:
+        with open(inspect.getsourcefile(module), "rb") as f:
+            _module_hashes[name] = hashlib.sha256(f.read()).hexdigest()
+    return _module_hashes[name]
+
+
+def cache_key(name, files=(), sources=(), params=(), modules=()):
+    parts = [name, str(CODE_VERSION)]
+    parts += [file_hash(p) for p in files]
+    parts += [str(s) for s in sources]
+    parts += [repr(p) for p in params]
+    parts += [module_hash(m) for m in modules]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def entry_path(name, key, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{name}-{key}{SUFFIX}")
+
+
+def _load(path):
+    try:
+        with open(path, "rb") as f:
+            value = pickle.load(f)
+    except FileNotFoundError:
+        return False, None
+    except Exception:
+        # 쓰다 만 파일이나 옛 형식 → 지우고 새로 만듦
+        _remove(path)
+        return False, None
+    try:
+        os.utime(path)      # LRU: 마지막 사용 시각
+    except OSError:
+        pass
+    return True, value
+
+
+def _store(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def entries(cache_dir=CACHE_DIR):
+    """[(경로, 크기, 마지막 사용 시각)] 오래된 순."""
+    if not os.path.isdir(cache_dir):
+        return []
+    found = []
+    for n in os.listdir(cache_dir):
+        if n.endswith(SUFFIX):
+            path = os.path.join(cache_dir, n)
+            try:
+                st_ = os.stat(path)
+            except OSError:
+                continue
+            found.append((path, st_.st_size, st_.st_mtime))
+    return sorted(found, key=lambda e: e[2])
+
+
+def evict(max_bytes=MAX_BYTES, cache_dir=CACHE_DIR, keep=()):
+    """오래 안 쓴 항목부터 지워 전체 크기를 max_bytes 이하로 맞춥니다. 지운 개수를 돌려줍니다."""
+    found = entries(cache_dir)
+    total = sum(size for _, size, _ in found)
+    removed = 0
+    for path, size, _ in found:
+        if total <= max_bytes:
+            break
+        if path in keep:
+            continue
+        _remove(path)
+        total -= size
+        removed += 1
+    return removed
+
+
+def artifact(name, build, files=(), sources=(), params=(), modules=(), cache_dir=CACHE_DIR):
+    """디스크에 있으면 읽고, 없으면 build() 로 만들어 저장한 뒤 돌려줍니다."""
+    start = time.perf_counter()
+    path = entry_path(name, cache_key(name, files, sources, params, modules), cache_dir)
+    hit, value = _load(path)
+    if not hit:
+        value = build()
+        try:
+            _store(path, value)
+            evict(cache_dir=cache_dir, keep=(path,))
+        except OSError:
+            pass    # 디스크가 가득 차거나 읽기 전용이어도 계산 결과는 그대로 씀
+    prof = profiling.current()
+    if prof is not None:
+        prof.caches.append({
+            "function": f"disk:{name}",
+            "hit": hit,
+            "seconds": round(time.perf_counter() - start, 4),
+        })
+    return value
+
+
+def checkpoint(name, params=(), modules=(), cache_dir=CACHE_DIR):
+    """원본이 늘 때마다 이어서 갱신하는 상태의 마지막 저장본 (없으면 None).
+
+    artifact() 와 달리 key 에 원본 해시를 넣지 않으므로, 상태 안에 어느 원본까지 반영했는지 함께 담아 둡니다.
+    """
+    hit, value = _load(entry_path(name, cache_key(name, params=params, modules=modules), cache_dir))
+    return value if hit else None
+
+
+def save_checkpoint(name, value, params=(), modules=(), cache_dir=CACHE_DIR):
+    path = entry_path(name, cache_key(name, params=params, modules=modules), cache_dir)
+    try:
+        _store(path, value)
+        evict(cache_dir=cache_dir, keep=(path,))
+    except OSError:
+        pass
+
+
+def main(argv):
+    if "--clear" in argv:
+        for path, _, _ in entries():
+            _remove(path)
+        print(f"cleared {CACHE_DIR}")
+        return 0
+    found = entries()
+    for path, size, used in found:
+        print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(used))}  {size / 2**20:8.2f} MB  "
+              f"{os.path.basename(path)}")
+    total = sum(size for _, size, _ in found)
+    print(f"{len(found)} entries, {total / 2**20:.1f} / {MAX_BYTES / 2**20:.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,195 @@
+# 관광지 하루 동선: 출발지에서 고른 관광지를 모두 들르는 짧은 순서 (가까운 이웃 + 2-opt)
+#
+#   table = DistanceTable(df["위도"], df["경도"])      # queries.attractions_distances() 가 한 벌만 만들어 공유
+#   route = plan(table, start=0, stops=[3, 5, 9], popularity=df["인기지수(%)"])
+#   route.rows, route.legs, route.total                # 들르는 순서(행 번호), 구간 거리(km), 총 거리
+#
+#   python -m core.itinerary --n 200                  # 관광지 수별 동선 계산 시간
+#
+# 거리는 haversine 행렬을 NumPy 브로드캐스트로 한 번에 계산합니다. 관광지가 FULL_MATRIX_MAX 곳 이하면
+# 전체 행렬을 한 번만 만들어 두고 고른 행/열만 잘라 쓰고, 그보다 많으면 고른 곳끼리만 계산합니다.
+# 동선의 비용은 총 거리 + 인기 가중치 × (인기도로 가중한 평균 도착 거리) 입니다. 인기 많은 곳에
+# 늦게 도착할수록 비용이 커지므로, 가중치가 클수록 조금 더 돌더라도 인기 많은 곳을 앞쪽에 둡니다.
+# 첫 동선은 가까운 이웃으로 만들되 다음 곳을 고를 때 거리를 (1 + 인기 가중치 × 인기도) 로 나누고,
+# 2-opt 로 구간을 뒤집어 같은 비용을 줄입니다 (가중치 0 이면 둘 다 총 거리만 봄).
+# 2-opt 는 구간 시작점마다 끝점 후보 전체의 비용 변화를 누적합으로 한 번에 계산하므로
+# 파이썬 반복은 곳 수만큼만 돕니다.
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from core.spatial import haversine_km
+
+FULL_MATRIX_MAX = 2000      # 전체 거리 행렬을 들고 있는 관광지 수 상한 (float32 로 16MB)
+POP_WEIGHT = 1.0            # 평균 도착 거리 1km 를 총 거리 몇 km 로 칠지 (가까운 이웃: 인기도 1 이면 거리 절반)
+MAX_PASSES = 50             # 2-opt 를 되풀이하는 횟수 상한
+_EPS = 1e-6
+
+
+def distance_matrix(lat, lon):
+    """위도/경도 배열 → (n, n) 대원 거리 행렬 (km, float32)."""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    return haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :]).astype(np.float32)
+
+
+class DistanceTable:
+    """관광지 사이 거리. 작은 데이터는 전체 행렬을 미리 만들어 두고 잘라 줍니다."""
+
+    def __init__(self, lat, lon, max_full=FULL_MATRIX_MAX):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.full = distance_matrix(self.lat, self.lon) if len(self.lat) <= max_full else None
+
+    def __len__(self):
+        return len(self.lat)
+
+    def sub(self, rows):
+        """rows 끼리의 (len(rows), len(rows)) 거리 행렬."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if self.full is not None:
+            return self.full[np.ix_(rows, rows)]
+        return distance_matrix(self.lat[rows], self.lon[rows])
+
+
+def _relative(popularity, n):
+    """인기지수 → 0 ~ 1 인기도 (가장 인기 많은 곳이 1). 없으면 모두 0."""
+    if popularity is None or not n:
+        return np.zeros(n)
+    p = np.asarray(popularity, dtype=np.float64)
+    top = p.max()
+    return np.clip(p / top, 0, 1) if top > 0 else np.zeros(n)
+
+
+def nearest_neighbor(dist, popularity=None, pop_weight=POP_WEIGHT):
+    """0 번에서 출발해 (거리 / (1 + pop_weight × 인기도)) 가 가장 작은 곳을 차례로 들르는 순서."""
+    n = len(dist)
+    bonus = 1 + pop_weight * _relative(popularity, n)
+    visited = np.zeros(n, dtype=bool)
+    order = np.empty(n, dtype=np.int64)
+    cur = 0
+    for k in range(n):
+        order[k] = cur
+        visited[cur] = True
+        if k == n - 1:
+            break
+        cost = np.where(visited, np.inf, dist[cur] / bonus)
+        cur = int(np.argmin(cost))
+    return order
+
+
+def two_opt(dist, order, popularity=None, pop_weight=POP_WEIGHT, max_passes=MAX_PASSES):
+    """출발점(order[0])은 두고 구간을 뒤집어 열린 경로(돌아오지 않음)의 비용을 줄입니다.
+
+    비용 = 총 거리 + pop_weight × Σ(인기도 × 도착 거리) / Σ 인기도. popularity 가 없거나
+    pop_weight 가 0 이면 총 거리만 줄입니다.
+    """
+    order = np.array(order, dtype=np.int64)
+    n = len(order)
+    if n < 4:
+        return order
+    # 끝에 어느 곳과도 거리가 0 이고 인기도도 0 인 가상의 도착점을 붙여 마지막 구간도 같은 식으로 셈
+    padded = np.zeros((n + 1, n + 1), dtype=np.float64)
+    padded[:n, :n] = dist
+    p = np.append(_relative(popularity, n), 0.0)
+    scale = pop_weight / p.sum() if pop_weight > 0 and p.sum() > 0 else 0.0
+    route = np.append(order, n)
+    stale = True
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, n - 1):
+            # route[i..j] 를 뒤집을 때 비용 변화 (j = i+1 .. n-1 을 한 번에)
+            a, b = route[i - 1], route[i]
+            c, e = route[i + 1:n], route[i + 2:n + 1]
+            delta = padded[a, c] + padded[b, e] - padded[a, b] - padded[c, e]
+            if scale:
+                # 도착 거리 A 와 인기도 누적합 (구간을 뒤집었을 때만 다시 셈). 뒤집힌 route[t] 는
+                # A[i-1] + d(a, c) + A[j] - A[t] 에 도착하고 j 뒤의 곳은 모두 거리 변화(delta)만큼 늦게 도착함
+                if stale:
+                    pr = p[route]
+                    arrive = np.r_[0.0, np.cumsum(padded[route[:-1], route[1:]])]
+                    pc = np.r_[0.0, np.cumsum(pr)]
+                    pac = np.r_[0.0, np.cumsum(pr * arrive)]
+                    stale = False
+                j = np.arange(i + 1, n)
+                seg_p = pc[j + 1] - pc[i]
+                seg_pa = pac[j + 1] - pac[i]
+                after_p = pc[n + 1] - pc[j + 1]
+                moved = seg_p * (arrive[i - 1] + padded[a, c] + arrive[j]) - 2 * seg_pa
+                delta = delta + scale * (moved + delta * after_p)
+            k = int(np.argmin(delta))
+            if delta[k] < -_EPS:
+                j = i + 1 + k
+                route[i:j + 1] = route[i:j + 1][::-1]
+                improved = stale = True
+        if not improved:
+            break
+    return route[:n]
+
+
+def route_cost(dist, order, popularity=None, pop_weight=POP_WEIGHT):
+    """two_opt() 가 줄이는 비용: 총 거리 + pop_weight × 인기도 가중 평균 도착 거리 (km)."""
+    legs = path_legs(dist, order)
+    p = _relative(popularity, len(order))[np.asarray(order, dtype=np.int64)]
+    if not pop_weight or not p.sum():
+        return float(legs.sum())
+    return float(legs.sum() + pop_weight * (p * np.cumsum(legs)).sum() / p.sum())
+
+
+def path_legs(dist, order):
+    """순서대로 갈 때 구간마다 거리 (첫 곳은 0)."""
+    order = np.asarray(order, dtype=np.int64)
+    return np.r_[0.0, dist[order[:-1], order[1:]]] if len(order) else np.empty(0)
+
+
+class Route:
+    """plan() 결과. rows: 들르는 순서(원래 행 번호, 출발지 먼저), legs: 앞 곳에서 오는 거리 (km)."""
+
+    def __init__(self, rows, legs, baseline):
+        self.rows = rows
+        self.legs = legs
+        self.total = float(legs.sum())
+        self.baseline = baseline        # 고른 순서(인기순) 그대로 돌 때의 총 거리
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def plan(table, start, stops, popularity=None, pop_weight=POP_WEIGHT, max_passes=MAX_PASSES):
+    """start 에서 출발해 stops 를 모두 들르는 Route. popularity: 전체 행의 인기지수 (없으면 거리만)."""
+    stops = [s for s in dict.fromkeys(int(s) for s in stops) if s != start]
+    rows = np.array([start, *stops], dtype=np.int64)
+    dist = table.sub(rows)
+    weights = None if popularity is None else np.asarray(popularity, dtype=np.float64)[rows]
+    order = two_opt(dist, nearest_neighbor(dist, weights, pop_weight), weights, pop_weight, max_passes)
+    return Route(rows[order], path_legs(dist, order), float(path_legs(dist, np.arange(len(rows))).sum()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="관광지 동선 계산 시간")
+    parser.add_argument("--n", type=int, nargs="+", default=[10, 50, 200, 500])
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    # 서울 안쪽 30km 남짓에 흩뿌린 관광지
+    lat = 37.55 + rng.normal(0, 0.06, max(args.n))
+    lon = 126.98 + rng.normal(0, 0.08, max(args.n))
+    popularity = rng.integers(1, 100, max(args.n))
+    start = time.perf_counter()
+    table = DistanceTable(lat, lon)
+    print(f"거리 행렬 {len(table):,}곳: {(time.perf_counter() - start) * 1000:.1f} ms")
+    for n in args.n:
+        start = time.perf_counter()
+        greedy = nearest_neighbor(table.sub(np.arange(n)), popularity[:n])
+        route = plan(table, 0, range(1, n), popularity)
+        ms = (time.perf_counter() - start) * 1000
+        greedy_km = path_legs(table.sub(np.arange(n)), greedy).sum()
+        print(f"{n:>5}곳: {ms:7.1f} ms  총 {route.total:7.1f} km "
+              f"(가까운 이웃만 {greedy_km:.1f} km, 고른 순서 그대로 {route.baseline:.1f} km)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
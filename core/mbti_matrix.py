@@ -0,0 +1,59 @@
+# 국가 × MBTI 유형 비율 행렬과 미리 계산한 순위
+#
+# CSV 를 한 번 float32 행렬로 만든 뒤, 국가별 유형 정렬 순서와
+# 유형별 국가 정렬 순서를 미리 구해 둡니다. 화면에서는 인덱스 조회만 합니다.
+import numpy as np
+import pandas as pd
+
+COUNTRY_COL = "Country"
+
+
+class MbtiMatrix:
+    """build_mbti_matrix() 결과. 행 = countries, 열 = types."""
+
+    def __init__(self, countries, types, values):
+        self.countries = countries      # 국가 이름 목록 (CSV 순서)
+        self.types = types              # MBTI 유형 목록 (CSV 컬럼 순서)
+        self.values = values            # (국가 수, 16) float32
+        self.index = {c: i for i, c in enumerate(countries)}
+        self.type_index = {t: j for j, t in enumerate(types)}
+        # 국가별 유형 내림차순 순서
+        self.country_order = np.argsort(-values, axis=1, kind="stable")
+        # 유형별 국가 내림차순 순서와 순위 (1 = 가장 높음)
+        self.type_order = np.argsort(-values, axis=0, kind="stable").T
+        self.type_rank = np.empty_like(self.type_order)
+        np.put_along_axis(
+            self.type_rank, self.type_order, np.arange(1, len(countries) + 1)[None, :], axis=1
+        )
+
+    def country_profile(self, country):
+        """선택 국가의 (유형 목록, 비율 배열), 비율 내림차순."""
+        i = self.index[country]
+        order = self.country_order[i]
+        return [self.types[j] for j in order], self.values[i, order]
+
+    def top_countries(self, mbti, n=10, include=None):
+        """유형별 상위 n개 국가 DataFrame [Country, 유형, 순위].
+
+        include 국가가 상위 n개 밖이면 맨 뒤에 붙입니다.
+        """
+        j = self.type_index[mbti]
+        rows = list(self.type_order[j, :n])
+        if include in self.index and self.index[include] not in rows:
+            rows.append(self.index[include])
+        return pd.DataFrame({
+            COUNTRY_COL: [self.countries[i] for i in rows],
+            mbti: self.values[rows, j],
+            "순위": self.type_rank[j, rows],
+        })
+
+    def rank_of(self, country, mbti):
+        return int(self.type_rank[self.type_index[mbti], self.index[country]])
+
+
+def build_mbti_matrix(df):
+    """국가별 MBTI 비율 DataFrame → MbtiMatrix. 같은 국가가 여러 번 나오면 첫 행 사용."""
+    df = df.drop_duplicates(COUNTRY_COL)
+    types = [c for c in df.columns if c != COUNTRY_COL]
+    values = df[types].to_numpy(dtype=np.float32)
+    return MbtiMatrix(df[COUNTRY_COL].astype(str).tolist(), types, values)
@@ -0,0 +1,149 @@
+# MBTI 분포가 비슷한 국가 찾기 / 계층적 군집
+#
+# 거리 계산은 행 블록 단위로 나눠 해서, 한 번에 잡는 메모리가 max_block_bytes 를 넘지 않습니다.
+# 이웃 검색(nearest_neighbors)은 (행 수 × k) 만 남기므로 수만 행에서도 쓸 수 있고,
+# 전체 거리 행렬이 필요한 군집(average_linkage)은 행 수가 적을 때만 씁니다.
+import numpy as np
+
+METRICS = ("jensenshannon", "cosine")
+MAX_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def normalize_rows(values):
+    """각 행의 합이 1 이 되도록 (음수는 0 으로) 맞춘 float64 배열."""
+    values = np.clip(np.asarray(values, dtype=np.float64), 0, None)
+    sums = values.sum(axis=1, keepdims=True)
+    sums[sums == 0] = 1
+    return values / sums
+
+
+def _neg_entropy(p):
+    # sum p log p (0 log 0 = 0), 마지막 축 기준
+    logp = np.log(p, out=np.zeros_like(p), where=p > 0)
+    return (p * logp).sum(axis=-1)
+
+
+def _block_distance(a, b, metric, b_norm=None, b_negent=None):
+    """a (r, d) 와 b (n, d) 사이의 (r, n) 거리 행렬."""
+    if metric == "cosine":
+        a_norm = np.linalg.norm(a, axis=1)
+        denom = np.outer(a_norm, b_norm)
+        denom[denom == 0] = 1
+        return np.clip(1 - a @ b.T / denom, 0, 2)
+    # Jensen-Shannon: JS(p, q) = H(m) - (H(p) + H(q)) / 2,  m = (p + q) / 2
+    # (r, n, d) 중간 배열은 float32 로 계산 (메모리/속도 절반)
+    m = (a[:, None, :].astype(np.float32) + b[None, :, :].astype(np.float32)) * np.float32(0.5)
+    js = (_neg_entropy(a)[:, None] + b_negent[None, :]) / 2 - _neg_entropy(m)
+    return np.sqrt(np.clip(js / np.log(2), 0, 1))
+
+
+def _iter_blocks(x, metric, max_block_bytes):
+    """(시작 행, 거리 블록) 을 차례로 돌려줍니다."""
+    if metric not in METRICS:
+        raise ValueError(f"지원하지 않는 거리: {metric} (가능: {METRICS})")
+    n, d = x.shape
+    # JS 는 (r, n, d) float32 중간 배열 두 개, cosine 은 (r, n) 만 필요
+    per_row = n * (2 * d * 4 if metric == "jensenshannon" else 8)
+    rows = max(1, min(n, max_block_bytes // max(per_row, 1)))
+    b_norm = np.linalg.norm(x, axis=1) if metric == "cosine" else None
+    b_negent = _neg_entropy(x) if metric == "jensenshannon" else None
+    for start in range(0, n, rows):
+        yield start, _block_distance(x[start:start + rows], x, metric, b_norm, b_negent)
+
+
+def pairwise_distance(values, metric="jensenshannon", max_block_bytes=MAX_BLOCK_BYTES):
+    """전체 (n, n) float32 거리 행렬. 결과 자체가 n² 이므로 행 수가 적을 때만 씁니다."""
+    x = normalize_rows(values)
+    out = np.empty((len(x), len(x)), dtype=np.float32)
+    for start, block in _iter_blocks(x, metric, max_block_bytes):
+        out[start:start + len(block)] = block
+    np.fill_diagonal(out, 0)
+    return out
+
+
+def nearest_neighbors(values, k=10, metric="jensenshannon", max_block_bytes=MAX_BLOCK_BYTES):
+    """행마다 자기 자신을 뺀 가장 가까운 k개의 (인덱스, 거리), 둘 다 (n, k) 배열."""
+    x = normalize_rows(values)
+    n = len(x)
+    k = min(k, n - 1)
+    idx = np.empty((n, k), dtype=np.int64)
+    dist = np.empty((n, k), dtype=np.float32)
+    if k <= 0:
+        return idx, dist
+    for start, block in _iter_blocks(x, metric, max_block_bytes):
+        r = np.arange(len(block))
+        block[r, start + r] = np.inf
+        part = np.argpartition(block, k - 1, axis=1)[:, :k]
+        part_d = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(part_d, axis=1, kind="stable")
+        idx[start:start + len(block)] = np.take_along_axis(part, order, axis=1)
+        dist[start:start + len(block)] = np.take_along_axis(part_d, order, axis=1)
+    return idx, dist
+
+
+def average_linkage(dist):
+    """평균 연결 계층적 군집 (nearest-neighbor chain, O(n²)).
+
+    합쳐진 순서대로 (a, b, 거리) 목록을 거리 오름차순으로 돌려줍니다.
+    a, b 는 각 군집에 속한 아무 원소 번호입니다.
+    """
+    d = np.array(dist, dtype=np.float64)
+    n = len(d)
+    np.fill_diagonal(d, np.inf)
+    size = np.ones(n)
+    active = np.ones(n, dtype=bool)
+    merges, chain = [], []
+    for _ in range(n - 1):
+        if not chain:
+            chain.append(int(np.flatnonzero(active)[0]))
+        while True:
+            a = chain[-1]
+            b = int(np.argmin(d[a]))
+            if len(chain) > 1 and d[a, chain[-2]] <= d[a, b]:
+                b = chain[-2]
+            if len(chain) > 1 and b == chain[-2]:
+                break
+            chain.append(b)
+        b, a = chain.pop(), chain.pop()
+        merges.append((a, b, float(d[a, b])))
+        # Lance-Williams (평균 연결): 새 군집은 a 자리에 두고 b 는 비활성화
+        new = (size[a] * d[a] + size[b] * d[b]) / (size[a] + size[b])
+        d[a], d[:, a] = new, new
+        d[b], d[:, b] = np.inf, np.inf
+        d[a, a] = np.inf
+        size[a] += size[b]
+        active[b] = False
+    merges.sort(key=lambda m: m[2])
+    return merges
+
+
+def cut_clusters(merges, n, n_clusters):
+    """군집 수가 n_clusters 가 될 때까지 합친 결과.
+
+    (군집 번호 배열, 덴드로그램 잎 순서) 를 돌려줍니다.
+    """
+    parent = list(range(n))
+    members = {i: [i] for i in range(n)}
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def snapshot():
+        roots = [find(i) for i in range(n)]
+        _, labels = np.unique(roots, return_inverse=True)
+        return labels
+
+    n_clusters = min(max(n_clusters, 1), n)
+    labels = snapshot() if n_clusters == n else None
+    # 남은 병합까지 모두 진행해 잎 순서(덴드로그램 순서)도 같이 구함
+    for step, (a, b, _) in enumerate(merges, start=1):
+        ra, rb = find(a), find(b)
+        parent[rb] = ra
+        members[ra] += members.pop(rb)
+        if step == n - n_clusters:
+            labels = snapshot()
+    order = [i for root in sorted(members) for i in members[root]]
+    return labels, np.array(order, dtype=np.int64)
@@ -0,0 +1,16 @@
+# 프로젝트 경로 모음
+import os
+
+# 저장소 루트 (main.py, pages/ 가 있는 곳)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 데이터 CSV 가 있는 곳. 기본은 루트, 벤치마크 등에서는 APP_DATA_DIR 로 바꿀 수 있음
+DATA_ROOT = os.environ.get("APP_DATA_DIR", ROOT)
+
+# 변환된 바이너리 저장소 등 파생 데이터를 두는 곳
+STORE_DIR = os.path.join(DATA_ROOT, "data")
+
+
+def data_path(name):
+    """데이터 폴더 기준 파일 경로."""
+    return os.path.join(DATA_ROOT, name)
@@ -0,0 +1,134 @@
+# 다음에 고를 가능성이 큰 선택(다음 날짜, 옆 노선, 다음 품목)의 그래프를 백그라운드 스레드에서 미리 만들기
+#
+#   jobs = [charts.figure_job("subway_top10", (d, line), build, depends=["subway_partitions"])
+#           for d in prefetch.neighbors(unique_dates, selected_date)]
+#   prefetch.schedule(jobs)                  # 페이지 맨 아래, 화면을 다 그린 뒤
+#
+# - 작업은 스레드 풀(MAX_WORKERS 개)에서 돌아 지금 rerun 은 기다리지 않습니다.
+# - 같은 세션이 다시 예약하면 아직 시작하지 않은 지난 예약은 취소합니다 (선택을 빨리 넘기면 지난 후보는 버림).
+# - 그래프 캐시(charts.FigureCache)가 MAX_FIGURE_BYTES 의 PREFETCH_FILL 이상 차 있으면 더 예약하지 않아
+#   미리 만든 그래프가 지금 보고 있는 그래프를 밀어내지 않습니다.
+# - APP_PREFETCH=0 이면 아무것도 하지 않습니다.
+import collections
+import concurrent.futures
+import os
+import threading
+
+import streamlit as st
+
+from core import charts
+
+MAX_WORKERS = 2
+MAX_PENDING = 8         # 세션 하나가 한 번에 예약할 수 있는 작업 수
+PREFETCH_FILL = 0.75    # 그래프 캐시가 이만큼 차면 예약하지 않음
+
+
+def enabled():
+    return os.environ.get("APP_PREFETCH") != "0"
+
+
+def neighbors(options, current, n=1):
+    """options 에서 current 옆의 값들 [다음, 이전, 다다음, 전전 ...] (양쪽 n 개씩, 끝에서는 있는 만큼)."""
+    options = list(options)
+    try:
+        i = options.index(current)
+    except ValueError:
+        return []
+    out = []
+    for step in range(1, n + 1):
+        for j in (i + step, i - step):
+            if 0 <= j < len(options):
+                out.append(options[j])
+    return out
+
+
+class Prefetcher:
+    """세션(scope)마다 예약한 작업을 스레드 풀에서 돌리고, 다시 예약하면 시작 안 한 지난 작업은 취소."""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=MAX_PENDING):
+        self.max_pending = max_pending
+        self.stats = collections.Counter()     # scheduled / done / failed / cancelled / skipped
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers, thread_name_prefix="app-prefetch")
+        self._pending = {}                      # scope → [Future]
+        self._lock = threading.Lock()
+
+    def schedule(self, scope, jobs, full=lambda: False):
+        """jobs (인자 없는 함수, None 은 건너뜀) 를 앞에서부터 예약하고 예약한 수를 돌려줍니다.
+
+        full() 이 참이면 그 뒤 작업은 예약하지 않습니다 (메모리 상한).
+        """
+        self.cancel(scope)
+        futures = []
+        for job in jobs:
+            if job is None:
+                continue
+            if len(futures) >= self.max_pending or full():
+                self._count("skipped")
+                continue
+            futures.append(self._pool.submit(self._run, job))
+            self._count("scheduled")
+        with self._lock:
+            # 끝난 세션의 예약은 버림 (세션이 닫혀도 scope 가 남지 않게)
+            self._pending = {k: fs for k, fs in self._pending.items() if not all(f.done() for f in fs)}
+            self._pending[scope] = futures
+        return len(futures)
+
+    def cancel(self, scope):
+        """scope 의 예약 중 아직 시작하지 않은 것을 취소하고 그 수를 돌려줍니다."""
+        with self._lock:
+            futures = self._pending.pop(scope, [])
+        cancelled = sum(f.cancel() for f in futures)
+        self._count("cancelled", cancelled)
+        return cancelled
+
+    def wait(self, scope=None, timeout=None):
+        """scope (None 이면 모든 세션) 의 예약이 모두 끝날 때까지 기다립니다. 다 끝났으면 True."""
+        with self._lock:
+            if scope is None:
+                futures = [f for fs in self._pending.values() for f in fs]
+            else:
+                futures = list(self._pending.get(scope, []))
+        _, not_done = concurrent.futures.wait(futures, timeout)
+        return not not_done
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def _run(self, job):
+        try:
+            job()
+        except Exception:       # 미리 만들기는 실패해도 그만 (그 선택을 고르면 페이지가 다시 만듦)
+            self._count("failed")
+        else:
+            self._count("done")
+
+
+@st.cache_resource
+def get_prefetcher():
+    # 프로세스 안의 모든 세션이 같은 스레드 풀을 씀
+    return Prefetcher()
+
+
+def session_scope():
+    """지금 세션을 구분하는 값 (Streamlit 밖이면 빈 문자열)."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else ""
+
+
+def cache_full():
+    cache = charts.get_cache()
+    return cache.nbytes >= cache.max_bytes * PREFETCH_FILL
+
+
+def schedule(jobs):
+    """지금 세션의 미리 만들기 작업을 예약합니다 (지난 예약은 취소). 예약한 수."""
+    if not enabled():
+        return 0
+    return get_prefetcher().schedule(session_scope(), jobs, full=cache_full)
+
+
+def wait(timeout=None):
+    """모든 세션이 예약한 작업이 끝날 때까지 기다립니다 (벤치마크에서 단계 사이에)."""
+    return get_prefetcher().wait(None, timeout)
@@ -0,0 +1,112 @@
+# 품목 × 동네 가격 행렬과 품목별 통계를 한 번에 계산
+#
+# 콤마 제거/숫자 변환은 표 전체에 한 번만 하고, 품목별 평균/최저/최고/순위는
+# NumPy 로 일괄 계산해 둡니다. 품목을 바꿀 때는 행 하나만 꺼내 씁니다.
+# 빈 칸을 구평균가격(없으면 그 품목의 동네 평균)으로 채운 행렬도 한 번 만들어 두어
+# 장바구니 비용(품목별 수량 · 동네별 가격)은 행렬-벡터 곱 한 번으로 계산합니다.
+import numpy as np
+import pandas as pd
+
+NON_REGION_COLS = ["품목", "조사기준", "구평균가격"]
+
+
+def clean_numeric(frame):
+    """문자열 가격 표(콤마, 공백 포함)를 float 행렬로 바꿉니다. 숫자가 아니면 NaN."""
+    if all(pd.api.types.is_numeric_dtype(t) for t in frame.dtypes):
+        # core.schema.compact_prices 로 이미 숫자로 바뀐 표
+        return frame.to_numpy(dtype=np.float64)
+    flat = pd.Series(frame.astype(str).to_numpy().ravel())
+    values = pd.to_numeric(flat.str.replace(",", "", regex=False).str.strip(), errors="coerce")
+    return values.to_numpy(dtype=np.float64).reshape(frame.shape)
+
+
+class PriceTable:
+    """build_price_table() 결과. 행 = products, 열 = regions."""
+
+    def __init__(self, products, regions, prices, rows, district_mean=None):
+        self.products = products        # 정렬된 품목 이름 목록
+        self.regions = regions          # 동네 컬럼 이름 목록
+        self.prices = prices            # (품목 수, 동네 수) float32, 같은 품목 여러 행은 평균, 없으면 NaN
+        self.rows = rows                # 품목 → 원본 DataFrame 행 번호 배열
+        if district_mean is None:
+            district_mean = np.full(len(products), np.nan, dtype=np.float32)
+        self.district_mean = district_mean      # 품목별 구평균가격 (없으면 NaN)
+        self.index = {p: i for i, p in enumerate(products)}
+
+        valid = ~np.isnan(prices)
+        self.counts = valid.sum(axis=1)
+        has_any = self.counts > 0
+        low = np.where(valid, prices, np.inf)
+        high = np.where(valid, prices, -np.inf)
+        self.argmin = np.where(has_any, low.argmin(axis=1), -1)
+        self.argmax = np.where(has_any, high.argmax(axis=1), -1)
+        r = np.arange(len(products))
+        self.min = np.where(has_any, prices[r, self.argmin], np.nan)
+        self.max = np.where(has_any, prices[r, self.argmax], np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.mean = np.where(valid, prices, 0).sum(axis=1, dtype=np.float64) / self.counts
+        # 가격 오름차순 동네 순서 (각 행의 앞 counts[i] 개만 유효, NaN 은 뒤로)
+        self.order = np.argsort(low, axis=1, kind="stable")
+        # 동네별 순위 (1 = 가장 저렴, NaN 은 0)
+        self.rank = np.zeros_like(self.order)
+        np.put_along_axis(self.rank, self.order, np.arange(1, len(regions) + 1)[None, :], axis=1)
+        self.rank[~valid] = 0
+
+        # 빈 칸 채우기: 구평균가격 → 없으면 품목의 동네 평균 → 그것도 없으면 0 (priced = False)
+        fallback = np.where(np.isnan(district_mean), self.mean, district_mean)
+        self.priced = ~np.isnan(fallback)
+        self.missing = ~valid
+        self.filled = np.where(valid, prices, np.nan_to_num(fallback)[:, None]).astype(np.float32)
+        # [채운 행렬, 채운 칸만 남긴 행렬]: 수량 벡터와 한 번 곱하면 (비용, 그중 채운 값) 이 같이 나옴
+        self._basket = np.stack([self.filled, np.where(self.missing, self.filled, 0)])
+
+    def region_prices(self, product):
+        """선택 품목의 동네별 가격 Series (가격 내림차순, NaN 제외)."""
+        i = self.index[product]
+        order = self.order[i, :self.counts[i]][::-1]
+        return pd.Series(self.prices[i, order], index=[self.regions[j] for j in order])
+
+    def basket_cost(self, weights):
+        """품목별 수량 (품목 수,) → (동네별 장바구니 비용, 동네별 그중 빈 칸을 채운 값의 비율)."""
+        weights = np.asarray(weights, dtype=np.float32)
+        if weights.shape != (len(self.products),):
+            raise ValueError(f"수량은 품목 수({len(self.products)})만큼이어야 합니다: {weights.shape}")
+        cost, imputed = weights @ self._basket
+        with np.errstate(invalid="ignore", divide="ignore"):
+            share = np.where(cost > 0, imputed / cost, 0.0)
+        return cost, share
+
+    def summary(self, product):
+        """(최저 동네, 최저가, 최고 동네, 최고가, 평균가)."""
+        i = self.index[product]
+        if self.counts[i] == 0:
+            return None, np.nan, None, np.nan, np.nan
+        return (self.regions[self.argmin[i]], self.min[i],
+                self.regions[self.argmax[i]], self.max[i], self.mean[i])
+
+
+def build_price_table(df, region_cols=None):
+    """원본 DataFrame 에서 PriceTable 을 만듭니다. 같은 품목 여러 행은 동네별 평균."""
+    if region_cols is None:
+        region_cols = [c for c in df.columns if c not in NON_REGION_COLS]
+    names = df["품목"].astype(str)
+    codes, uniques = pd.factorize(names, sort=True)
+    # 구평균가격은 맨 끝 열로 같이 평균 내고 떼어 냄
+    has_district = "구평균가격" in df.columns
+    values = clean_numeric(df[list(region_cols) + (["구평균가격"] if has_district else [])])
+
+    n = len(uniques)
+    valid = ~np.isnan(values)
+    sums = np.zeros((n, values.shape[1]))
+    counts = np.zeros((n, values.shape[1]))
+    np.add.at(sums, codes, np.where(valid, values, 0))
+    np.add.at(counts, codes, valid)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = (sums / counts).astype(np.float32)    # 값이 하나도 없는 칸은 0/0 = NaN
+    prices = means[:, :len(region_cols)]
+    district_mean = means[:, len(region_cols)] if has_district else None
+
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(n + 1))
+    rows = {p: order[bounds[i]:bounds[i + 1]] for i, p in enumerate(uniques.tolist())}
+    return PriceTable(uniques.tolist(), list(region_cols), np.ascontiguousarray(prices), rows, district_mean)
@@ -0,0 +1,220 @@
+# rerun 단계별 시간/메모리 할당 측정 + 캐시 적중 여부 기록
+#
+#   prof = profiling.begin("04_지하철")
+#   with profiling.stage("load"):
+#       ...
+#   profiling.finish()          # 디버그 패널(사이드바) 표시 + JSON lines 로그 기록
+#
+# @st.cache_data / @st.cache_resource 대신 @profiling.cached() / @profiling.cached(resource=True)
+# 를 쓰면 호출마다 적중(hit)/미스(miss)와 걸린 시간이 기록됩니다.
+#
+# 디버그 패널은 주소에 ?debug=1 을 붙이거나 APP_DEBUG=1 일 때 보입니다.
+# 메모리 할당(tracemalloc)은 실행을 몇 배 느리게 하므로 디버그 패널이 켜진 rerun 이나
+# APP_PROFILE_MEMORY=1 일 때만 잽니다.
+import contextlib
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+import tracemalloc
+
+import streamlit as st
+
+from core.paths import STORE_DIR
+
+LOG_PATH = os.path.join(STORE_DIR, "logs", "profile.jsonl")
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+_local = threading.local()
+_trace_lock = threading.Lock()
+_trace_users = 0
+_logger = None
+
+
+class RerunProfile:
+    """rerun 한 번의 측정 결과."""
+
+    def __init__(self, page, trace_memory):
+        self.page = page
+        self.trace_memory = trace_memory
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.stages = []    # {"stage", "seconds", "alloc_kb", "peak_kb"}
+        self.caches = []    # {"function", "hit", "seconds"}
+
+    @property
+    def total_seconds(self):
+        return time.perf_counter() - self._t0
+
+    def to_dict(self):
+        return {
+            "ts": round(self.started, 3),
+            "page": self.page,
+            "total_seconds": round(self.total_seconds, 4),
+            "stages": self.stages,
+            "caches": self.caches,
+        }
+
+
+def debug_enabled():
+    if os.environ.get("APP_DEBUG") == "1":
+        return True
+    try:
+        return st.query_params.get("debug") == "1"
+    except Exception:
+        return False
+
+
+def _start_tracing():
+    global _trace_users
+    with _trace_lock:
+        _trace_users += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def _stop_tracing():
+    global _trace_users
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0 and os.environ.get("APP_PROFILE_MEMORY") != "1":
+            tracemalloc.stop()
+
+
+def begin(page):
+    """페이지 맨 위에서 호출. 이번 rerun 의 측정을 시작합니다."""
+    previous = current()
+    if previous is not None and previous.trace_memory:
+        # 지난 rerun 이 st.stop() 등으로 finish() 없이 끝난 경우
+        _stop_tracing()
+    trace = debug_enabled() or os.environ.get("APP_PROFILE_MEMORY") == "1"
+    if trace:
+        _start_tracing()
+    _local.profile = RerunProfile(page, trace)
+    _local.cache_stack = []
+    return _local.profile
+
+
+def current():
+    return getattr(_local, "profile", None)
+
+
+@contextlib.contextmanager
+def stage(name):
+    """한 단계(load, preprocess, filter, figure, render ...)의 시간과 할당량을 잽니다."""
+    prof = current()
+    tracing = prof is not None and prof.trace_memory and tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if prof is not None:
+            record = {"stage": name, "seconds": round(time.perf_counter() - start, 4)}
+            if tracing:
+                now, peak = tracemalloc.get_traced_memory()
+                record["alloc_kb"] = round((now - before) / 1024, 1)
+                record["peak_kb"] = round((peak - before) / 1024, 1)
+            prof.stages.append(record)
+
+
+def cached(resource=False, **cache_kwargs):
+    """st.cache_data(또는 resource=True 면 st.cache_resource)와 같고, 적중 여부를 기록합니다."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            # 캐시 미스일 때만 실행됨
+            stack = getattr(_local, "cache_stack", None)
+            if stack:
+                stack[-1] = False
+            return fn(*args, **kwargs)
+
+        cache = st.cache_resource if resource else st.cache_data
+        cached_fn = cache(**cache_kwargs)(body)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            stack = getattr(_local, "cache_stack", None)
+            if stack is None:
+                stack = _local.cache_stack = []
+            stack.append(True)
+            start = time.perf_counter()
+            try:
+                return cached_fn(*args, **kwargs)
+            finally:
+                hit = stack.pop()
+                prof = current()
+                if prof is not None:
+                    prof.caches.append({
+                        "function": fn.__name__,
+                        "hit": hit,
+                        "seconds": round(time.perf_counter() - start, 4),
+                    })
+
+        wrapper.clear = cached_fn.clear
+        return wrapper
+    return decorator
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
+        logger = logging.getLogger("app.profile")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = logging.handlers.RotatingFileHandler(
+            LOG_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        _logger = logger
+    return _logger
+
+
+def render_panel(prof):
+    """사이드바 디버그 패널."""
+    with st.sidebar.expander("⏱️ 성능 (debug)", expanded=True):
+        st.write(f"rerun 전체: {prof.total_seconds * 1000:.1f} ms")
+        if prof.stages:
+            st.dataframe(prof.stages, hide_index=True)
+        if prof.caches:
+            st.dataframe(
+                [{**c, "hit": "hit" if c["hit"] else "miss"} for c in prof.caches], hide_index=True
+            )
+        from core import registry   # registry 가 이 모듈을 import 하므로 여기서 가져옴
+        datasets = registry.get_registry().report()
+        if len(datasets):
+            rss = registry.process_rss()
+            st.write("공유 데이터셋" + (f" (프로세스 RSS {rss / 2**20:.0f} MB)" if rss else ""))
+            st.dataframe(datasets, hide_index=True)
+        from core import warmup
+        if warmup.started():
+            st.write("백그라운드 워밍업" + ("" if warmup.wait(0) else " (진행 중)"))
+            st.dataframe(warmup.status(), hide_index=True)
+        from core import charts, prefetch
+        figures = charts.get_cache()
+        st.write(f"그래프 캐시 {len(figures)}개 ({figures.nbytes / 2**20:.1f} MB), 적중 {figures.hits} / 미스 {figures.misses}")
+        if prefetch.enabled():
+            st.write("미리 만들기: " + ", ".join(f"{k} {v}" for k, v in sorted(prefetch.get_prefetcher().stats.items())))
+
+
+def finish():
+    """페이지 맨 아래에서 호출. 디버그 패널을 그리고 로그에 한 줄 남깁니다."""
+    prof = current()
+    if prof is None:
+        return None
+    _local.profile = None
+    if prof.trace_memory:
+        _stop_tracing()
+    if debug_enabled():
+        render_panel(prof)
+    if os.environ.get("APP_PROFILE_LOG") != "0":
+        _get_logger().info(json.dumps(prof.to_dict(), ensure_ascii=False))
+    return prof
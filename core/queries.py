@@ -0,0 +1,340 @@
+# 페이지들이 계산하는 데이터셋과 조회를 Streamlit 없이도 부를 수 있게 모은 모듈
+#
+# 데이터셋 (모든 세션/요청이 한 벌 공유, 디스크 캐시에도 저장):
+#   subway_sources() / subway_index() / subway_topk() / subway_prefix() / station_index() / subway_anomalies()
+#   subway_top(sources, date, line)  (날짜, 노선) 하나만 저장소에서 읽어 상위 역
+#   price_frame() / price_table()
+#   mbti_matrix() / mbti_neighbors() / mbti_clusters()
+#   attractions() / attractions_grid() / attractions_distances()
+#
+# 조회 (JSON 으로 바로 내보낼 수 있는 dict 를 돌려줌, core/api_server.py 가 씀):
+#   top_stations(date, line, k)      지하철 페이지: (날짜, 노선)별 상위 역
+#   price_extremes(product)          가격 페이지: 가장 싼/비싼 동네
+#   mbti_distribution(country)       MBTI 페이지: 국가별 유형 비율
+#   mbti_top_countries(mbti, n)      MBTI 페이지: 유형별 상위 국가
+import pandas as pd
+
+from core import (
+    csv_loader, disk_cache, itinerary, mbti_matrix as mbti_matrix_module, mbti_similarity,
+    price_table as price_table_module, profiling, registry, schema, subway_anomaly, subway_range,
+    subway_topk as subway_topk_module,
+)
+from core.csv_loader import read_csv
+from core.mbti_matrix import build_mbti_matrix
+from core.mbti_similarity import average_linkage, nearest_neighbors, pairwise_distance
+from core.paths import data_path
+from core.price_table import NON_REGION_COLS, build_price_table
+from core.schema import compact_prices
+from core.spatial import GridIndex
+from core.station_search import StationIndex
+from core.subway_ingest import current_sources, iter_sources, source_files
+from core.subway_store import list_partitions, load_partitions
+from core.subway_topk import TOTAL_COL, IncrementalTopK, build_topk_cube, lookup_topk
+
+PP_CSV = data_path("pp.csv")
+MBTI_CSV = data_path("countriesMBTI_16types.csv")
+ATTRACTIONS_CSV = data_path("attractions.csv")
+TOP_K = 10
+MAX_NEIGHBORS = 20
+
+
+class NotFound(KeyError):
+    """조회한 키(날짜/노선/품목/국가 등)가 데이터에 없음."""
+
+
+# ------------------------------------
+# 지하철 (저장소 내용이 바뀌면 sources 가 바뀌어 새로 만듦)
+# ------------------------------------
+def subway_sources():
+    # 새 월별 파일(CARD_SUBWAY_MONTH_*.csv)만 저장소에 추가. 데이터 폴더가 그대로면 잠깐 동안은 다시 훑지 않음
+    return current_sources()
+
+
+def subway_index(sources):
+    """(날짜 목록, 노선 목록). 저장소의 날짜/노선 두 열만 읽어 가져옴."""
+    # 목록에서 뺀 원본(월별 파일과 겹치는 subway.csv)은 저장소에 남아 있어도 보지 않음
+    return registry.dataset("subway_partitions", sources, lambda: list_partitions(files=source_files(sources)))
+
+
+def _resume(name, builder, sources, modules, params=()):
+    """증분 빌더를 디스크의 지난 상태에서 이어 sources 까지 갱신합니다 (새 원본 파일분만 처리).
+
+    상태는 원본 목록 없이 저장하므로(disk_cache.checkpoint) 새 달이 들어와 서버를 다시 띄워도 이어 갑니다.
+    """
+    saved = disk_cache.checkpoint(name, params=params, modules=modules)
+    if saved is not None:
+        builder.restore(saved)
+    before = builder.sources
+    result = builder.update(sources, iter_sources)
+    if builder.sources != before:
+        disk_cache.save_checkpoint(name, builder.checkpoint(), params=params, modules=modules)
+    return result
+
+
+@profiling.cached(resource=True)
+def _topk_builder(k):
+    # 새 달 파일이 들어오면 그 파일분만 읽어 큐브에 더함
+    return IncrementalTopK(k)
+
+
+def subway_topk(sources, k=TOP_K):
+    """(날짜, 노선)별 상위 k개 역 큐브."""
+    return registry.dataset("subway_topk", (sources, k), lambda: _resume(
+        "subway_topk", _topk_builder(k), sources, [schema, subway_topk_module], params=[k],
+    ))
+
+
+@profiling.cached(resource=True, max_entries=256)
+def _top_partition(sources, date, line, k):
+    df = load_partitions([date], [line], files=source_files(sources))
+    return lookup_topk(build_topk_cube(df, k), date, line)
+
+
+def subway_top(sources, date, line, k=TOP_K):
+    """(날짜, 노선) 하나의 상위 k개 역. 저장소에서 그 날짜/노선 row group 만 읽음 (전체 큐브를 만들지 않음)."""
+    return _top_partition(sources, int(date), line, int(k))
+
+
+@profiling.cached(resource=True)
+def _prefix_builder():
+    # 새 달 파일이 들어오면 그 파일분만 일 승객수 배열에 더하고 바뀐 날짜부터 누적합을 다시 셈
+    return subway_range.IncrementalPrefix()
+
+
+def subway_prefix(sources):
+    """역 × 날짜 누적합 (기간 합계 / 이동평균 / 전주 대비 조회용). 원본은 날짜 구간별로 읽어 더하고 버림."""
+    return registry.dataset("subway_prefix", sources, lambda: _resume(
+        "subway_prefix", _prefix_builder(), sources, [schema, subway_range],
+    ))
+
+
+@profiling.cached(resource=True)
+def _station_indexes():
+    # 마지막으로 만든 역 검색 인덱스 (역 목록이 그대로면 트라이는 다시 만들지 않음)
+    return {}
+
+
+def station_index(sources):
+    """역 이름 검색 인덱스 (앞글자 / 초성 / 오타 허용) + 역 → 누적합 배열 행."""
+    def build():
+        prefix = subway_prefix(sources)
+        weights = prefix.csum[:, -1]
+        last = _station_indexes().get("last")
+        if last is not None and last.same_stations(prefix.stations):
+            index = last.with_weights(weights)
+        else:
+            index = StationIndex(prefix.stations, weights=weights)
+        _station_indexes()["last"] = index
+        return index
+    return registry.dataset("station_index", sources, build)
+
+
+@profiling.cached(resource=True)
+def _anomaly_builder():
+    # 새 달 파일이 들어오면 그 파일의 날짜만 기준 버퍼에 더함
+    return subway_anomaly.IncrementalAnomaly()
+
+
+def subway_anomalies(sources):
+    """역별 이상(같은 요일 기준 robust z) / 노선별 추세 전환 (AnomalyReport)."""
+    return registry.dataset("subway_anomalies", sources, lambda: _resume(
+        "subway_anomaly", _anomaly_builder(), sources, [schema, subway_anomaly],
+    ))
+
+
+# ------------------------------------
+# 가격 (CSV 가 바뀌면 새로 만듦)
+# ------------------------------------
+def price_frame(path=PP_CSV):
+    """(가격 DataFrame, 인코딩). 가격은 float32, 품목/조사기준은 범주형으로 한 번만 변환."""
+    def build():
+        # 앞부분 바이트로 인코딩을 판별한 뒤 한 번만 파싱 (판별이 안 되면 ValueError)
+        df, encoding = read_csv(path)
+        return compact_prices(df), encoding
+    return registry.dataset("pp_raw", registry.file_key(path), lambda: disk_cache.artifact(
+        "pp_raw", build, files=[path], modules=[csv_loader, schema]
+    ))
+
+
+def region_columns(df):
+    """가격 표에서 동네 컬럼만 ('품목', '조사기준', '구평균가격' 제외)."""
+    return [c for c in df.columns if c not in NON_REGION_COLS]
+
+
+def price_table(path=PP_CSV):
+    """품목 × 동네 가격 행렬과 품목별 평균/최저/최고/순위 (PriceTable)."""
+    def build():
+        df, _ = price_frame(path)
+        return build_price_table(df, region_columns(df))
+    return registry.dataset("price_table", registry.file_key(path), lambda: disk_cache.artifact(
+        "price_table", build, files=[path], modules=[schema, price_table_module],
+    ))
+
+
+# ------------------------------------
+# MBTI (CSV 가 바뀌면 새로 만듦)
+# ------------------------------------
+def mbti_matrix(path=MBTI_CSV):
+    """국가 × 유형 행렬 + 미리 계산한 순위 (MbtiMatrix)."""
+    return registry.dataset("mbti_matrix", registry.file_key(path), lambda: disk_cache.artifact(
+        "mbti_matrix", lambda: build_mbti_matrix(pd.read_csv(path)),
+        files=[path], modules=[mbti_matrix_module],
+    ))
+
+
+def mbti_neighbors(metric, path=MBTI_CSV):
+    """국가별 가장 비슷한 MAX_NEIGHBORS 개 (인덱스 행렬, 거리 행렬)."""
+    return registry.dataset(f"mbti_neighbors/{metric}", registry.file_key(path), lambda: disk_cache.artifact(
+        f"mbti_neighbors-{metric}", lambda: nearest_neighbors(mbti_matrix(path).values, MAX_NEIGHBORS, metric),
+        files=[path], params=[MAX_NEIGHBORS], modules=[mbti_matrix_module, mbti_similarity],
+    ))
+
+
+def mbti_clusters(metric, path=MBTI_CSV):
+    """(전체 거리 행렬, 평균 연결 병합 기록)."""
+    def build():
+        dist = pairwise_distance(mbti_matrix(path).values, metric)
+        return dist, average_linkage(dist)
+    return registry.dataset(f"mbti_clusters/{metric}", registry.file_key(path), build)
+
+
+# ------------------------------------
+# 관광지 (CSV 가 바뀌면 새로 만듦)
+# ------------------------------------
+def attractions(path=ATTRACTIONS_CSV):
+    """관광지 DataFrame (인기지수 내림차순)."""
+    def build():
+        df, _ = read_csv(path)
+        return df.sort_values("인기지수(%)", ascending=False, kind="stable").reset_index(drop=True)
+    return registry.dataset("attractions", registry.file_key(path), build)
+
+
+def attractions_grid(path=ATTRACTIONS_CSV):
+    """가까운 관광지 / 반경 검색용 1km 격자 인덱스 (attractions() 의 행 순서)."""
+    def build():
+        df = attractions(path)
+        return GridIndex(df["위도"], df["경도"], cell_km=1.0)
+    return registry.dataset("attractions_grid", registry.file_key(path), build)
+
+
+def attractions_distances(path=ATTRACTIONS_CSV):
+    """관광지 사이 거리 (DistanceTable, attractions() 의 행 순서). 작으면 전체 행렬을 한 번만 계산."""
+    def build():
+        df = attractions(path)
+        return itinerary.DistanceTable(df["위도"], df["경도"])
+    return registry.dataset("attractions_distances", registry.file_key(path), build)
+
+
+@profiling.cached(resource=True, max_entries=64)
+def _route(key, start, stops, pop_weight, path):
+    route = itinerary.plan(attractions_distances(path), start, stops, attractions(path)["인기지수(%)"], pop_weight)
+    route.rows.flags.writeable = route.legs.flags.writeable = False
+    return route
+
+
+def attraction_route(start, stops, pop_weight=itinerary.POP_WEIGHT, path=ATTRACTIONS_CSV):
+    """start 행에서 출발해 stops 행을 모두 들르는 동선 (Route). 같은 선택은 다시 계산하지 않음."""
+    return _route(registry.file_key(path), int(start), tuple(sorted(int(s) for s in stops)), float(pop_weight), path)
+
+
+# ------------------------------------
+# 조회
+# ------------------------------------
+def _jsonable(v):
+    if hasattr(v, "isoformat"):
+        return v.isoformat()[:10]
+    if hasattr(v, "item"):
+        v = v.item()
+    return round(v, 6) if isinstance(v, float) else v
+
+
+def _records(df):
+    # NumPy 스칼라 / 날짜를 JSON 에 맞는 파이썬 값으로
+    out = df.astype(object).where(df.notna(), None)
+    for col in out.columns:
+        out[col] = [_jsonable(v) for v in out[col]]
+    return out.to_dict(orient="records")
+
+
+def top_stations(date, line, k=TOP_K, sources=None):
+    """(날짜, 노선)의 승객수 상위 k개 역. k 는 TOP_K 이하."""
+    sources = subway_sources() if sources is None else sources
+    date, k = int(date), int(k)
+    if not 1 <= k <= TOP_K:
+        raise ValueError(f"k 는 1 ~ {TOP_K} 사이여야 합니다: {k}")
+    cube = subway_topk(sources, TOP_K)
+    if (date, line) not in cube:
+        raise NotFound(f"데이터가 없습니다: {date} / {line}")
+    top = lookup_topk(cube, date, line).head(k)
+    return {
+        "date": date,
+        "line": line,
+        "stations": _records(top[["역명", "승차총승객수", "하차총승객수", TOTAL_COL]]),
+    }
+
+
+def price_extremes(product, path=PP_CSV):
+    """품목의 가장 싼/비싼 동네와 평균가."""
+    table = price_table(path)
+    if product not in table.index:
+        raise NotFound(f"품목이 없습니다: {product}")
+    min_region, min_price, max_region, max_price, mean = table.summary(product)
+
+    def price(v):
+        return None if pd.isna(v) else float(v)
+    return {
+        "product": product,
+        "cheapest": {"dong": min_region, "price": price(min_price)},
+        "most_expensive": {"dong": max_region, "price": price(max_price)},
+        "mean": price(mean),
+        "regions": int(table.counts[table.index[product]]),
+    }
+
+
+def mbti_distribution(country, path=MBTI_CSV):
+    """국가의 MBTI 유형별 비율 (내림차순)."""
+    mbti = mbti_matrix(path)
+    if country not in mbti.index:
+        raise NotFound(f"국가가 없습니다: {country}")
+    types, values = mbti.country_profile(country)
+    return {
+        "country": country,
+        "types": [{"type": t, "ratio": _jsonable(v)} for t, v in zip(types, values)],
+    }
+
+
+def mbti_top_countries(mbti, n=10, include=None, path=MBTI_CSV):
+    """유형별 비율 상위 n개 국가 (include 국가가 밖이면 맨 뒤에 추가)."""
+    matrix = mbti_matrix(path)
+    if mbti not in matrix.type_index:
+        raise NotFound(f"MBTI 유형이 없습니다: {mbti}")
+    top = matrix.top_countries(mbti, int(n), include=include)
+    return {"mbti": mbti, "countries": _records(top.rename(columns={mbti: "ratio"}))}
+
+
+def data_version():
+    """데이터 원본 버전. 이 값이 바뀌면 이전 조회 결과는 쓰지 않습니다."""
+    return (subway_sources(), registry.file_key(PP_CSV), registry.file_key(MBTI_CSV))
+
+
+# 이름 → (함수, 받는 인자). api_server 의 경로 이름과 같음
+QUERIES = {
+    "top_stations": (top_stations, ("date", "line", "k")),
+    "price_extremes": (price_extremes, ("product",)),
+    "mbti_distribution": (mbti_distribution, ("country",)),
+    "mbti_top_countries": (mbti_top_countries, ("mbti", "n", "include")),
+}
+
+
+def run_query(name, params):
+    """QUERIES 의 조회 하나를 실행합니다. 모르는 이름/인자는 ValueError, 없는 키는 NotFound."""
+    if name not in QUERIES:
+        raise ValueError(f"알 수 없는 조회: {name}")
+    fn, allowed = QUERIES[name]
+    unknown = set(params) - set(allowed)
+    if unknown:
+        raise ValueError(f"알 수 없는 인자: {', '.join(sorted(unknown))}")
+    try:
+        return fn(**params)
+    except TypeError as e:
+        raise ValueError(str(e)) from e
@@ -0,0 +1,194 @@
+# 세션 사이에 공유하는 읽기 전용 데이터셋 저장소
+#
+#   from core import registry
+#   table = registry.dataset("price_table", registry.file_key(PP_CSV), lambda: build_price_table(...))
+#
+# @st.cache_data 는 호출할 때마다 결과를 pickle 에서 되살려 세션마다 복사본을 줍니다.
+# 여기서는 st.cache_resource 로 프로세스에 하나뿐인 저장소를 두고, 데이터셋마다 한 벌만 만들어
+# 모든 세션이 같은 객체를 씁니다.
+#   - 안에 든 NumPy 배열은 쓰기 금지(writeable=False)로 바꿔 둡니다.
+#   - DataFrame/Series 는 얕은 복사(pandas copy-on-write 뷰)로 건네서 페이지가 컬럼을 더하거나
+#     값을 바꿔도 공유 원본은 그대로입니다.
+#   - 이름마다 최신 key 한 벌만 남깁니다. 원본이 바뀌어 key 가 바뀌면 새로 만들고 옛것은 버립니다.
+# report() 는 데이터셋별 메모리 사용량(공유 버퍼는 한 번만 셈)을 돌려줍니다.
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from core import profiling
+
+
+class Dataset:
+    """저장소에 든 데이터셋 하나."""
+
+    def __init__(self, name, key, value, build_seconds):
+        self.name = name
+        self.key = key
+        self.value = value
+        self.build_seconds = build_seconds
+        self.built_at = time.time()
+        self.hits = 0
+        self._nbytes = None
+
+    @property
+    def nbytes(self):
+        # 큰 DataFrame 묶음은 세는 데도 시간이 걸리므로 report() 에서 처음 물을 때 계산
+        if self._nbytes is None:
+            self._nbytes = deep_nbytes(self.value)
+        return self._nbytes
+
+
+class DatasetRegistry:
+    def __init__(self):
+        self._datasets = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _name_lock(self, name):
+        with self._lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name, key, build):
+        """name 데이터셋의 key 버전. 없으면 build() 로 한 번만 만듭니다 (동시 요청은 기다림)."""
+        start = time.perf_counter()
+        hit = True
+        with self._name_lock(name):
+            entry = self._datasets.get(name)
+            if entry is None or entry.key != key:
+                hit = False
+                value = freeze(build())
+                entry = Dataset(name, key, value, time.perf_counter() - start)
+                self._datasets[name] = entry
+            entry.hits += 1
+        prof = profiling.current()
+        if prof is not None:
+            prof.caches.append({
+                "function": f"dataset:{name}",
+                "hit": hit,
+                "seconds": round(time.perf_counter() - start, 4),
+            })
+        return view(entry.value)
+
+    def version(self, name):
+        """name 데이터셋의 지금 key (아직 없으면 None)."""
+        entry = self._datasets.get(name)
+        return None if entry is None else entry.key
+
+    def drop(self, name=None):
+        """데이터셋 하나(또는 name=None 이면 전부)를 버립니다."""
+        with self._lock:
+            if name is None:
+                self._datasets.clear()
+            else:
+                self._datasets.pop(name, None)
+
+    def report(self):
+        """데이터셋별 메모리/생성 시간 표."""
+        rows = [{
+            "데이터셋": d.name,
+            "크기(MB)": round(d.nbytes / 2**20, 2),
+            "생성(초)": round(d.build_seconds, 3),
+            "조회 수": d.hits,
+            "생성 시각": time.strftime("%H:%M:%S", time.localtime(d.built_at)),
+        } for d in sorted(self._datasets.values(), key=lambda d: -d.nbytes)]
+        return pd.DataFrame(rows, columns=["데이터셋", "크기(MB)", "생성(초)", "조회 수", "생성 시각"])
+
+
+@st.cache_resource
+def get_registry():
+    # 프로세스 안의 모든 세션이 같은 저장소를 씀
+    return DatasetRegistry()
+
+
+def dataset(name, key, build):
+    """get_registry().get(name, key, build) 의 줄임."""
+    return get_registry().get(name, key, build)
+
+
+def version(name):
+    """get_registry().version(name) 의 줄임. 데이터셋에서 만든 결과를 따로 캐시할 때 key 에 넣습니다."""
+    return get_registry().version(name)
+
+
+def file_key(path):
+    """파일 내용이 바뀌면 달라지는 key (경로, 수정 시각, 크기)."""
+    st_ = os.stat(path)
+    return (os.path.abspath(path), st_.st_mtime_ns, st_.st_size)
+
+
+def freeze(value, _seen=None):
+    """값 안의 NumPy 배열을 모두 쓰기 금지로 바꿉니다 (DataFrame 은 copy-on-write 에 맡김)."""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return value
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        pass
+    elif isinstance(value, dict):
+        for v in value.values():
+            freeze(v, seen)
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            freeze(v, seen)
+    elif hasattr(value, "__dict__"):
+        for v in vars(value).values():
+            freeze(v, seen)
+    return value
+
+
+def view(value):
+    """공유 값을 페이지에 건넬 때 쓰는 뷰. DataFrame/Series 는 얕은 복사, 나머지는 그대로."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, tuple):
+        return tuple(view(v) for v in value)
+    return value
+
+
+def _root_array(a):
+    while isinstance(a.base, np.ndarray):
+        a = a.base
+    return a
+
+
+def deep_nbytes(value, _seen=None):
+    """값이 차지하는 메모리 (바이트). 같은 객체/같은 배열 버퍼는 한 번만 셉니다."""
+    seen = set() if _seen is None else _seen
+    if isinstance(value, np.ndarray):
+        value = _root_array(value)
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            deep_nbytes(k, seen) + deep_nbytes(v, seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(deep_nbytes(v, seen) for v in value)
+    if hasattr(value, "nbytes") and not hasattr(value, "__dict__"):
+        return int(value.nbytes)    # pyarrow Table/Array 등
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + deep_nbytes(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+def process_rss():
+    """현재 프로세스 상주 메모리 (바이트). 알 수 없으면 None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
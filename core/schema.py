@@ -0,0 +1,152 @@
+# 데이터셋을 읽은 직후 한 번만 작은 자료형으로 바꾸는 스키마
+#
+#   python -m core.schema           # 지하철 저장소 / pp.csv 의 변환 전후 메모리와 필터 시간 비교
+#
+# - 역명, 노선명, 품목, 조사기준: 범주형(category). 값은 정수 코드로 두고 이름 목록은 한 벌만
+#   가지므로 "노선명 == 2호선" 같은 필터가 문자열 비교 대신 정수 비교가 됩니다.
+# - 사용일자: 날짜(datetime64) 범주형. 날짜 종류는 수백 개뿐이라 행마다 2바이트 코드만 씁니다.
+# - 승차/하차 승객수: uint32
+# - 가격(동네 컬럼, 구평균가격): 콤마를 지우고 float32 (원 단위 가격은 float32 로 정확히 표현됨)
+import datetime
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from core.price_table import clean_numeric
+
+SUBWAY_CATEGORIES = ["노선명", "역명"]
+SUBWAY_COUNTS = ["승차총승객수", "하차총승객수"]
+SUBWAY_DATE = "사용일자"
+PRICE_CATEGORIES = ["품목", "조사기준"]
+
+
+def _date_categories(codes_by_value):
+    """정수 YYYYMMDD 배열 → DatetimeIndex."""
+    v = np.asarray(codes_by_value, dtype=np.int64)
+    return pd.DatetimeIndex(pd.to_datetime({"year": v // 10000, "month": v // 100 % 100, "day": v % 100}))
+
+
+def compact_subway_table(table):
+    """Parquet 에서 읽은 지하철 pyarrow Table → 작은 자료형의 DataFrame.
+
+    문자열은 pandas object 로 바꾸기 전에 Arrow 에서 사전(dictionary) 인코딩해 바로 범주형이 되게 합니다.
+    """
+    for name in SUBWAY_CATEGORIES:
+        if name in table.column_names:
+            i = table.column_names.index(name)
+            table = table.set_column(i, name, pc.dictionary_encode(table.column(i)))
+    for name in SUBWAY_COUNTS:
+        if name in table.column_names:
+            i = table.column_names.index(name)
+            table = table.set_column(i, name, table.column(i).cast(pa.uint32()))
+    date_values = None
+    if SUBWAY_DATE in table.column_names:
+        date_values = table.column(SUBWAY_DATE)
+        table = table.drop_columns([SUBWAY_DATE])
+
+    df = table.to_pandas()
+    if date_values is not None:
+        codes, uniques = pd.factorize(date_values.to_numpy(), sort=True)
+        dates = pd.Categorical.from_codes(codes, categories=_date_categories(uniques))
+        df.insert(0, SUBWAY_DATE, dates)
+    return df
+
+
+def compact_subway(df):
+    """이미 pandas 로 읽은 지하철 DataFrame 을 작은 자료형으로 바꿉니다."""
+    return compact_subway_table(pa.Table.from_pandas(df, preserve_index=False))
+
+
+def date_key(value):
+    """날짜(Timestamp/date) 또는 정수 YYYYMMDD → 정수 YYYYMMDD (파티션 이름, 화면 선택값과 같은 형식)."""
+    if isinstance(value, (datetime.date, pd.Timestamp)):
+        return value.year * 10000 + value.month * 100 + value.day
+    return int(value)
+
+
+def day_offsets(dates):
+    """사용일자 컬럼 → (첫 날짜, 첫 날 기준 일수 배열). 범주형이면 날짜 종류만큼만 계산합니다."""
+    if isinstance(dates.dtype, pd.CategoricalDtype):
+        categories = pd.DatetimeIndex(dates.cat.categories)
+        codes = dates.cat.codes.to_numpy()
+        used = categories[np.unique(codes)]
+        first = used.min()
+        per_category = (categories - first).days.to_numpy()
+        return first, per_category[codes]
+    days = pd.to_datetime(dates.astype(str), format="%Y%m%d")
+    first = days.min()
+    return first, (days - first).dt.days.to_numpy()
+
+
+def compact_prices(df):
+    """pp.csv DataFrame → 품목/조사기준 범주형, 가격 컬럼 float32.
+
+    값이 거의 다 다른 컬럼은 범주형이 오히려 커지므로 종류가 행 수의 절반 이하일 때만 바꿉니다.
+    """
+    price_cols = [c for c in df.columns if c not in PRICE_CATEGORIES]
+    out = df.copy(deep=False)
+    for name in PRICE_CATEGORIES:
+        if name in out.columns and out[name].nunique() <= len(out) // 2:
+            out[name] = out[name].astype(str).astype("category")
+    numeric = [c for c in price_cols if pd.api.types.is_numeric_dtype(out[c])]
+    text = [c for c in price_cols if c not in numeric]
+    if text:
+        values = clean_numeric(out[text]).astype(np.float32)
+        out[text] = pd.DataFrame(values, index=out.index, columns=text)
+    if numeric:
+        out[numeric] = out[numeric].astype(np.float32)
+    return out
+
+
+def memory_comparison(before, after):
+    """컬럼별 변환 전/후 메모리 (바이트) 표와 합계 행."""
+    b = before.memory_usage(index=False, deep=True)
+    a = after.memory_usage(index=False, deep=True).reindex(b.index)
+    report = pd.DataFrame({
+        "변환 전 dtype": before.dtypes.astype(str),
+        "변환 후 dtype": after.dtypes.reindex(b.index).astype(str),
+        "변환 전(MB)": b / 2**20,
+        "변환 후(MB)": a / 2**20,
+    })
+    report.loc["합계"] = ["", "", report["변환 전(MB)"].sum(), report["변환 후(MB)"].sum()]
+    report["배율"] = report["변환 전(MB)"] / report["변환 후(MB)"]
+    return report.round(3)
+
+
+def _time(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    from core.csv_loader import read_csv
+    from core.paths import data_path
+    from core.subway_store import load_partitions
+
+    pd.set_option("display.width", 140)
+    plain = load_partitions(compact=False)
+    if len(plain):
+        compact = load_partitions()
+        print(f"# 지하철 ({len(plain):,}행)")
+        print(memory_comparison(plain, compact))
+        line = plain["노선명"].iloc[0]
+        t_plain = _time(lambda: plain["노선명"] == line)
+        t_compact = _time(lambda: compact["노선명"] == line)
+        print(f"노선 필터: {t_plain * 1000:.2f} ms → {t_compact * 1000:.2f} ms ({t_plain / t_compact:.1f}배)\n")
+
+    prices, _ = read_csv(data_path("pp.csv"))
+    print(f"# 가격 ({len(prices):,}행)")
+    print(memory_comparison(prices, compact_prices(prices)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
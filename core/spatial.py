@@ -0,0 +1,123 @@
+# 위도/경도 격자 인덱스 + 확대 수준별 마커 묶기
+#
+# GridIndex: 점들을 cell_km 크기 격자 칸에 나눠 담아 두고,
+#   within(위도, 경도, 반경 km) / nearest(위도, 경도, n) 를 주변 칸만 보고 답합니다.
+# cluster_markers: 지도 확대 수준에 맞는 격자로 점을 묶어 마커 수를 max_markers 이하로 줄입니다.
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 110.574
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """두 점(또는 배열) 사이의 대원 거리 (km)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class GridIndex:
+    """위도/경도 점 집합의 격자 인덱스. 도시 규모(수십 km)를 가정한 평면 근사로 칸을 나눕니다."""
+
+    def __init__(self, lat, lon, cell_km=1.0):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.cell_km = cell_km
+        lat0 = float(np.mean(self.lat)) if len(self.lat) else 0.0
+        self._km_per_deg_lon = 111.320 * np.cos(np.radians(lat0))
+
+        cx, cy = self._cell(self.lat, self.lon)
+        keys = self._key(cx, cy)
+        self.order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[self.order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], len(sorted_keys)]
+        self.cells = dict(zip(sorted_keys[starts].tolist(), zip(starts.tolist(), ends.tolist())))
+
+    def __len__(self):
+        return len(self.lat)
+
+    def _cell(self, lat, lon):
+        x = np.asarray(lon) * self._km_per_deg_lon / self.cell_km
+        y = np.asarray(lat) * KM_PER_DEG_LAT / self.cell_km
+        return np.floor(x).astype(np.int64), np.floor(y).astype(np.int64)
+
+    @staticmethod
+    def _key(cx, cy):
+        return (cx << 32) + cy
+
+    def _candidates(self, lat, lon, rings):
+        cx, cy = self._cell(lat, lon)
+        found = []
+        for dx in range(-rings, rings + 1):
+            for dy in range(-rings, rings + 1):
+                span = self.cells.get(int(self._key(cx + dx, cy + dy)))
+                if span:
+                    found.append(self.order[span[0]:span[1]])
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def within(self, lat, lon, radius_km):
+        """반경 안의 점 (인덱스 배열, 거리 배열), 가까운 순."""
+        rings = int(np.ceil(radius_km / self.cell_km)) + 1
+        cand = self._candidates(lat, lon, rings)
+        dist = haversine_km(lat, lon, self.lat[cand], self.lon[cand])
+        keep = dist <= radius_km
+        order = np.argsort(dist[keep], kind="stable")
+        return cand[keep][order], dist[keep][order]
+
+    def nearest(self, lat, lon, n=5):
+        """가장 가까운 n개 점 (인덱스 배열, 거리 배열), 가까운 순."""
+        n = min(n, len(self))
+        if n == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        rings = 1
+        while True:
+            if (2 * rings + 1) ** 2 >= len(self.cells):
+                # 주변 칸을 도는 것보다 전체를 보는 게 빠른 경우
+                dist = haversine_km(lat, lon, self.lat, self.lon)
+                part = np.argpartition(dist, n - 1)[:n]
+                order = part[np.argsort(dist[part], kind="stable")]
+                return order, dist[order]
+            cand = self._candidates(lat, lon, rings)
+            if len(cand) >= n:
+                dist = haversine_km(lat, lon, self.lat[cand], self.lon[cand])
+                part = np.argpartition(dist, n - 1)[:n]
+                # 찾은 n 번째 거리보다 바깥 칸에 더 가까운 점이 없음이 보장될 때까지 넓힘
+                if dist[part].max() <= (rings - 1) * self.cell_km:
+                    order = part[np.argsort(dist[part], kind="stable")]
+                    return cand[order], dist[order]
+            rings *= 2
+
+
+def cluster_markers(df, zoom, max_markers=300, lat="위도", lon="경도", weight="인기지수(%)",
+                    name="관광지", cells_per_tile=4):
+    """확대 수준에 맞춰 점을 격자 칸으로 묶은 마커 DataFrame.
+
+    칸 크기는 지도 타일(256px) 하나를 cells_per_tile 칸으로 나눈 크기에서 시작하고,
+    마커가 max_markers 를 넘으면 칸을 두 배씩 키웁니다.
+    결과 컬럼: 위도, 경도(칸 안 점들의 평균), 개수, 대표(칸에서 weight 가 가장 큰 점), weight(최댓값)
+    """
+    if df.empty:
+        return pd.DataFrame(columns=[lat, lon, "개수", "대표", weight])
+    lats = df[lat].to_numpy(dtype=np.float64)
+    lons = df[lon].to_numpy(dtype=np.float64)
+    weights = df[weight].to_numpy(dtype=np.float64)
+    cell_deg = 360.0 / (2 ** zoom) / cells_per_tile
+    while True:
+        keys = np.floor(lons / cell_deg).astype(np.int64) * 1_000_003 + np.floor(lats / cell_deg).astype(np.int64)
+        uniq, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        if len(uniq) <= max_markers:
+            break
+        cell_deg *= 2
+
+    # 칸마다 weight 최댓값을 가진 점 (weight 내림차순 정렬 후 칸별 첫 번째)
+    order = np.lexsort((-weights, inverse))
+    first = order[np.r_[True, inverse[order][1:] != inverse[order][:-1]]]
+    return pd.DataFrame({
+        lat: np.bincount(inverse, lats) / counts,
+        lon: np.bincount(inverse, lons) / counts,
+        "개수": counts,
+        "대표": df[name].to_numpy()[first],
+        weight: weights[first],
+    })
@@ -0,0 +1,249 @@
+# 역 이름 검색 인덱스: 앞글자(트라이) / 초성 / 자모 단위 오타 허용 검색 + 역 → 누적합 배열 행 구간
+#
+#   index = StationIndex(prefix.stations)      # queries.station_index(sources) 가 한 벌만 만들어 공유
+#   index.search("강ㄴ")                       # ['강남', '강남구청', ...]  치는 중인 글자도 자모로 맞춤
+#   index.search("ㄱㄴ")                       # 초성만 쳐도 됨
+#   index.search("강낭")                       # 오타는 자모 편집 거리 1~2 까지
+#   index.rows("강남구청")                     # 누적합 배열(RidershipPrefix) 행 번호 (노선마다 한 행)
+#
+#   python -m core.station_search ㄱㄴ 강ㄴ 남구
+#
+# 이름은 모두 호환 자모 글자열로 풀어 트라이에 넣으므로 ("강남" → ㄱㅏㅇㄴㅏㅁ) 받침까지 친 "강ㄴ" 도
+# 앞글자 검색으로 찾습니다. 괄호 안 별칭("잠실(송파구청)" 의 송파구청)도 따로 넣습니다.
+# 검색 한 번은 트라이 조회 + 이름 수만큼의 NumPy 편집 거리 계산이라 역이 수천 개여도 1ms 안팎입니다.
+import copy
+import re
+import sys
+import time
+
+import numpy as np
+
+# 한글 음절 = 0xAC00 + (초성 × 21 + 중성) × 28 + 종성
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+# 겹모음 / 겹받침은 자판으로 치는 순서대로 풀어 둠 (ㅘ → ㅗㅏ, ㄺ → ㄹㄱ)
+JUNGSEONG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ",
+             "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"]
+JONGSEONG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+             "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 따로 친 겹자모 (호환 자모 한 글자) 도 같은 순서로
+COMPOUND_JAMO = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+MAX_RESULTS = 20
+_IGNORED = re.compile(r"[\s.·]")
+
+
+def _normalize(text):
+    return _IGNORED.sub("", text).lower()
+
+
+def jamo(text):
+    """"강남" → "ㄱㅏㅇㄴㅏㅁ". 한글이 아닌 글자는 소문자로 그대로."""
+    out = []
+    for ch in _normalize(text):
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(CHOSEONG[code // 588] + JUNGSEONG[code % 588 // 28] + JONGSEONG[code % 28])
+        else:
+            out.append(COMPOUND_JAMO.get(ch, ch))
+    return "".join(out)
+
+
+def choseong(text):
+    """"강남구청" → "ㄱㄴㄱㅊ". 한글이 아닌 글자는 소문자로 그대로."""
+    out = []
+    for ch in _normalize(text):
+        code = ord(ch) - 0xAC00
+        out.append(CHOSEONG[code // 588] if 0 <= code < 11172 else ch)
+    return "".join(out)
+
+
+def is_choseong(text):
+    """자음만 친 검색어인지 (ㄱㄴ)."""
+    text = _normalize(text)
+    return bool(text) and all(ch in CHOSEONG for ch in text)
+
+
+def search_keys(name):
+    """역 이름 → 검색어로 쓸 이름들. "잠실(송파구청)" → ["잠실(송파구청)", "잠실", "송파구청"]."""
+    keys = [name]
+    base, _, rest = name.partition("(")
+    if rest:
+        keys.append(base)
+        keys.extend(a for a in re.split(r"[()]", rest) if a.strip())
+    return list(dict.fromkeys(k for k in keys if _normalize(k)))
+
+
+class Trie:
+    """글자열 → 그 글자열로 시작하는 키의 값 목록. 노드마다 아래 값들을 모아 두어 조회는 글자 수만큼만 걸음."""
+
+    def __init__(self):
+        self._children = [{}]
+        self._values = [[]]
+
+    def insert(self, key, value):
+        node = 0
+        self._values[0].append(value)
+        for ch in key:
+            nxt = self._children[node].get(ch)
+            if nxt is None:
+                nxt = len(self._children)
+                self._children[node][ch] = nxt
+                self._children.append({})
+                self._values.append([])
+            node = nxt
+            self._values[node].append(value)
+
+    def prefixed(self, prefix):
+        """prefix 로 시작하는 키의 값 (넣은 순서, 중복 포함)."""
+        node = 0
+        for ch in prefix:
+            node = self._children[node].get(ch)
+            if node is None:
+                return []
+        return self._values[node]
+
+    def __len__(self):
+        return len(self._children)
+
+
+def prefix_distance(query, codes, lengths):
+    """query 와 키마다 가장 가까운 앞부분 사이의 편집 거리. codes: (키 수, 최대 길이) 글자 코드 (빈 칸 -1).
+
+    키 전체를 한 번에 DP 하므로 파이썬 반복은 검색어 글자 수만큼만 돕니다.
+    """
+    n, width = codes.shape
+    cols = np.arange(width + 1)
+    prev = np.broadcast_to(cols, (n, width + 1))
+    for i, ch in enumerate(query, 1):
+        # 바꾸기 / 지우기 중 작은 값, 끼워 넣기는 누적 최소로 (cur[j] = min_k (b[k] + j - k))
+        best = np.empty((n, width + 1), dtype=np.int64)
+        best[:, 0] = i
+        np.minimum(prev[:, :-1] + (codes != ord(ch)), prev[:, 1:] + 1, out=best[:, 1:])
+        prev = np.minimum.accumulate(best - cols, axis=1) + cols
+    # 키 길이를 넘는 칸(빈 칸)은 빼고 최소
+    prev = np.where(cols <= lengths[:, None], prev, np.iinfo(np.int64).max)
+    return prev.min(axis=1)
+
+
+class StationIndex:
+    """역 이름 검색 인덱스. stations: [노선명, 역명] DataFrame (행 순서 = 누적합 배열 행 순서)."""
+
+    def __init__(self, stations, weights=None):
+        names = stations["역명"].astype(str).to_numpy()
+        # 같은 역 이름의 행(노선마다 하나)을 이어지게 정렬해 두고 이름 → 구간
+        self.order = np.argsort(names, kind="stable")
+        sorted_names = names[self.order]
+        starts = np.flatnonzero(np.r_[True, sorted_names[1:] != sorted_names[:-1]])
+        ends = np.r_[starts[1:], len(sorted_names)]
+        self.names = sorted_names[starts].tolist()
+        self.spans = dict(zip(self.names, zip(starts.tolist(), ends.tolist())))
+        self._row_names = names
+        self._starts = starts
+        self.weights = self._name_weights(weights)
+
+        self._jamo, self._choseong = Trie(), Trie()
+        self._exact = {}            # 자모 글자열 → 그 이름/별칭을 가진 역
+        key_jamo, key_choseong, key_owner = [], [], []
+        for i, name in enumerate(self.names):
+            for key in search_keys(name):
+                text, initials = jamo(key), choseong(key)
+                self._jamo.insert(text, i)
+                self._choseong.insert(initials, i)
+                self._exact.setdefault(text, []).append(i)
+                key_jamo.append(text)
+                key_choseong.append(initials)
+                key_owner.append(i)
+        self._key_jamo, self._key_choseong = key_jamo, key_choseong
+        self._key_owner = np.array(key_owner, dtype=np.int64)
+        width = max(map(len, key_jamo), default=0)
+        self._key_codes = np.full((len(key_jamo), width), -1, dtype=np.int32)
+        for k, text in enumerate(key_jamo):
+            self._key_codes[k, :len(text)] = [ord(ch) for ch in text]
+        self._key_lengths = np.array([len(t) for t in key_jamo], dtype=np.int64)
+
+    def _name_weights(self, weights):
+        # 같은 단계 결과는 승객이 많은 역부터 (weights: 행별 승객수, 없으면 이름 순)
+        if weights is None:
+            return np.zeros(len(self.names))
+        return np.add.reduceat(np.asarray(weights, dtype=np.float64)[self.order], self._starts)
+
+    def same_stations(self, stations):
+        """stations 의 역 이름이 행 순서까지 이 인덱스와 같은지 (같으면 with_weights() 로 다시 씀)."""
+        names = stations["역명"].astype(str).to_numpy()
+        return len(names) == len(self._row_names) and bool((names == self._row_names).all())
+
+    def with_weights(self, weights):
+        """트라이 / 이름 배열은 함께 쓰고 승객수(결과 순서)만 바꾼 인덱스."""
+        index = copy.copy(self)
+        index.weights = self._name_weights(weights)
+        return index
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.spans
+
+    def rows(self, name):
+        """역 이름 → 누적합 배열 행 번호 (노선마다 하나). 없는 이름이면 KeyError."""
+        s, e = self.spans[name]
+        return self.order[s:e]
+
+    def search(self, query, limit=MAX_RESULTS):
+        """검색어에 맞는 역 이름 (최대 limit 개).
+
+        순서: 이름이 같음 → 앞글자(자모 단위) → 초성 → 중간에 들어 있음, 같은 단계 안에서는 승객 많은 순.
+        하나도 없을 때만 오타를 허용해 가까운 이름을 찾습니다.
+        """
+        q = jamo(query)
+        if not q:
+            return []
+        rank = {}
+
+        def add(ids, tier):
+            for i in ids:
+                if i not in rank:
+                    rank[i] = tier
+
+        add(self._exact.get(q, ()), 0)
+        add(self._jamo.prefixed(q), 1)
+        if is_choseong(query):
+            # 자음만 쳤으면 초성 글자열에서 앞글자 → 중간 (ㄴㄱㅊ → 강남구청)
+            c = _normalize(query)
+            add(self._choseong.prefixed(c), 2)
+            add((int(self._key_owner[k]) for k, text in enumerate(self._key_choseong) if c in text), 3)
+        else:
+            add((int(self._key_owner[k]) for k, text in enumerate(self._key_jamo) if q in text), 3)
+            # 맞는 이름이 하나도 없고 세 자모(한 글자) 이상 쳤으면 자모 편집 거리로 오타 허용 (6 자모까지 1, 그 위로 2)
+            if not rank and len(q) >= 3 and len(self._key_codes):
+                dist = prefix_distance(q, self._key_codes, self._key_lengths)
+                allowed = 1 if len(q) <= 6 else 2
+                close = np.flatnonzero(dist <= allowed)
+                add(self._key_owner[close[np.argsort(dist[close], kind="stable")]].tolist(), 4)
+
+        found = sorted(rank, key=lambda i: (rank[i], -self.weights[i], self.names[i]))
+        return [self.names[i] for i in found[:limit]]
+
+
+def main(argv=None):
+    import logging
+
+    from core import queries
+
+    # Streamlit 밖에서 st.cache_resource 를 쓸 때 나오는 경고는 감춤
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    argv = sys.argv[1:] if argv is None else argv
+    index = queries.station_index(queries.subway_sources())
+    for query in argv or ["ㄱㄴ", "강ㄴ", "강낭", "구청"]:
+        start = time.perf_counter()
+        found = index.search(query)
+        ms = (time.perf_counter() - start) * 1000
+        print(f"{query:<8} {ms:6.2f} ms  {', '.join(found[:10])}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+# 역별 일 승객수 이상 탐지(같은 요일 기준 robust z) + 노선별 추세 전환, 새 날짜분만 보고 갱신
+#
+#   builder = IncrementalAnomaly()
+#   report = builder.update(sources, iter_sources)     # 새 원본 파일의 날짜만 날짜 순 조각으로 처리
+#   report.anomalies                                   # 날짜, 노선명, 역명, 구분, 승객수, 기준, z
+#   report.trends / report.changes                     # 노선별 추세 / 추세가 바뀐 날
+#
+#   python -m core.subway_anomaly                      # 전체 다시 계산 vs 마지막 달만 이어서 갱신 시간
+#
+# 역마다 요일별로 최근 WEEKS 주의 승차/하차 승객수만 고리 버퍼로 들고 있다가, 새 날이 오면
+#   z = (오늘 - 같은 요일 중앙값) / (1.4826 × MAD)
+# 를 계산해 |z| >= RECORD_Z 인 역만 기록하고 버퍼에 오늘 값을 넣습니다.
+# 노선은 일 합계를 같은 요일 중앙값으로 나눈 비율(요일 효과 제거)의 빠른/느린 EWMA 를 들고 있다가
+# 두 값의 차이가 TREND_BAND 를 넘어 방향이 바뀐 날을 추세 전환으로 기록합니다.
+# 하루 처리 비용은 (그날 역 수 × WEEKS) 라서 쌓인 기간이 몇 년이어도 새 날짜분만큼만 듭니다.
+# 새 파일에 이미 처리한 날짜가 있으면(과거 데이터 보충) 처음부터 다시 계산합니다.
+# report() 도 지난번 뒤에 쌓인 기록만 표로 바꿔 이어 붙입니다.
+import datetime
+import itertools
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from core.schema import day_offsets
+
+WEEKS = 8               # 요일별 기준에 쓰는 최근 주 수
+MIN_WEEKS = 3           # 같은 요일 값이 이만큼 쌓여야 점수를 매김
+RECORD_Z = 3.0          # 이 이상 벗어난 역만 기록 (화면에서는 더 높은 기준으로 거를 수 있음)
+MAD_SCALE = 1.4826      # 정규분포에서 MAD → 표준편차
+MIN_SPREAD = 0.05       # 같은 요일 값이 거의 같아 MAD 가 0 에 가까울 때 중앙값의 이 비율을 최소 폭으로
+FAST_DAYS, SLOW_DAYS = 7, 28
+TREND_BAND = 0.03       # 빠른/느린 EWMA 차이가 이 이상이어야 방향으로 봄
+METRICS = ["승차총승객수", "하차총승객수"]
+EPOCH_ORDINAL = 719163  # datetime.date(1970, 1, 1).toordinal()
+
+
+class WeekdayBuffer:
+    """키(역/노선)마다 요일별 최근 weeks 주 값을 담는 고리 버퍼. values: (키 수, 7, weeks, 값 종류 수)."""
+
+    def __init__(self, width, weeks=WEEKS):
+        self.weeks = weeks
+        self.values = np.full((0, 7, weeks, width), np.nan, dtype=np.float32)
+        self.count = np.zeros((0, 7), dtype=np.int64)
+
+    def grow(self, n):
+        """키 수를 n 개로 늘립니다 (새 키는 빈 버퍼)."""
+        extra = n - len(self.count)
+        if extra > 0:
+            self.values = np.concatenate([self.values, np.full((extra, *self.values.shape[1:]), np.nan, np.float32)])
+            self.count = np.concatenate([self.count, np.zeros((extra, 7), dtype=np.int64)])
+
+    def baseline(self, keys, dow):
+        """(중앙값, 폭 = 1.4826 × MAD, 쌓인 주 수). keys 의 dow 요일 버퍼에서."""
+        window = self.values[keys, dow]                    # (n, weeks, width)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # 아직 빈 버퍼는 NaN
+            median = np.nanmedian(window, axis=1)
+            mad = np.nanmedian(np.abs(window - median[:, None, :]), axis=1)
+        spread = np.maximum(mad * MAD_SCALE, np.abs(median) * MIN_SPREAD)
+        return median, np.maximum(spread, 1.0), np.minimum(self.count[keys, dow], self.weeks)
+
+    def push(self, keys, dow, values):
+        pos = self.count[keys, dow] % self.weeks
+        self.values[keys, dow, pos] = values
+        self.count[keys, dow] += 1
+
+
+class AnomalyReport:
+    """update() 결과 (모든 세션이 공유하는 읽기 전용 표)."""
+
+    def __init__(self, anomalies, trends, changes, days, spans=None):
+        self.anomalies = anomalies      # 날짜, 노선명, 역명, 구분, 승객수, 기준, z  (|z| >= RECORD_Z, 날짜 순)
+        self.trends = trends            # 날짜, 노선명, 승객수, 요일비, 빠른추세, 느린추세
+        self.changes = changes          # 날짜, 노선명, 방향(상승/하락), 차이
+        self.days = days                # 처리한 날짜 (datetime.date 목록)
+        if spans is not None:
+            self.spans = spans          # 날짜 → anomalies 행 구간
+            return
+        # 날짜 순으로 쌓였으므로 같은 날짜 행은 이어져 있음
+        day_values = anomalies["날짜"].to_numpy()
+        starts = np.flatnonzero(np.r_[True, day_values[1:] != day_values[:-1]]) if len(day_values) else []
+        ends = np.r_[starts[1:], len(day_values)] if len(day_values) else []
+        self.spans = {pd.Timestamp(day_values[s]).date(): (int(s), int(e)) for s, e in zip(starts, ends)}
+
+    @property
+    def scored_days(self):
+        """이상 기록이 있는 날짜 (오래된 순)."""
+        return list(self.spans)
+
+    def on(self, day, min_z=RECORD_Z):
+        """day 날짜에 |z| >= min_z 인 역 (|z| 큰 순)."""
+        s, e = self.spans.get(day, (0, 0))
+        picked = self.anomalies.iloc[s:e]
+        picked = picked[picked["z"].abs() >= min_z]
+        return picked.sort_values("z", key=np.abs, ascending=False, kind="stable").reset_index(drop=True)
+
+
+class AnomalyState:
+    """역/노선별 기준 버퍼와 지금까지의 기록. day() 로 하루씩 더합니다."""
+
+    def __init__(self, weeks=WEEKS):
+        self.stations = {}                      # (노선명, 역명) → 행
+        self.lines = {}                         # 노선명 → 행
+        self.line_of_station = np.zeros(0, dtype=np.int64)
+        self.station_buf = WeekdayBuffer(len(METRICS), weeks)
+        self.line_buf = WeekdayBuffer(1, weeks)
+        self.fast = np.zeros(0)
+        self.slow = np.zeros(0)
+        self.direction = np.zeros(0, dtype=np.int8)
+        self.last_day = None
+        self.days = []
+        self._anomalies, self._trends, self._changes = [], [], []     # 아직 표로 바꾸지 않은 기록 조각
+        self._tables = None                     # report() 로 만든 (anomalies, trends, changes) 표
+        self._spans = {}                        # 날짜 → anomalies 행 구간
+
+    def station_rows(self, keys):
+        """[(노선명, 역명)] → 행 번호 (처음 보는 역/노선은 추가)."""
+        rows = []
+        for line, name in keys:
+            row = self.stations.get((line, name))
+            if row is None:
+                row = self.stations[(line, name)] = len(self.stations)
+                if line not in self.lines:
+                    self.lines[line] = len(self.lines)
+                self.line_of_station = np.r_[self.line_of_station, self.lines[line]]
+            rows.append(row)
+        self.station_buf.grow(len(self.stations))
+        self.line_buf.grow(len(self.lines))
+        extra = len(self.lines) - len(self.fast)
+        if extra > 0:
+            self.fast = np.r_[self.fast, np.full(extra, np.nan)]
+            self.slow = np.r_[self.slow, np.full(extra, np.nan)]
+            self.direction = np.r_[self.direction, np.zeros(extra, dtype=np.int8)]
+        return np.asarray(rows, dtype=np.int64)
+
+    def day(self, day, rows, counts):
+        """하루치 (역 행, (n, 2) 승차/하차) 를 점수 매기고 기준에 넣습니다."""
+        dow = day.weekday()
+        median, spread, weeks = self.station_buf.baseline(rows, dow)
+        z = (counts - median) / spread
+        flagged = (weeks >= MIN_WEEKS)[:, None] & (np.abs(z) >= RECORD_Z)
+        r, m = np.nonzero(flagged)
+        if len(r):
+            self._anomalies.append((np.full(len(r), day.toordinal()), rows[r], m,
+                                    counts[r, m], median[r, m], z[r, m].astype(np.float32)))
+        self.station_buf.push(rows, dow, counts)
+
+        # 노선: 일 합계 / 같은 요일 중앙값 의 EWMA
+        lines = np.unique(self.line_of_station[rows])
+        totals = np.bincount(self.line_of_station[rows], weights=counts.sum(axis=1),
+                             minlength=len(self.lines))[lines]
+        line_median, _, line_weeks = self.line_buf.baseline(lines, dow)
+        ratio = np.where(line_weeks >= 1, totals / np.maximum(line_median[:, 0], 1.0), 1.0)
+        self.line_buf.push(lines, dow, totals[:, None])
+        for span, ewma in ((FAST_DAYS, self.fast), (SLOW_DAYS, self.slow)):
+            alpha = 2.0 / (span + 1)
+            prev = ewma[lines]
+            ewma[lines] = np.where(np.isnan(prev), ratio, prev + alpha * (ratio - prev))
+        gap = self.fast[lines] - self.slow[lines]
+        prev_dir = self.direction[lines]
+        new_dir = np.where(gap >= TREND_BAND, 1, np.where(gap <= -TREND_BAND, -1, prev_dir)).astype(np.int8)
+        turned = (new_dir != prev_dir) & (prev_dir != 0)
+        if turned.any():
+            self._changes.append((np.full(turned.sum(), day.toordinal()), lines[turned],
+                                  new_dir[turned], gap[turned]))
+        self.direction[lines] = new_dir
+        self._trends.append((np.full(len(lines), day.toordinal()), lines, totals, ratio,
+                             self.fast[lines].copy(), self.slow[lines].copy()))
+        self.last_day = day
+        self.days.append(day)
+
+    def add_rows(self, df):
+        """원본 행(사용일자, 노선명, 역명, 승차/하차총승객수)을 날짜 순으로 더합니다."""
+        if df.empty:
+            return
+        first, day_idx = day_offsets(df["사용일자"])
+        keys = pd.MultiIndex.from_arrays([df["노선명"].astype(str), df["역명"].astype(str)])
+        codes, uniques = pd.factorize(keys)
+        rows = self.station_rows(list(uniques))
+        # (날짜, 역) 마다 합계를 한 번에 만든 뒤 날짜 구간별로 처리
+        group = day_idx.astype(np.int64) * len(uniques) + codes
+        groups, inverse = np.unique(group, return_inverse=True)
+        counts = np.zeros((len(groups), len(METRICS)))
+        for j, col in enumerate(METRICS):
+            counts[:, j] = np.bincount(inverse, weights=df[col].to_numpy(dtype=np.float64), minlength=len(groups))
+        group_day = groups // len(uniques)
+        bounds = np.flatnonzero(np.r_[True, group_day[1:] != group_day[:-1], True])
+        for s, e in zip(bounds[:-1], bounds[1:]):
+            day = (first + pd.Timedelta(days=int(group_day[s]))).date()
+            self.day(day, rows[groups[s:e] % len(uniques)], counts[s:e])
+
+    def report(self):
+        """지금까지의 기록 → AnomalyReport. 지난 report() 뒤에 쌓인 기록만 표로 바꿔 이어 붙입니다."""
+        new = self._frames(self._anomalies, self._trends, self._changes)
+        # 이상 기록은 하루에 한 조각씩 날짜 순으로 쌓이므로 날짜 → 행 구간을 조각 길이로 바로 셈
+        offset = 0 if self._tables is None else len(self._tables[0])
+        for chunk in self._anomalies:
+            n = len(chunk[0])
+            self._spans[datetime.date.fromordinal(int(chunk[0][0]))] = (offset, offset + n)
+            offset += n
+        if self._tables is None:
+            self._tables = new
+        else:
+            self._tables = tuple(
+                part if not len(old) else old if not len(part) else pd.concat([old, part], ignore_index=True)
+                for old, part in zip(self._tables, new)
+            )
+        self._anomalies, self._trends, self._changes = [], [], []
+        return AnomalyReport(*self._tables, list(self.days), dict(self._spans))
+
+    def _frames(self, anomaly_chunks, trend_chunks, change_chunks):
+        """쌓아 둔 기록 조각 → (anomalies, trends, changes) DataFrame."""
+        station_names = np.array([k for k in self.stations], dtype=object).reshape(-1, 2)
+        line_names = np.array(list(self.lines), dtype=object)
+
+        def dates(ordinals):
+            return pd.to_datetime(np.asarray(ordinals, dtype=np.int64) - EPOCH_ORDINAL, unit="D")
+
+        def stack(chunks, width):
+            if not chunks:
+                return [np.zeros(0)] * width
+            return [np.concatenate([c[i] for c in chunks]) for i in range(width)]
+
+        day, row, metric, value, median, z = stack(anomaly_chunks, 6)
+        row = row.astype(np.int64)
+        anomalies = pd.DataFrame({
+            "날짜": dates(day),
+            "노선명": station_names[row, 0] if len(row) else [],
+            "역명": station_names[row, 1] if len(row) else [],
+            "구분": np.array(["승차", "하차"])[metric.astype(np.int64)],
+            "승객수": value.astype(np.int64),
+            "기준": median.round(),
+            "z": z.round(2),
+        })
+        day, line, total, ratio, fast, slow = stack(trend_chunks, 6)
+        trends = pd.DataFrame({
+            "날짜": dates(day),
+            "노선명": line_names[line.astype(np.int64)] if len(line) else [],
+            "승객수": total.astype(np.int64),
+            "요일비": ratio.round(3),
+            "빠른추세": fast.round(3),
+            "느린추세": slow.round(3),
+        })
+        day, line, direction, gap = stack(change_chunks, 4)
+        changes = pd.DataFrame({
+            "날짜": dates(day),
+            "노선명": line_names[line.astype(np.int64)] if len(line) else [],
+            "방향": np.where(direction > 0, "상승", "하락"),
+            "차이": gap.round(3),
+        })
+        return anomalies, trends, changes
+
+
+class IncrementalAnomaly:
+    """저장소에 새 원본 파일이 들어올 때 그 파일의 날짜만 처리합니다 (IncrementalTopK 와 같은 방식)."""
+
+    def __init__(self, weeks=WEEKS):
+        self.weeks = weeks
+        self.state = AnomalyState(weeks)
+        self.sources = ()
+        self._lock = threading.Lock()
+
+    def update(self, sources, load_chunks):
+        """sources: 현재 저장소의 원본 해시 목록, load_chunks(해시 목록) -> 날짜 순 DataFrame 조각들."""
+        with self._lock:
+            if not set(self.sources) <= set(sources):
+                # 원본이 빠지거나 바뀐 경우에는 처음부터 다시 만듦
+                self.state, self.sources = AnomalyState(self.weeks), ()
+            new = [s for s in sources if s not in self.sources]
+            if new:
+                chunks = iter(load_chunks(new))
+                head = next(chunks, None)
+                if self.state.last_day is not None and head is not None and len(head):
+                    first, _ = day_offsets(head["사용일자"])
+                    if first.date() <= self.state.last_day:
+                        # 이미 처리한 날짜 이전 데이터가 들어오면 날짜 순서를 지키려고 전부 다시
+                        self.state = AnomalyState(self.weeks)
+                        head, chunks = None, iter(load_chunks(list(sources)))
+                for df in itertools.chain([] if head is None else [head], chunks):
+                    self.state.add_rows(df)
+                self.sources = tuple(sources)
+            return self.state.report()
+
+    def checkpoint(self):
+        """디스크에 남길 (원본 목록, 상태)."""
+        with self._lock:
+            return self.sources, self.state
+
+    def restore(self, checkpoint):
+        """checkpoint() 로 남긴 상태에서 이어 갑니다 (아직 아무것도 처리하지 않았을 때만)."""
+        sources, state = checkpoint
+        with self._lock:
+            if not self.sources:
+                self.sources, self.state = tuple(sources), state
+
+
+def main(argv=None):
+    import logging
+
+    from core import queries
+    from core.subway_ingest import iter_sources
+
+    # Streamlit 밖에서 st.cache_resource 를 쓸 때 나오는 경고는 감춤
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    sources = queries.subway_sources()
+
+    start = time.perf_counter()
+    report = IncrementalAnomaly().update(sources, iter_sources)
+    full = time.perf_counter() - start
+    print(f"전체 {len(report.days)}일: {full:.2f} s, 이상 {len(report.anomalies)}건, 추세 전환 {len(report.changes)}건")
+
+    if len(sources) > 1:
+        builder = IncrementalAnomaly()
+        builder.update(sources[:-1], iter_sources)
+        start = time.perf_counter()
+        builder.update(sources, iter_sources)
+        print(f"마지막 원본 파일만 이어서: {time.perf_counter() - start:.2f} s")
+
+    if report.days:
+        latest = report.on(report.days[-1])
+        print(f"\n{report.days[-1]} 이상 역 {len(latest)}곳")
+        print(latest.head(10).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
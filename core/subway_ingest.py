@@ -0,0 +1,251 @@
+# 월별 CARD_SUBWAY_MONTH_*.csv 파일을 Parquet 저장소에 추가
+#
+# 파일을 청크 단위로 읽어 바로 저장소에 쓰기 때문에 메모리 사용량은 파일 크기와 무관합니다
+# (청크마다 달별 parquet 파일 하나, core/subway_store.py).
+# 이미 넣은 파일(내용 해시가 같은 파일)은 건너뛰고, 새 달 파일만 처리합니다.
+# 지워진 파일은 목록에서 빼고, 그 파일에서 들어온 조각도 저장소에서 지웁니다.
+# 함께 들어있는 subway.csv 는 월별 파일이 그 날짜를 모두 덮으면 원본 목록에서 뺍니다(같은 달을 두 번 더하지 않게).
+#
+#   python -m core.subway_ingest            # 루트의 월별 파일 + subway.csv
+#   python -m core.subway_ingest a.csv b.csv
+import datetime
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from core.csv_loader import detect_encoding
+from core.paths import DATA_ROOT
+from core.subway_store import (
+    LAYOUT, PARTITIONING, ROW_GROUP_ROWS, SCHEMA, SUBWAY_STORE, files_by_month, load_partitions, with_month,
+)
+
+MONTHLY_PATTERN = "CARD_SUBWAY_MONTH_*.csv"
+BUNDLED_NAME = "subway.csv"
+MANIFEST_NAME = "_manifest.json"
+CHUNK_ROWS = 200_000
+MONTHS_PER_CHUNK = 1    # iter_sources(): 한 번에 읽는 달 수
+SCAN_TTL = 5.0          # current_sources(): 폴더가 그대로면 이 시간(초) 동안 다시 훑지 않음
+_ingest_lock = threading.Lock()
+_last_scan = None       # (폴더 key, 확인한 시각, 원본 해시 목록)
+DTYPES = {"사용일자": "int32", "노선명": str, "역명": str, "승차총승객수": "int64", "하차총승객수": "int64"}
+
+
+def discover_sources(root=DATA_ROOT):
+    """데이터 폴더의 월별 파일(이름순)과 저장소에 포함된 subway.csv 를 찾습니다."""
+    paths = sorted(glob.glob(os.path.join(root, MONTHLY_PATTERN)))
+    bundled = os.path.join(root, BUNDLED_NAME)
+    if os.path.exists(bundled):
+        paths.append(bundled)
+    return paths
+
+
+def file_digest(path, block_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def iter_chunks(path, encoding=None, chunk_rows=CHUNK_ROWS):
+    """CSV 를 chunk_rows 행씩 읽어 pyarrow Table 로 하나씩 돌려줍니다. 인코딩은 자동 판별."""
+    reader = pd.read_csv(path, encoding=encoding or detect_encoding(path), usecols=SCHEMA.names, dtype=DTYPES, chunksize=chunk_rows)
+    with reader:
+        for chunk in reader:
+            yield pa.Table.from_pandas(chunk[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+
+
+def source_prefix(digest):
+    # 저장소 안의 parquet 파일 이름 앞부분 (어느 원본 파일에서 왔는지 구분)
+    return digest[:16]
+
+
+def source_files(digests, store_dir=SUBWAY_STORE):
+    """주어진 원본 해시에서 만들어진 parquet 파일 경로 목록."""
+    prefixes = tuple(source_prefix(d) + "-" for d in digests)
+    found = []
+    for dirpath, _, filenames in os.walk(store_dir):
+        found.extend(os.path.join(dirpath, n) for n in filenames if n.startswith(prefixes))
+    return found
+
+
+def load_sources(digests, store_dir=SUBWAY_STORE):
+    """주어진 원본 파일들에서 들어온 행만 읽습니다 (증분 갱신용)."""
+    return load_partitions(store_dir=store_dir, files=source_files(digests, store_dir))
+
+
+def iter_sources(digests, store_dir=SUBWAY_STORE, months=MONTHS_PER_CHUNK):
+    """주어진 원본 파일들의 행을 날짜 순으로 months 달치씩 DataFrame 으로 하나씩 돌려줍니다.
+
+    전체 기간을 한 번에 읽지 않으므로 큐브/누적합을 만들 때 메모리는 months 달치만큼만 씁니다.
+    """
+    by_month = files_by_month(source_files(digests, store_dir), store_dir)
+    keys = sorted(by_month)
+    for i in range(0, len(keys), months):
+        files = [f for m in keys[i:i + months] for f in by_month[m]]
+        yield load_partitions(store_dir=store_dir, files=files)
+
+
+def load_manifest(store_dir=SUBWAY_STORE):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"layout": LAYOUT, "sources": {}, "files": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, store_dir=SUBWAY_STORE):
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def ingest_file(path, digest, store_dir=SUBWAY_STORE, encoding=None):
+    """파일 한 개를 청크 단위로 저장소에 추가하고 (행 수, [첫 사용일자, 마지막 사용일자]) 를 돌려줍니다."""
+    prefix = source_prefix(digest)
+    rows, days = 0, None
+    for i, table in enumerate(iter_chunks(path, encoding=encoding)):
+        days = _merge_days(days, table)
+        ds.write_dataset(
+            with_month(table),
+            store_dir,
+            format="parquet",
+            partitioning=PARTITIONING,
+            basename_template=f"{prefix}-{i:05d}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+            min_rows_per_group=ROW_GROUP_ROWS,
+            max_rows_per_group=ROW_GROUP_ROWS,
+        )
+        rows += table.num_rows
+    return rows, days
+
+
+def _merge_days(days, table):
+    bounds = pc.min_max(table["사용일자"]).as_py()
+    if bounds["min"] is None:
+        return days
+    if days is None:
+        return [bounds["min"], bounds["max"]]
+    return [min(days[0], bounds["min"]), max(days[1], bounds["max"])]
+
+
+def _source_days(digest, store_dir):
+    # 날짜 범위를 기록하기 전에 넣은 원본: 저장소에서 날짜 열만 읽어 채움
+    files = source_files([digest], store_dir)
+    return _merge_days(None, ds.dataset(files, format="parquet").to_table(columns=["사용일자"])) if files else None
+
+
+def _ordinals(days):
+    first, last = (datetime.date(d // 10000, d // 100 % 100, d % 100).toordinal() for d in days)
+    return range(first, last + 1)
+
+
+def covered_bundled(manifest):
+    """월별 파일들이 날짜를 모두 덮는 subway.csv 원본 해시 집합 (원본 목록에서 뺄 것)."""
+    sources, files = manifest["sources"], manifest["files"]
+    bundled = {f["digest"] for p, f in files.items() if os.path.basename(p) == BUNDLED_NAME}
+    monthly = {f["digest"] for p, f in files.items() if os.path.basename(p) != BUNDLED_NAME}
+    covered = set()
+    for digest in monthly:
+        if sources[digest]["days"]:
+            covered.update(_ordinals(sources[digest]["days"]))
+    return {d for d in bundled - monthly
+            if sources[d]["days"] and covered.issuperset(_ordinals(sources[d]["days"]))}
+
+
+def current_sources(root=DATA_ROOT, store_dir=SUBWAY_STORE, ttl=SCAN_TTL):
+    """ingest_all() 과 같지만, 데이터 폴더 수정 시각이 그대로이고 마지막 확인이 ttl 초 안이면 다시 훑지 않습니다.
+
+    파일이 생기거나 지워지면 폴더 수정 시각이 바뀌어 바로 다시 확인하고,
+    있던 파일을 고쳐 쓴 것은 ttl 초 안에 반영됩니다.
+    """
+    global _last_scan
+    key = (os.path.abspath(root), os.path.abspath(store_dir), os.stat(root).st_mtime_ns)
+    last = _last_scan
+    if last is not None and last[0] == key and time.monotonic() - last[1] < ttl:
+        return last[2]
+    sources = ingest_all(discover_sources(root), store_dir)
+    _last_scan = (key, time.monotonic(), sources)
+    return sources
+
+
+def ingest_all(paths=None, store_dir=SUBWAY_STORE):
+    """새로 생기거나 바뀐 파일만 저장소에 넣고, 현재 들어있는 원본 해시 목록을 돌려줍니다.
+
+    크기/수정시각이 그대로인 파일은 해시도 다시 계산하지 않습니다.
+    월별 파일이 날짜를 모두 덮는 subway.csv 는 저장소에 남겨 두되 목록에서는 뺍니다.
+    """
+    with _ingest_lock:
+        return _ingest_all(paths, store_dir)
+
+
+def _ingest_all(paths, store_dir):
+    manifest = load_manifest(store_dir)
+    if manifest.get("layout") != LAYOUT:
+        # 예전 배치(날짜/노선 파티션)로 쓴 저장소는 지우고 처음부터 다시 넣음
+        shutil.rmtree(store_dir, ignore_errors=True)
+        manifest = load_manifest(store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    sources, files = manifest["sources"], manifest["files"]
+    changed = False
+
+    for path in discover_sources() if paths is None else paths:
+        path = os.path.abspath(path)
+        st_ = os.stat(path)
+        stat_key = [st_.st_size, st_.st_mtime_ns]
+        known = files.get(path)
+        if known and known["stat"] == stat_key:
+            continue
+
+        digest = file_digest(path)
+        if digest not in sources:
+            rows, days = ingest_file(path, digest, store_dir)
+            sources[digest] = {"path": path, "rows": rows, "days": days}
+        files[path] = {"stat": stat_key, "digest": digest}
+        changed = True
+
+    # 지워진 파일은 목록에서 빼고, 어느 파일도 가리키지 않는 원본(지워졌거나 수정 전 내용)의 조각은 삭제
+    for path in [p for p in files if not os.path.exists(p)]:
+        del files[path]
+        changed = True
+    referenced = {f["digest"] for f in files.values()}
+    for digest in [d for d in sources if d not in referenced]:
+        for old in source_files([digest], store_dir):
+            os.remove(old)
+        del sources[digest]
+        changed = True
+
+    for digest, info in sources.items():
+        if "days" not in info:
+            info["days"] = _source_days(digest, store_dir)
+            changed = True
+
+    if changed:
+        save_manifest(manifest, store_dir)
+    covered = covered_bundled(manifest)
+    return tuple(d for d in sources if d not in covered)
+
+
+if __name__ == "__main__":
+    before = set(load_manifest()["sources"])
+    digests = ingest_all(sys.argv[1:] or None)
+    manifest = load_manifest()
+    for d in digests:
+        if d not in before:
+            info = manifest["sources"][d]
+            print(f"{info['path']}: {info['rows']} rows -> {SUBWAY_STORE}")
+    for d in covered_bundled(manifest):
+        print(f"{manifest['sources'][d]['path']}: 월별 파일과 날짜가 겹쳐 제외")
+    print(f"{len(digests)} source file(s) in store")
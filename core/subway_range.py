@@ -0,0 +1,205 @@
+# 역 × 날짜 누적합(prefix sum) 배열로 기간 합계 / 이동평균 / 전주 대비 계산
+#
+# cumsum[:, j] 는 첫날부터 j-1 번째 날까지의 총승객수 합이라서,
+# 어떤 기간 [s, e] 의 합계도 cumsum[:, e + 1] - cumsum[:, s] 두 번의 조회로 끝납니다.
+#
+# 새 달 파일이 들어오면 IncrementalPrefix 가 그 파일분만 일 승객수 배열에 더하고,
+# 누적합은 바뀐 첫 날짜 열부터만 다시 계산합니다 (앞 열은 지난 결과를 그대로 복사).
+import datetime
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.schema import day_offsets
+
+
+def _to_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(str(value), "%Y%m%d").date()
+
+
+class RidershipPrefix:
+    """역별/노선별 일 승객수 누적합. build_prefix_sums() 나 IncrementalPrefix 로 만듭니다."""
+
+    def __init__(self, stations, first_day, station_csum, lines, line_of_station, line_csum=None):
+        self.stations = stations            # DataFrame [노선명, 역명], 행 순서 = 배열 행 순서
+        self.first_day = first_day          # datetime.date
+        self.csum = station_csum            # (역 수, 날짜 수 + 1)
+        self.lines = lines                  # 노선명 목록, 행 순서 = line_csum 행 순서
+        self.line_of_station = line_of_station
+        if line_csum is None:
+            line_csum = np.zeros((len(lines), station_csum.shape[1]), dtype=station_csum.dtype)
+            np.add.at(line_csum, line_of_station, station_csum)
+        self.line_csum = line_csum
+
+    @property
+    def n_days(self):
+        return self.csum.shape[1] - 1
+
+    @property
+    def last_day(self):
+        return self.first_day + datetime.timedelta(days=self.n_days - 1)
+
+    def day_index(self, day):
+        """날짜 → 배열 열 번호. 데이터 기간 밖이면 ValueError (양 끝으로 맞추지 않음)."""
+        day = _to_date(day)
+        i = (day - self.first_day).days
+        if not 0 <= i < self.n_days:
+            raise ValueError(f"{day} 는 데이터 기간({self.first_day} ~ {self.last_day}) 밖입니다")
+        return i
+
+    def _window(self, csum, end, days):
+        """end 까지 최근 days 일 합계와 실제로 더한 날 수 (데이터 첫날 근처에서는 days 보다 짧음)."""
+        e = self.day_index(end) + 1
+        s = max(e - days, 0)
+        return csum[:, e] - csum[:, s], e - s
+
+    def range_total(self, start, end, by_line=False):
+        """[start, end] 기간(양 끝 포함)의 역별(또는 노선별) 총승객수."""
+        csum = self.line_csum if by_line else self.csum
+        return csum[:, self.day_index(end) + 1] - csum[:, self.day_index(start)]
+
+    def rolling_mean(self, end, days, by_line=False):
+        """end 까지 최근 days 일의 일평균 (첫 days-1 일은 있는 날까지의 평균, rolling_series 와 같음)."""
+        csum = self.line_csum if by_line else self.csum
+        total, length = self._window(csum, end, days)
+        return total / length
+
+    def week_over_week(self, end, by_line=False):
+        """end 까지 최근 7일 합계 - 그 전 7일 합계. 14일이 안 쌓였으면 모름(NaN)."""
+        csum = self.line_csum if by_line else self.csum
+        this_week, _ = self._window(csum, end, 7)
+        prev_end = self.day_index(end) - 7
+        if prev_end - 6 < 0:
+            return np.full(len(this_week), np.nan)
+        prev_week, _ = self._window(csum, self.first_day + datetime.timedelta(days=prev_end), 7)
+        return (this_week - prev_week).astype(np.float64)
+
+    def rolling_series(self, row, days, by_line=False):
+        """한 역(또는 노선)의 날짜별 days 일 이동평균 (첫 days-1 일은 있는 날까지의 평균)."""
+        c = (self.line_csum if by_line else self.csum)[row]
+        idx = np.arange(1, self.n_days + 1)
+        lo = np.maximum(idx - days, 0)
+        values = (c[idx] - c[lo]) / (idx - lo)
+        return pd.Series(values, index=pd.date_range(self.first_day, periods=self.n_days, freq="D"))
+
+    def daily(self, rows, start, end):
+        """[start, end] 기간의 날짜별 승객수. rows: 역 행 번호 목록 → DataFrame (날짜 × 행)."""
+        s, e = self.day_index(start), self.day_index(end)
+        values = np.diff(self.csum[np.asarray(rows), s:e + 2], axis=1)
+        return pd.DataFrame(values.T, index=pd.date_range(self.first_day + datetime.timedelta(days=s),
+                                                          periods=e - s + 1, freq="D"))
+
+
+class PrefixBuilder:
+    """원본 행 조각(날짜 구간별 DataFrame)을 하나씩 더해 역 × 날짜 일 승객수 배열을 키워 갑니다.
+
+    더한 조각은 들고 있지 않으므로 메모리는 결과 배열 크기만큼만 씁니다.
+    build() 를 다시 부르면 지난 build() 뒤에 바뀐 첫 날짜 열부터만 누적합을 계산합니다.
+    """
+
+    def __init__(self):
+        self.keys = {}                      # (노선명, 역명) → 행 (처음 나온 순서)
+        self.first_day = None               # datetime.date, daily 의 0번 열
+        self.daily = np.zeros((0, 0), dtype=np.int64)
+        self._built = None                  # 지난 build() 의 RidershipPrefix
+        self._dirty = 0                     # 지난 build() 뒤에 바뀐 첫 열 (이 앞 누적합은 그대로)
+
+    def add(self, df):
+        if df.empty:
+            return
+        first, day_idx = day_offsets(df["사용일자"])
+        first = first.date()
+        codes, uniques = pd.factorize(pd.MultiIndex.from_arrays([df["노선명"].astype(str), df["역명"].astype(str)]))
+        rows = np.array([self.keys.setdefault(key, len(self.keys)) for key in uniques], dtype=np.int64)
+
+        # 날짜 축 / 역 축을 필요한 만큼 늘림 (앞 날짜가 오면 앞쪽으로도)
+        if self.first_day is None:
+            self.first_day = first
+        before = max((self.first_day - first).days, 0)
+        self.first_day = min(self.first_day, first)
+        cols = day_idx + (first - self.first_day).days
+        width = max(before + self.daily.shape[1], int(cols.max()) + 1)
+        if (len(self.keys), width) != self.daily.shape:
+            grown = np.zeros((len(self.keys), width), dtype=np.int64)
+            grown[:self.daily.shape[0], before:before + self.daily.shape[1]] = self.daily
+            self.daily = grown
+
+        total = df["승차총승객수"].to_numpy(dtype=np.int64) + df["하차총승객수"].to_numpy(dtype=np.int64)
+        np.add.at(self.daily, (rows[codes], cols), total)
+        # 앞쪽으로 날짜가 늘면 열 번호가 모두 밀리므로 처음부터
+        self._dirty = 0 if before else min(self._dirty, int(cols.min()))
+
+    def build(self):
+        """지금까지 더한 행의 RidershipPrefix. 아무것도 더하지 않았으면 ValueError."""
+        if self.first_day is None:
+            raise ValueError("누적합을 만들 지하철 데이터가 없습니다")
+        stations = pd.DataFrame(list(self.keys), columns=["노선명", "역명"])
+        line_idx, lines = pd.factorize(stations["노선명"])
+        csum = np.zeros((len(stations), self.daily.shape[1] + 1), dtype=np.int64)
+        line_csum = np.zeros((len(lines), csum.shape[1]), dtype=np.int64)
+        last, start = self._built, 0
+        if last is not None and len(last.lines) and last.lines == lines.tolist()[:len(last.lines)]:
+            # 새 역은 뒤에만 붙고 지난 열까지는 0 이므로 바뀐 첫 열까지는 지난 누적합 그대로
+            start = min(self._dirty, last.n_days)
+            csum[:last.csum.shape[0], :start + 1] = last.csum[:, :start + 1]
+            line_csum[:len(last.lines), :start + 1] = last.line_csum[:, :start + 1]
+        daily = self.daily[:, start:]
+        np.cumsum(daily, axis=1, out=csum[:, start + 1:])
+        csum[:, start + 1:] += csum[:, start:start + 1]
+        line_daily = np.zeros((len(lines), daily.shape[1]), dtype=np.int64)
+        np.add.at(line_daily, line_idx, daily)
+        np.cumsum(line_daily, axis=1, out=line_csum[:, start + 1:])
+        line_csum[:, start + 1:] += line_csum[:, start:start + 1]
+        self._built = RidershipPrefix(stations, self.first_day, csum, lines.tolist(), line_idx, line_csum)
+        self._dirty = self.daily.shape[1]
+        return self._built
+
+
+def build_prefix_sums(frames):
+    """원본 행(사용일자, 노선명, 역명, 승차/하차총승객수) DataFrame 조각들로 누적합 배열을 만듭니다.
+
+    DataFrame 하나를 줘도 됩니다. 데이터가 없는 날은 0 으로 채워 날짜 축을 달력 그대로 둡니다.
+    """
+    builder = PrefixBuilder()
+    for df in [frames] if isinstance(frames, pd.DataFrame) else frames:
+        builder.add(df)
+    return builder.build()
+
+
+class IncrementalPrefix:
+    """저장소에 새 원본 파일이 들어올 때 그 파일분만 누적합에 더합니다 (IncrementalTopK 와 같은 방식)."""
+
+    def __init__(self):
+        self.builder = PrefixBuilder()
+        self.prefix = None
+        self.sources = ()
+        self._lock = threading.Lock()
+
+    def update(self, sources, load_chunks):
+        """sources: 현재 저장소의 원본 해시 목록, load_chunks(해시 목록) -> DataFrame 조각들 (날짜 구간별)."""
+        with self._lock:
+            if not set(self.sources) <= set(sources):
+                # 원본이 빠지거나 바뀐 경우에는 처음부터 다시 만듦
+                self.builder, self.prefix, self.sources = PrefixBuilder(), None, ()
+            new = [s for s in sources if s not in self.sources]
+            if new or self.prefix is None:
+                for df in load_chunks(new) if new else ():
+                    self.builder.add(df)
+                self.prefix = self.builder.build()
+                self.sources = tuple(sources)
+            return self.prefix
+
+    def checkpoint(self):
+        """디스크에 남길 (원본 목록, 쌓아 둔 배열)."""
+        with self._lock:
+            return self.sources, self.builder
+
+    def restore(self, checkpoint):
+        """checkpoint() 로 남긴 상태에서 이어 갑니다 (아직 아무것도 처리하지 않았을 때만)."""
+        sources, builder = checkpoint
+        with self._lock:
+            if not self.sources:
+                self.sources, self.builder = tuple(sources), builder
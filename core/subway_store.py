@@ -0,0 +1,88 @@
+# 지하철 승하차 Parquet 저장소 (사용월 파티션 + 날짜/노선 순 row group)
+#
+# 사용월(yyyymm) 로만 파티션을 나눠(hive 형식) 원본 청크마다 달별로 파일 하나씩 쓰고,
+# 파일 안의 행은 (사용일자, 노선명) 순으로 정렬해 작은 row group 으로 나눠 둡니다.
+# 날짜/노선으로 읽을 때는 달 디렉터리를 고른 뒤 row group 통계로 필요한 부분만 읽습니다(filter pushdown).
+# 저장소에 데이터를 넣는 쪽은 core/subway_ingest.py.
+import os
+from urllib.parse import unquote
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from core.paths import STORE_DIR
+from core.schema import compact_subway_table
+
+SUBWAY_STORE = os.path.join(STORE_DIR, "subway")
+LAYOUT = "month-v1"         # 저장소 배치가 바뀌면 올림 (subway_ingest 가 예전 저장소를 지우고 다시 넣음)
+
+MONTH_COL = "사용월"
+SORT_KEYS = [("사용일자", "ascending"), ("노선명", "ascending")]
+ROW_GROUP_ROWS = 2048       # 하루치(역 수백 개) 몇 개 정도. 한 (날짜, 노선) 조회는 row group 한두 개만 읽음
+SCHEMA = pa.schema([
+    ("사용일자", pa.int32()),
+    ("노선명", pa.string()),
+    ("역명", pa.string()),
+    ("승차총승객수", pa.int64()),
+    ("하차총승객수", pa.int64()),
+])
+PARTITIONING = ds.partitioning(pa.schema([(MONTH_COL, pa.int32())]), flavor="hive")
+
+
+def _partition_value(dirname):
+    key, _, value = dirname.partition("=")
+    return key, unquote(value)
+
+
+def with_month(table):
+    """(사용일자, 노선명) 순으로 정렬하고 파티션 열(사용월)을 붙인 Table (저장소에 쓰기 직전)."""
+    table = table.sort_by(SORT_KEYS)
+    return table.append_column(MONTH_COL, pc.divide(table["사용일자"], 100).cast(pa.int32()))
+
+
+def _dataset(store_dir, files=None):
+    if files is None:
+        return ds.dataset(store_dir, format="parquet", partitioning=PARTITIONING)
+    return ds.dataset(files, format="parquet", partitioning=PARTITIONING, partition_base_dir=store_dir)
+
+
+def list_partitions(store_dir=SUBWAY_STORE, files=None):
+    """(날짜 목록, 노선 목록). 날짜/노선 두 열만 읽습니다."""
+    if files is None and not os.path.isdir(store_dir):
+        return [], []
+    table = _dataset(store_dir, files).to_table(columns=["사용일자", "노선명"])
+    dates = pc.unique(table["사용일자"]).to_pylist()
+    lines = pc.unique(table["노선명"]).to_pylist()
+    return sorted(dates), sorted(lines)
+
+
+def files_by_month(files, store_dir=SUBWAY_STORE):
+    """parquet 파일 경로 → {사용월: [파일]} (경로의 달 파티션 이름으로만, 읽지 않음)."""
+    by_month = {}
+    for path in files:
+        for part in os.path.relpath(path, store_dir).split(os.sep):
+            key, value = _partition_value(part)
+            if key == MONTH_COL:
+                by_month.setdefault(int(value), []).append(path)
+                break
+    return by_month
+
+
+def load_partitions(dates=None, lines=None, store_dir=SUBWAY_STORE, columns=None, files=None,
+                    compact=True):
+    """선택한 날짜/노선의 행만 읽어 DataFrame 으로 돌려줍니다. None 이면 전체.
+
+    files 를 주면 그 parquet 파일들 안에서만 읽습니다.
+    compact=True 면 core.schema 의 작은 자료형(범주형 역/노선/날짜, uint32 승객수)으로 돌려줍니다.
+    """
+    expr = None
+    if dates is not None:
+        dates = [int(d) for d in dates]
+        # 달 디렉터리로 먼저 거르고, 달 안에서는 row group 의 날짜 최소/최대로 거름
+        expr = ds.field(MONTH_COL).isin(sorted({d // 100 for d in dates})) & ds.field("사용일자").isin(dates)
+    if lines is not None:
+        line_expr = ds.field("노선명").isin(list(lines))
+        expr = line_expr if expr is None else expr & line_expr
+    table = _dataset(store_dir, files).to_table(columns=columns or SCHEMA.names, filter=expr)
+    return compact_subway_table(table) if compact else table.to_pandas()
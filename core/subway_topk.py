@@ -0,0 +1,158 @@
+# (사용일자, 노선명) → 승객수 상위 K개 역 인덱스
+#
+# 데이터를 읽을 때 한 번만 만들어 두고, 선택이 바뀔 때는 딕셔너리 조회만 합니다.
+# 큐브는 모든 (날짜, 노선)의 상위 행을 이어 붙인 DataFrame 하나 + 키별 구간이라서
+# 조각 DataFrame 수천 개를 들고 있을 때보다 작고, 디스크 캐시에서 되살리는 것도 빠릅니다.
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from core.schema import date_key
+
+TOTAL_COL = "총승객수"
+
+
+class TopKCube(Mapping):
+    """{(사용일자, 노선명): 상위 k개 행 DataFrame} 처럼 쓰는 읽기 전용 매핑. 조회할 때 구간만 잘라 줍니다."""
+
+    def __init__(self, frame, keys, offsets):
+        self.frame = frame              # 모든 키의 상위 행을 키 순서대로 이어 붙인 DataFrame
+        self.spans = {key: (int(offsets[i]), int(offsets[i + 1])) for i, key in enumerate(keys)}
+
+    def __getitem__(self, key):
+        s, e = self.spans[key]
+        return self.frame.iloc[s:e].reset_index(drop=True)
+
+    def __iter__(self):
+        return iter(self.spans)
+
+    def __len__(self):
+        return len(self.spans)
+
+    @classmethod
+    def from_dict(cls, cube):
+        if not cube:
+            return cls(pd.DataFrame(columns=EMPTY_COLUMNS), [], [0])
+        keys = list(cube)
+        frames = [cube[key] for key in keys]
+        offsets = np.r_[0, np.cumsum([len(f) for f in frames])]
+        return cls(concat_frames(frames), keys, offsets)
+
+
+def concat_frames(frames):
+    """pd.concat(ignore_index=True) 과 같지만, 조각마다 범주가 다른 범주형 컬럼도 범주를 합쳐 범주형으로 둡니다."""
+    out = pd.concat(frames, ignore_index=True)
+    for col in out.columns:
+        parts = [f[col] for f in frames]
+        if not isinstance(out[col].dtype, pd.CategoricalDtype) and all(
+            isinstance(p.dtype, pd.CategoricalDtype) for p in parts
+        ):
+            out[col] = union_categoricals(parts)
+    return out
+
+
+EMPTY_COLUMNS = ["사용일자", "노선명", "역명", "승차총승객수", "하차총승객수", TOTAL_COL]
+
+
+def build_topk_cube(df, k=10):
+    """(사용일자, 노선명) → 상위 k개 행 DataFrame(총승객수 내림차순) 매핑(TopKCube)을 만듭니다."""
+    total = df["승차총승객수"].to_numpy(dtype=np.int64) + df["하차총승객수"].to_numpy(dtype=np.int64)
+    # 범주형 컬럼이면 코드만 다시 번호 매김 (문자열 비교 없음)
+    date_codes, dates = pd.factorize(df["사용일자"])
+    line_codes, lines = pd.factorize(df["노선명"])
+    dates, lines = [date_key(d) for d in dates], list(lines)
+
+    # 그룹 번호 순으로 한 번 정렬한 뒤 구간별로 잘라 씀
+    group = date_codes.astype(np.int64) * len(lines) + line_codes
+    order = np.argsort(group, kind="stable")
+    bounds = np.flatnonzero(np.diff(group[order])) + 1
+    starts = np.r_[0, bounds]
+    ends = np.r_[bounds, len(order)]
+
+    picked, keys, sizes = [], [], []
+    for s, e in zip(starts, ends):
+        idx = order[s:e]
+        vals = total[idx]
+        if len(idx) > k:
+            part = np.argpartition(-vals, k - 1)[:k]
+            idx, vals = idx[part], vals[part]
+        picked.append(idx[np.argsort(-vals, kind="stable")])
+        g = group[idx[0]]
+        keys.append((dates[g // len(lines)], lines[g % len(lines)]))
+        sizes.append(len(picked[-1]))
+
+    if not picked:
+        return TopKCube.from_dict({})
+    rows = np.concatenate(picked)
+    top = df.iloc[rows].reset_index(drop=True)
+    top[TOTAL_COL] = total[rows]
+    return TopKCube(top, keys, np.r_[0, np.cumsum(sizes)])
+
+
+def lookup_topk(cube, date, line):
+    """선택한 (날짜, 노선)의 상위 역. 데이터가 없으면 빈 DataFrame."""
+    top = cube.get((date, line))
+    if top is None:
+        return pd.DataFrame(columns=EMPTY_COLUMNS)
+    return top
+
+
+def merge_topk_cube(cube, new_cube, k=10):
+    """두 큐브를 합칩니다. 같은 (날짜, 노선)이 양쪽에 있으면 합친 뒤 다시 상위 k개."""
+    if not cube:
+        return new_cube
+    if isinstance(cube, TopKCube) and isinstance(new_cube, TopKCube) and not cube.spans.keys() & new_cube.spans.keys():
+        # 새 달처럼 겹치는 키가 없으면 이어 붙이기만 함
+        keys = list(cube) + list(new_cube)
+        sizes = [e - s for s, e in cube.spans.values()] + [e - s for s, e in new_cube.spans.values()]
+        frames = [cube.frame, new_cube.frame]
+        return TopKCube(concat_frames(frames), keys, np.r_[0, np.cumsum(sizes)])
+    merged = dict(cube)
+    for key, top in new_cube.items():
+        if key in merged:
+            both = concat_frames([merged[key], top])
+            top = both.sort_values(TOTAL_COL, ascending=False, kind="stable").head(k)
+            top = top.reset_index(drop=True)
+        merged[key] = top
+    return TopKCube.from_dict(merged)
+
+
+class IncrementalTopK:
+    """저장소에 새 원본 파일이 들어올 때 그 파일분만 읽어 큐브에 더합니다."""
+
+    def __init__(self, k=10):
+        self.k = k
+        self.cube = {}
+        self.sources = ()
+        self._lock = threading.Lock()
+
+    def update(self, sources, load_chunks):
+        """sources: 현재 저장소의 원본 해시 목록, load_chunks(해시 목록) -> DataFrame 조각들 (날짜 구간별).
+
+        조각마다 큐브를 만들어 더하고 버리므로 원본 행 전체를 한꺼번에 들고 있지 않습니다.
+        """
+        with self._lock:
+            if not set(self.sources) <= set(sources):
+                # 원본이 빠지거나 바뀐 경우에는 처음부터 다시 만듦
+                self.cube, self.sources = {}, ()
+            new = [s for s in sources if s not in self.sources]
+            if new:
+                for df in load_chunks(new):
+                    self.cube = merge_topk_cube(self.cube, build_topk_cube(df, self.k), self.k)
+                self.sources = tuple(sources)
+            return self.cube
+
+    def checkpoint(self):
+        """디스크에 남길 (원본 목록, 큐브)."""
+        with self._lock:
+            return self.sources, self.cube
+
+    def restore(self, checkpoint):
+        """checkpoint() 로 남긴 상태에서 이어 갑니다 (아직 아무것도 처리하지 않았을 때만)."""
+        sources, cube = checkpoint
+        with self._lock:
+            if not self.sources:
+                self.cube, self.sources = cube, tuple(sources)
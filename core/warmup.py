@@ -0,0 +1,219 @@
+# 서버가 뜬 직후 무거운 모듈 import 와 공유 데이터셋 생성을 백그라운드 스레드에서 미리 해 두기
+#
+#   from core import warmup
+#   warmup.start()                      # main.py / 각 페이지 맨 위 (프로세스당 한 번만 실제로 돎)
+#
+#   python -m core.warmup               # 데이터셋을 만들어 디스크 캐시를 채움 (배포 직후 한 번)
+#   python -m core.warmup --imports     # 페이지별 import 시간 (streamlit 을 뺀 나머지)
+#
+# 첫 방문자가 어느 페이지로 들어오든 그 rerun 이 한 번 돌 동안 나머지 데이터셋은 옆에서 만들어지고,
+# 다음 페이지로 넘어가면 import / CSV 파싱 / 큐브 생성 없이 웜 rerun 과 비슷한 시간에 그려집니다.
+# 이 모듈은 import 만으로는 pandas 등을 불러오지 않습니다 (00, 01 페이지처럼 필요 없는 페이지가 있으므로).
+# APP_WARMUP=0 이면 아무것도 하지 않습니다 (벤치마크의 cold / restart 측정 등).
+import argparse
+import ast
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from core.paths import ROOT
+
+HEAVY_MODULES = ("numpy", "pandas", "pyarrow.dataset", "plotly.express", "plotly.graph_objects", "altair")
+
+_lock = threading.Lock()
+_thread = None
+_done = threading.Event()
+_steps = []       # [{"step", "seconds", "error"}] 끝난 순서대로
+
+
+def enabled():
+    return os.environ.get("APP_WARMUP") != "0"
+
+
+def _figures():
+    # 첫 그림에서 한 번만 드는 plotly 검증기 / 템플릿, altair 스키마 로딩
+    import altair as alt
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+    frame = pd.DataFrame({"x": [0.0], "y": [0.0]})
+    go.Figure(go.Bar(x=frame["x"], y=frame["y"])).update_layout(template="plotly_white").to_plotly_json()
+    px.scatter_map(frame, lat="y", lon="x").to_plotly_json()
+    alt.Chart(frame).mark_bar().encode(x="x:Q", y="y:Q").to_dict()
+
+
+def _subway():
+    from core import queries
+    sources = queries.subway_sources()
+    queries.subway_index(sources)
+    queries.subway_prefix(sources)
+    queries.station_index(sources)
+    queries.subway_anomalies(sources)
+
+
+def _prices():
+    from core import queries
+    queries.price_table()
+
+
+def _mbti():
+    from core import queries
+    queries.mbti_matrix()
+    queries.mbti_neighbors("jensenshannon")
+
+
+def _attractions():
+    from core import queries
+    queries.attractions_grid()
+    queries.attractions_distances()
+
+
+def _recommend():
+    # 16개 유형 순위표를 종류마다 한 번의 행렬 곱으로 (00, 01 페이지는 잘라 보여 주기만 함)
+    from core import recommend
+    catalog = recommend.load_catalog()
+    for kind in recommend.KINDS:
+        catalog.rank(kind, recommend.TYPES)
+
+
+# (단계 이름, 함수). 앞 단계가 실패해도 다음 단계는 계속함
+STEPS = [
+    ("imports", lambda: [importlib.import_module(m) for m in HEAVY_MODULES]),
+    ("figures", _figures),
+    ("subway", _subway),
+    ("prices", _prices),
+    ("mbti", _mbti),
+    ("attractions", _attractions),
+    ("recommend", _recommend),
+]
+
+
+def run(steps=STEPS):
+    """단계를 차례로 실행하고 결과 목록을 돌려줍니다 (현재 스레드에서)."""
+    results = []
+    for name, fn in steps:
+        start = time.perf_counter()
+        error = None
+        try:
+            fn()
+        except Exception as e:      # 데이터 파일이 없거나 깨져도 페이지는 스스로 다시 시도함
+            error = f"{type(e).__name__}: {e}"
+        result = {"step": name, "seconds": round(time.perf_counter() - start, 3), "error": error}
+        results.append(result)
+        _steps.append(result)
+    return results
+
+
+def _main_thread():
+    try:
+        run()
+    finally:
+        _done.set()
+
+
+def start():
+    """백그라운드 워밍업을 시작합니다. 이미 시작했거나 꺼져 있으면 아무것도 하지 않습니다."""
+    global _thread
+    if not enabled():
+        return False
+    with _lock:
+        if _thread is not None:
+            return False
+        _thread = threading.Thread(target=_main_thread, name="app-warmup", daemon=True)
+        try:
+            # st.cache_resource 를 스크립트 밖 스레드에서 부를 때 나오는 경고를 없앰
+            from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+            add_script_run_ctx(_thread, get_script_run_ctx(suppress_warning=True))
+        except ImportError:
+            pass
+        _thread.start()
+    return True
+
+
+def started():
+    return _thread is not None
+
+
+def wait(timeout=None):
+    """워밍업이 끝날 때까지 기다립니다. 끝났으면 True."""
+    if _thread is None:
+        return True
+    return _done.wait(timeout)
+
+
+def status():
+    """[{"step", "seconds", "error"}] 지금까지 끝난 단계."""
+    return list(_steps)
+
+
+# ------------------------------------
+# 페이지별 import 시간
+# ------------------------------------
+def page_imports(path):
+    """페이지 파일 맨 위 수준의 import 문 (소스 문자열 목록)."""
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    tree = ast.parse(source)
+    return [ast.get_source_segment(source, node) for node in tree.body
+            if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+
+def measure_imports(path):
+    """새 프로세스에서 streamlit 을 먼저 불러온 뒤 페이지의 import 에 드는 시간을 잽니다.
+
+    (전체 초, [(모듈, 초)] 오래 걸린 순) — 모듈은 페이지가 직접 import 한 것 기준.
+    """
+    code = "import streamlit\n" + "\n".join(page_imports(path))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    modules, after_streamlit = [], False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not name.startswith(" ") or name.startswith("  "):
+            continue        # 맨 위 수준 import 만 (들여쓰기 = 다른 모듈 안에서 불린 것)
+        name = name.strip()
+        if name == "streamlit":
+            after_streamlit = True
+        elif after_streamlit:
+            modules.append((name, int(cumulative) / 1e6))
+    modules.sort(key=lambda m: m[1], reverse=True)
+    return sum(s for _, s in modules), modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="데이터셋 워밍업 / 페이지별 import 시간")
+    parser.add_argument("--imports", action="store_true", help="페이지별 import 시간만 잼")
+    parser.add_argument("--top", type=int, default=5, help="페이지마다 보여줄 모듈 수")
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        pages = ["main.py"] + sorted(
+            os.path.join("pages", n) for n in os.listdir(os.path.join(ROOT, "pages")) if n.endswith(".py")
+        )
+        for page in pages:
+            total, modules = measure_imports(os.path.join(ROOT, page))
+            top = ", ".join(f"{name} {sec * 1000:.0f}ms" for name, sec in modules[:args.top])
+            print(f"{page:<30} {total * 1000:8.0f} ms  {top}")
+        return 0
+
+    import logging
+    importlib.import_module("streamlit")    # import 될 때 로거 수준을 다시 정하므로 먼저 불러옴
+    # Streamlit 밖에서 st.cache_resource 를 쓸 때 나오는 경고는 감춤
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").setLevel(logging.ERROR)
+    logging.getLogger("streamlit.runtime.caching.cache_data_api").setLevel(logging.ERROR)
+    failed = False
+    for r in run():
+        print(f"{r['step']:<12} {r['seconds']:8.3f} s" + (f"  {r['error']}" if r["error"] else ""))
+        failed |= r["error"] is not None
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
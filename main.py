@@ -1,7 +1,13 @@
 import streamlit as st
+
+from core import warmup
+
+# 서버가 뜬 뒤 첫 방문 때 다른 페이지의 데이터셋을 옆에서 미리 만들어 둠
+warmup.start()
+
 st.title('나의 첫 웹 서비스 만들기!!')
 name=st.text_input('이름을 입력하세요:')
-st.selectbox('좋아하는 음식을 선택해주세요:',['김치찌개','된장찌개'])
+menu=st.selectbox('좋아하는 음식을 선택해주세요:',['김치찌개','된장찌개'])
 if st.button('인사말생성'):
   st.info(name+'님! 안녕하세요')
   st.warning(menu+'를 좋아하시나봐요! 저도 좋아해요!')
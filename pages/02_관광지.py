@@ -2,83 +2,171 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+
+from core import charts, profiling, queries, warmup
+from core.spatial import cluster_markers
 
 # ------------------------------------
 # 페이지 설정
 # ------------------------------------
 st.set_page_config(page_title="서울 관광지 지도", page_icon="🗺️", layout="wide")
+profiling.begin("02_관광지")
+warmup.start()
+
+MAX_MARKERS = 300   # 브라우저로 보내는 마커 수 상한
+INTRO_TOP = 10
+MAX_TRIP_TOP = 300  # 일정 짜기에서 고를 수 있는 인기 상위 관광지 수
+TRIP_DEFAULT = 5
+TRIP_LABELS = 30    # 이보다 적게 들르면 지도에 순서 번호를 적음
 
 st.title("🌆 외국인들이 사랑하는 서울의 관광지 TOP10")
 st.write("Plotly(풀리우) 지도 위에 서울의 대표 관광지 10곳을 나노 색상 테마로 시각화했습니다.")
 
 # ------------------------------------
-# 관광지 데이터 (위도, 경도, 설명)
-# ------------------------------------
-data = {
-    "관광지": [
-        "경복궁", "명동", "남산타워(N서울타워)", "홍대 거리", "북촌 한옥마을",
-        "롯데월드", "청계천", "동대문 디자인플라자(DDP)", "잠실 롯데타워", "광장시장"
-    ],
-    "위도": [
-        37.579617, 37.563757, 37.551169, 37.556308, 37.582604,
-        37.511000, 37.569124, 37.566479, 37.513068, 37.570243
-    ],
-    "경도": [
-        126.977041, 126.985302, 126.988227, 126.923651, 126.983020,
-        127.098000, 126.978395, 127.009010, 127.102521, 126.998177
-    ],
-    "인기지수(%)": [98, 96, 94, 92, 90, 89, 87, 85, 84, 82],
-    "소개": [
-        "조선 왕조의 중심 궁궐로, 전통 한복 체험이 인기입니다.",
-        "서울 최고의 쇼핑 거리이자 길거리 음식의 천국입니다.",
-        "서울 전경을 한눈에 볼 수 있는 전망 명소입니다.",
-        "젊음과 예술이 가득한 거리로 외국인 관광객에게 인기입니다.",
-        "전통 한옥과 현대 문화가 공존하는 마을입니다.",
-        "서울 도심 속 대형 놀이공원으로 가족 단위 여행객에게 인기입니다.",
-        "도심 속을 흐르는 산책로로 힐링 명소로 꼽힙니다.",
-        "현대적 건축미와 패션, 전시 문화의 중심지입니다.",
-        "서울의 랜드마크 초고층 타워로 야경이 아름답습니다.",
-        "전통 시장의 정취와 다양한 먹거리를 즐길 수 있습니다."
-    ]
-}
-
-df = pd.DataFrame(data)
-
-# ------------------------------------
-# Plotly 지도 시각화 (마커: 노란색)
-# ------------------------------------
-fig = px.scatter_mapbox(
-    df,
-    lat="위도",
-    lon="경도",
-    hover_name="관광지",
-    hover_data={"위도": False, "경도": False, "인기지수(%)": True},
-    zoom=11,
-    height=560,  # 지도 크기 (약 80%)
-)
-
-fig.update_traces(
-    marker=dict(size=18, color="gold", opacity=0.9)
-)
-
-fig.update_layout(
-    mapbox_style="carto-positron",  # 나노 느낌의 컬러풀 지도 스타일
-    title="🗺️ 서울 외국인 인기 관광지 지도",
-    title_font=dict(size=22, color="#333", family="Pretendard"),
-    margin=dict(l=10, r=10, t=60, b=10),
-    paper_bgcolor="#F9FAFB",
-)
+# 관광지 데이터 (위도, 경도, 인기지수, 설명) + 격자 인덱스 (모든 세션이 한 벌 공유: core/queries.py)
+# ------------------------------------
+with profiling.stage("load"):
+    df = queries.attractions()
+    index = queries.attractions_grid()
+
+zoom = st.sidebar.slider("🔍 지도 확대 수준", 8, 16, 11)
+
+# ------------------------------------
+# Plotly 지도 시각화 (마커: 노란색, 가까운 관광지는 확대 수준에 맞춰 묶음)
+# 확대 수준마다 한 번만 그리고 모든 세션이 재사용 (좌표/개수는 float32·작은 정수형으로 보냄: core/charts.py)
+# ------------------------------------
+def build_map():
+    markers = cluster_markers(df, zoom, max_markers=MAX_MARKERS)
+    fig = px.scatter_map(
+        charts.compact_frame(markers, ["위도", "경도", "개수"]),    # 툴팁에 그대로 찍히는 인기지수는 원래 값
+        lat="위도",
+        lon="경도",
+        size="개수",
+        size_max=30,
+        hover_name="대표",
+        hover_data={"위도": False, "경도": False, "개수": True, "인기지수(%)": True},
+        zoom=zoom,
+        height=560,  # 지도 크기 (약 80%)
+    )
+
+    fig.update_traces(
+        marker=dict(color="gold", opacity=0.9, sizemin=12)
+    )
+
+    fig.update_layout(
+        map_style="carto-positron",  # 나노 느낌의 컬러풀 지도 스타일
+        title="🗺️ 서울 외국인 인기 관광지 지도",
+        title_font=dict(size=22, color="#333", family="Pretendard"),
+        margin=dict(l=10, r=10, t=60, b=10),
+        paper_bgcolor="#F9FAFB",
+    )
+    return fig, len(markers)
+
+with profiling.stage("figure"):
+    fig, n_markers = charts.cached_figure("attractions_map", (zoom,), build_map, depends=["attractions"])
 
 # ------------------------------------
 # 지도 출력
 # ------------------------------------
-st.plotly_chart(fig, use_container_width=True)
+with profiling.stage("render"):
+    st.plotly_chart(fig, use_container_width=True)
+    if n_markers < len(df):
+        st.caption(f"관광지 {len(df):,}곳을 마커 {n_markers:,}개로 묶어 표시했습니다. 확대하면 나뉘어 보입니다.")
+
+# ------------------------------------
+# 가까운 관광지 찾기
+# ------------------------------------
+st.markdown("## 📍 가까운 관광지 찾기")
+col1, col2, col3 = st.columns([2, 1, 1])
+with col1:
+    origin = st.selectbox("기준 관광지", df["관광지"])
+with col2:
+    mode = st.radio("검색 방식", ["가까운 N곳", "반경 R km"], horizontal=True)
+with col3:
+    if mode == "가까운 N곳":
+        n = st.slider("개수", 1, 20, 5)
+    else:
+        radius = st.slider("반경 (km)", 0.5, 20.0, 3.0, step=0.5)
+
+with profiling.stage("nearby"):
+    row = df.index[df["관광지"] == origin][0]
+    lat, lon = df.at[row, "위도"], df.at[row, "경도"]
+    if mode == "가까운 N곳":
+        idx, dist = index.nearest(lat, lon, n + 1)
+    else:
+        idx, dist = index.within(lat, lon, radius)
+    keep = idx != row   # 기준 관광지 자신은 제외
+    nearby = df.loc[idx[keep], ["관광지", "인기지수(%)", "소개"]].assign(**{"거리(km)": dist[keep].round(2)})
+    if mode == "가까운 N곳":
+        nearby = nearby.head(n)
+
+st.dataframe(nearby.reset_index(drop=True), hide_index=True)
+
+# ------------------------------------
+# 하루 일정 짜기 (출발지 + 고른 관광지를 짧게 도는 순서: core/itinerary.py)
+# ------------------------------------
+st.markdown("## 🧭 하루 일정 짜기")
+# 고를 수 있는 곳은 인기 상위 MAX_TRIP_TOP 곳 (관광지가 수천 곳이어도 선택 상자는 가볍게)
+trip_names = df["관광지"].head(MAX_TRIP_TOP)
+col1, col2 = st.columns([1, 2])
+with col1:
+    trip_start = st.selectbox("출발 관광지", trip_names)
+    trip_top = st.slider("인기 상위 N곳 넣기", 0, len(trip_names), 0)
+    pop_weight = st.slider("인기 가중치", 0.0, 2.0, 1.0, step=0.5,
+                           help="클수록 조금 더 돌더라도 인기 많은 곳을 먼저 들릅니다. 0 이면 거리만 봅니다.")
+with col2:
+    trip_picks = st.multiselect("들를 관광지", trip_names, default=list(trip_names.head(TRIP_DEFAULT)))
+
+with profiling.stage("itinerary"):
+    # 관광지 이름 → 행 번호 (attractions() 는 인기지수 내림차순이라 상위 N곳은 앞 N행)
+    rows_by_name = pd.Series(trip_names.index, index=trip_names)
+    start_row = int(rows_by_name[trip_start])
+    stops = set(range(trip_top)) | set(rows_by_name[trip_picks].tolist())
+    stops.discard(start_row)
+    route = queries.attraction_route(start_row, stops, pop_weight)
+    trip = df.loc[route.rows, ["관광지", "인기지수(%)", "위도", "경도"]].assign(
+        **{"구간(km)": route.legs.round(2), "누적(km)": route.legs.cumsum().round(2)}
+    ).reset_index(drop=True)
+    trip.insert(0, "순서", range(len(trip)))
+
+def build_trip_map():
+    fig = go.Figure(go.Scattermap(
+        lat=charts.compact(trip["위도"].to_numpy()),
+        lon=charts.compact(trip["경도"].to_numpy()),
+        mode="lines+markers+text" if len(trip) <= TRIP_LABELS else "lines+markers",
+        text=[str(i) for i in trip["순서"]],
+        textposition="top right",
+        hovertext=trip["관광지"],
+        hoverinfo="text",
+        marker=dict(size=10, color="tomato"),
+        line=dict(width=2, color="tomato"),
+    ))
+    fig.update_layout(
+        map=dict(style="carto-positron", zoom=zoom, center=dict(lat=trip["위도"].mean(), lon=trip["경도"].mean())),
+        height=480,
+        margin=dict(l=10, r=10, t=10, b=10),
+    )
+    return fig
+
+with profiling.stage("itinerary_figure"):
+    trip_fig = charts.cached_figure(
+        "itinerary_map", (start_row, tuple(sorted(stops)), pop_weight, zoom), build_trip_map, depends=["attractions"]
+    )
+
+with profiling.stage("itinerary_render"):
+    col1, col2, col3 = st.columns(3)
+    col1.metric("들를 곳", f"{len(stops)}곳")
+    col2.metric("총 이동 거리", f"{route.total:.1f} km")
+    col3.metric("인기순으로 돌 때보다", f"{route.baseline - route.total:.1f} km 짧음")
+    st.plotly_chart(trip_fig, use_container_width=True)
+    st.dataframe(trip.drop(columns=["위도", "경도"]), hide_index=True)
 
 # ------------------------------------
 # 관광지 간단 소개
 # ------------------------------------
 st.markdown("## 🏙️ 서울 주요 관광지 한눈에 보기")
-for i in range(len(df)):
+for i in range(min(INTRO_TOP, len(df))):
     st.markdown(f"""
     **{i+1}. {df['관광지'][i]}**  
     👉 {df['소개'][i]}  
@@ -93,3 +181,4 @@ st.markdown("""
 ✨ 더 많은 한국형 AI & 데이터 시각화 예제는 [gptonline.ai](https://gptonline.ai/ko/) 에서 확인하세요!
 """)
 
+profiling.finish()
@@ -1,97 +1,50 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+from plotly.colors import n_colors
+
+from core import charts, profiling, queries, warmup
+from core.mbti_similarity import cut_clusters
 
 st.set_page_config(page_title="Countries MBTI Dashboard", layout="wide")
+profiling.begin("03_MBTI")
+warmup.start()
 
-# -----------------------------
-# 1. 데이터 로드
-# -----------------------------
-@st.cache_data
-def load_data():
-    df = pd.read_csv("countriesMBTI_16types.csv")
-    return df
+KOREA = "South Korea"
+TOP_N = 10
+MAX_NEIGHBORS = queries.MAX_NEIGHBORS
+MAX_CLUSTER_ROWS = 3000  # 군집은 전체 거리 행렬이 필요해서 행 수가 이보다 많으면 생략
+METRICS = {"Jensen–Shannon": "jensenshannon", "코사인": "cosine"}
 
-df = load_data()
+# ---------------------------
+# 데이터 로드 (국가 × 유형 행렬 + 미리 계산한 순위, 모든 세션이 한 벌 공유: core/queries.py)
+# ---------------------------
+with profiling.stage("load"):
+    mbti = queries.mbti_matrix()
+countries = mbti.countries
+mbti_cols = mbti.types
 
 st.title("🌍 Countries MBTI Dashboard")
 st.write("국가를 선택하면 MBTI 비율을 인터랙티브 그래프로 보여줍니다!")
 
-# -----------------------------
-# 2. 국가 선택 UI
-# -----------------------------
-countries = df["Country"].unique()
-selected_country = st.selectbox("국가 선택", countries)
-
-# -----------------------------
-# 3. 선택 국가의 MBTI 데이터 추출
-# -----------------------------
-row = df[df["Country"] == selected_country].iloc[0]
-
-mbti_cols = [c for c in df.columns if c != "Country"]
-values = row[mbti_cols].values
-
-# MBTI별 값 정렬 (1등 색 강조 위해)
-sorted_indices = values.argsort()[::-1]
-sorted_mbti = [mbti_cols[i] for i in sorted_indices]
-sorted_values = values[sorted_indices]
-
-# -----------------------------
-# 4. 색상 설정 (1등 빨간색 → 파란색 그라데이션)
-# -----------------------------
-colors = ["red"]  # 1등 빨간색
-
-import numpy as np
-blue_base = np.array([0, 0, 255])
-
-# 2등부터 파란색 → 흰색으로 흐려지는 그라데이션
-for i in range(1, len(sorted_mbti)):
-    ratio = i / len(sorted_mbti)
-    color_rgb = blue_base * (1 - ratio) + np.array([255, 255, 255]) * ratio
-    color_hex = '#%02x%02x%02x' % tuple(color_rgb.astype(int))
-    colors.append(color_hex)
-
-# -----------------------------
-# 5. Plotly 바차트 생성
-# -----------------------------
-fig = go.Figure()
-
-fig.add_trace(go.Bar(
-    x=sorted_mbti,
-    y=sorted_values,
-    marker_color=colors,
-    text=[f"{v:.3f}" for v in sorted_values],
-    textposition="outside"
-))
-
-fig.update_layout(
-    title=f"🇨🇴 {selected_country} MBTI 비율",
-    xaxis_title="MBTI Type",
-    yaxis_title="Value",
-    template="plotly_white",
-    height=600,
-)
-import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-from plotly.colors import n_colors
-
-# ---------------------------
-# 데이터 로드
-# ---------------------------
-@st.cache_data
-def load_data():
-    df = pd.read_csv("countriesMBTI_16types.csv")  
-    return df
+def bar_colors(n):
+    # 1등 빨간색 → 나머지는 파란색에서 하늘색으로 흐려지는 그라데이션
+    top_color = 'red'
+    if n <= 1:
+        return [top_color][:n]
+    gradient_colors = n_colors('rgb(0, 0, 255)', 'rgb(173, 216, 230)', n - 1, colortype='rgb')
+    return [top_color] + gradient_colors
 
-df = load_data()
-countries = df['Country'].unique()
-mbti_cols = [c for c in df.columns if c != "Country"]
+def bar_figure(x, y, title, xaxis_title, yaxis_title):
+    # 값은 float32 typed array 로 보냄 (core/charts.py)
+    fig = go.Figure(data=go.Bar(x=list(x), y=charts.compact(y), marker_color=bar_colors(len(x))))
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title, template="plotly_white")
+    return fig
 
 # ---------------------------
 # 탭 생성
 # ---------------------------
-tab1, tab2 = st.tabs(["국가별 MBTI 비율", "MBTI별 상위 국가"])
+tab1, tab2, tab3 = st.tabs(["국가별 MBTI 비율", "MBTI별 상위 국가", "비슷한 국가"])
 
 # ---------------------------
 # 탭1: 국가 선택 → MBTI 비율
@@ -99,67 +52,97 @@ tab1, tab2 = st.tabs(["국가별 MBTI 비율", "MBTI별 상위 국가"])
 with tab1:
     st.header("🌍 국가별 MBTI 비율")
     selected_country = st.selectbox("국가를 선택하세요", countries)
-    
-    country_data = df[df['Country'] == selected_country][mbti_cols].T
-    country_data.columns = ['Percentage']
-    country_data = country_data.sort_values(by='Percentage', ascending=False)
-    
-    top_color = 'red'
-    gradient_colors = n_colors('blue', 'lightblue', len(country_data)-1, colortype='rgb')
-    colors = [top_color] + gradient_colors
-    
-    fig = go.Figure(
-        data=go.Bar(
-            x=country_data.index,
-            y=country_data['Percentage'],
-            marker_color=colors
-        )
-    )
-    
-    fig.update_layout(
-        title=f"{selected_country} MBTI 비율",
-        xaxis_title="MBTI 유형",
-        yaxis_title="비율 (%)",
-        template="plotly_white"
-    )
-    
-    st.plotly_chart(fig, use_container_width=True)
-    
+
+    # 같은 국가 그래프는 한 번만 만들고 모든 세션이 재사용
+    def build_country():
+        sorted_mbti, sorted_values = mbti.country_profile(selected_country)
+        return bar_figure(sorted_mbti, sorted_values, f"{selected_country} MBTI 비율", "MBTI 유형", "비율 (%)")
+
+    with profiling.stage("figure"):
+        fig = charts.cached_figure("mbti_country", (selected_country,), build_country, depends=["mbti_matrix"])
+
+    with profiling.stage("render"):
+        st.plotly_chart(fig, use_container_width=True)
+
 # ---------------------------
 # 탭2: MBTI 유형 선택 → 상위 국가 (한국 포함)
 # ---------------------------
 with tab2:
     st.header("💡 MBTI별 상위 국가 (한국 포함)")
     selected_mbti = st.selectbox("MBTI 유형을 선택하세요", mbti_cols)
-    
-    # 선택 MBTI 기준 상위 10개 국가
-    top_countries = df[['Country', selected_mbti]].sort_values(by=selected_mbti, ascending=False).head(10)
-    
-    # 한국 포함 확인
-    if 'Korea' not in top_countries['Country'].values:
-        korea_row = df[df['Country'] == 'Korea'][['Country', selected_mbti]]
-        top_countries = pd.concat([top_countries, korea_row], ignore_index=True)
-    
-    # 색상 설정
-    top_color = 'red'
-    gradient_colors = n_colors('blue', 'lightblue', len(top_countries)-1, colortype='rgb')
-    colors = [top_color] + gradient_colors
-    
-    # 막대그래프
-    fig2 = go.Figure(
-        data=go.Bar(
-            x=top_countries['Country'],
-            y=top_countries[selected_mbti],
-            marker_color=colors
+
+    # 선택 MBTI 기준 상위 10개 국가 (한국이 밖이면 맨 뒤에 추가) 막대그래프
+    def build_top():
+        top_countries = mbti.top_countries(selected_mbti, TOP_N, include=KOREA)
+        return bar_figure(top_countries['Country'], top_countries[selected_mbti],
+                          f"{selected_mbti} 비율 상위 국가", "국가", "비율 (%)")
+
+    with profiling.stage("figure"):
+        fig2 = charts.cached_figure("mbti_top", (selected_mbti,), build_top, depends=["mbti_matrix"])
+
+    with profiling.stage("render"):
+        st.plotly_chart(fig2, use_container_width=True)
+    if KOREA in mbti.index:
+        st.caption(f"{KOREA}: {len(countries)}개국 중 {mbti.rank_of(KOREA, selected_mbti)}위")
+
+# ---------------------------
+# 탭3: 국가 선택 → MBTI 분포가 비슷한 국가 / 군집
+# ---------------------------
+with tab3:
+    st.header("🔍 MBTI 분포가 비슷한 국가")
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        base_country = st.selectbox("기준 국가", countries, key="similar_country")
+    with col2:
+        metric_label = st.radio("거리", list(METRICS), horizontal=True)
+    with col3:
+        k = st.slider("개수", 3, MAX_NEIGHBORS, 10)
+    metric = METRICS[metric_label]
+
+    with profiling.stage("filter"):
+        neighbor_idx, neighbor_dist = queries.mbti_neighbors(metric)
+        row = mbti.index[base_country]
+
+    # 미리 계산한 이웃 표에서 한 행만 꺼냄
+    def build_similar():
+        similar = pd.DataFrame({
+            "Country": [countries[i] for i in neighbor_idx[row, :k]],
+            "거리": neighbor_dist[row, :k].round(4),
+        })
+        return bar_figure(similar["Country"], similar["거리"],
+                          f"{base_country} 와(과) 가장 비슷한 국가 ({metric_label})", "국가", "거리 (작을수록 비슷)")
+
+    with profiling.stage("figure"):
+        fig3 = charts.cached_figure(
+            "mbti_similar", (base_country, metric, k), build_similar, depends=["mbti_matrix", f"mbti_neighbors/{metric}"]
         )
-    )
-    
-    fig2.update_layout(
-        title=f"{selected_mbti} 비율 상위 국가",
-        xaxis_title="국가",
-        yaxis_title="비율 (%)",
-        template="plotly_white"
-    )
-    
-    st.plotly_chart(fig2, use_container_width=True)
 
+    with profiling.stage("render"):
+        st.plotly_chart(fig3, use_container_width=True)
+
+    if st.checkbox("계층적 군집 보기"):
+        if len(countries) > MAX_CLUSTER_ROWS:
+            st.info(f"행이 {MAX_CLUSTER_ROWS}개를 넘으면 군집 보기는 지원하지 않습니다.")
+        else:
+            n_clusters = st.slider("군집 수", 2, 12, 5)
+            dist, merges = queries.mbti_clusters(metric)
+            labels, order = cut_clusters(merges, len(countries), n_clusters)
+            same = [countries[i] for i in order if labels[i] == labels[row]]
+            st.write(f"**{base_country} 와(과) 같은 군집 ({len(same)}개국)**")
+            st.write(", ".join(same))
+
+            # 거리 행렬은 float32 typed array 로 보냄 (목록으로 보낼 때의 약 1/3)
+            def build_heatmap():
+                ordered = [countries[i] for i in order]
+                fig4 = go.Figure(
+                    data=go.Heatmap(z=charts.compact(dist[order][:, order]), x=ordered, y=ordered, colorscale="Blues_r")
+                )
+                fig4.update_layout(title="국가 간 거리 (군집 순서)", height=700, template="plotly_white")
+                return fig4
+
+            fig4 = charts.cached_figure(
+                "mbti_heatmap", (metric, n_clusters), build_heatmap, depends=["mbti_matrix", f"mbti_clusters/{metric}"]
+            )
+            st.plotly_chart(fig4, use_container_width=True)
+
+profiling.finish()
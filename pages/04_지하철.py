@@ -1,57 +1,191 @@
+import functools
+
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
+import altair as alt
 
-st.set_page_config(page_title="Top 10 Subway Stations", layout="wide")
+from core import charts, prefetch, profiling, queries, warmup
 
-@st.cache_data
-def load_data():
-    return import os
-base_path = os.path.dirname(__file__)
-file_path = os.path.join(base_path, "..", "CARD_SUBWAY_MONTH_202510.csv")
-return pd.read_csv(file_path, encoding='cp949') # 경로 수정 필요 시 변경("CARD_SUBWAY_MONTH_202510.csv")
+st.set_page_config(page_title="Top 10 Subway Stations", layout="wide")
+profiling.begin("04_지하철")
+warmup.start()
 
-df = load_data()
+TOP_K = queries.TOP_K
 
-# Preprocess
-# Combined passenger count
-df["총승객수"] = df["승차총승객수"] + df["하차총승객수"]
+with profiling.stage("load"):
+    # 새 월별 파일(CARD_SUBWAY_MONTH_*.csv)만 저장소에 추가. 바뀐 게 없으면 파일 정보만 확인
+    # (아래 데이터셋은 모든 세션이 한 벌을 공유하고 디스크 캐시에도 남음: core/queries.py)
+    sources = queries.subway_sources()
+    unique_dates, unique_lines = queries.subway_index(sources)
 
 # Sidebar selection
 st.sidebar.header("🔎 조건 선택")
-unique_dates = sorted(df["사용일자"].unique())
-unique_lines = sorted(df["노선명"].unique())
 
 selected_date = st.sidebar.selectbox("📅 날짜 선택", unique_dates)
 selected_line = st.sidebar.selectbox("🚇 호선 선택", unique_lines)
 
-# Filter data
-filtered = df[(df["사용일자"] == selected_date) & (df["노선명"] == selected_line)]
-
-# Top 10
-top10 = filtered.sort_values("총승객수", ascending=False).head(10)
-
-# Color gradient
-red = "rgba(255,0,0,0.9)"
-fades = [f"rgba(0,0,255,{0.9 - i*0.07})" for i in range(10)]
-colors = [red] + fades[1:]
-
-# Plotly bar chart
-fig = go.Figure()
-fig.add_trace(go.Bar(
-    x=top10["역명"].astype(str),
-    y=top10["총승객수"],
-    marker_color=colors,
-))
-
-fig.update_layout(
-    title=f"{selected_date} / {selected_line} 상위 10개 역 승객수",
-    xaxis_title="역명",
-    yaxis_title="총승객수",
-    template="plotly_white",
+st.sidebar.header("🚉 역 검색")
+station_query = st.sidebar.text_input("역 이름 (초성도 돼요: ㄱㄴ → 강남)")
+
+with profiling.stage("preprocess"):
+    # 역 × 날짜 누적합 배열 / 역 이름 검색 인덱스
+    prefix = queries.subway_prefix(sources)
+    station_index = queries.station_index(sources)
+
+with profiling.stage("station_search"):
+    # 앞글자 / 초성 / 오타 허용 검색 (미리 만든 트라이에서, 전체 행을 훑지 않음: core/station_search.py)
+    station_matches = station_index.search(station_query) if station_query.strip() else []
+
+selected_station = None
+if station_matches:
+    selected_station = st.sidebar.selectbox("역 선택", station_matches)
+elif station_query.strip():
+    st.sidebar.caption("맞는 역이 없어요 😢")
+
+with profiling.stage("filter"):
+    # Top 10 (저장소에서 고른 날짜/노선의 row group 만 읽음: core/subway_store.py)
+    top10 = queries.subway_top(sources, selected_date, selected_line, TOP_K)
+
+# (날짜, 노선)마다 한 번만 그리고 모든 세션이 재사용 (승객수는 작은 정수형 typed array: core/charts.py)
+def build_top10(date, line):
+    top = queries.subway_top(sources, date, line, TOP_K)
+
+    # Color gradient
+    red = "rgba(255,0,0,0.9)"
+    fades = [f"rgba(0,0,255,{0.9 - i*0.07})" for i in range(TOP_K)]
+    colors = [red] + fades[1:]
+
+    # Plotly bar chart
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=top["역명"].astype(str).tolist(),
+        y=charts.compact(top["총승객수"]),
+        marker_color=colors,
+    ))
+
+    fig.update_layout(
+        title=f"{date} / {line} 상위 {TOP_K}개 역 승객수",
+        xaxis_title="역명",
+        yaxis_title="총승객수",
+        template="plotly_white",
+    )
+    return fig
+
+with profiling.stage("figure"):
+    fig = charts.cached_figure(
+        "subway_top10", (selected_date, selected_line),
+        lambda: build_top10(selected_date, selected_line), depends=["subway_partitions"],
+    )
+
+with profiling.stage("render"):
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.write("### 📌 데이터 미리보기")
+    st.dataframe(top10)
+
+# ------------------------------------
+# 기간별 분석 (누적합 배열에서 바로 계산)
+# ------------------------------------
+st.write("### 📈 기간별 분석")
+start_day, end_day = st.slider(
+    "기간 선택",
+    min_value=prefix.first_day,
+    max_value=prefix.last_day,
+    value=(prefix.first_day, prefix.last_day),
+    format="YYYY-MM-DD",
 )
 
-st.plotly_chart(fig, use_container_width=True)
+with profiling.stage("range_filter"):
+    line_rows = (prefix.stations["노선명"] == selected_line).to_numpy()
+    station_stats = prefix.stations[line_rows].assign(
+        기간합계=prefix.range_total(start_day, end_day)[line_rows],
+        최근7일평균=prefix.rolling_mean(end_day, 7)[line_rows].round(1),
+        최근28일평균=prefix.rolling_mean(end_day, 28)[line_rows].round(1),
+        전주대비=prefix.week_over_week(end_day)[line_rows],
+    ).sort_values("기간합계", ascending=False)
+
+    line_stats = pd.DataFrame({
+        "노선명": prefix.lines,
+        "기간합계": prefix.range_total(start_day, end_day, by_line=True),
+        "최근7일평균": prefix.rolling_mean(end_day, 7, by_line=True).round(1),
+        "전주대비": prefix.week_over_week(end_day, by_line=True),
+    }).sort_values("기간합계", ascending=False)
+
+    line_row = prefix.lines.index(selected_line)
+    rolling = pd.DataFrame({
+        "7일 이동평균": prefix.rolling_series(line_row, 7, by_line=True),
+        "28일 이동평균": prefix.rolling_series(line_row, 28, by_line=True),
+    })
+
+with profiling.stage("range_render"):
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write(f"**{selected_line} 역별 ({start_day} ~ {end_day})**")
+        st.dataframe(station_stats.reset_index(drop=True))
+    with col2:
+        st.write("**노선별**")
+        st.dataframe(line_stats.reset_index(drop=True))
+
+    st.write(f"**{selected_line} 일평균 승객수 추이**")
+    # 기간이 길면 모양을 살려 MAX_LINE_POINTS 개 안팎으로 줄여 보냄 (LTTB)
+    trend = charts.downsample(charts.compact_frame(rolling.loc[str(start_day):str(end_day)]))
+    trend = trend.rename_axis("날짜").reset_index().melt("날짜", var_name="구분", value_name="승객수")
+    # st.line_chart 는 rerun 마다 Altair 그래프를 새로 만들므로 모양(spec)은 한 번만 만들어 재사용
+    spec = charts.cached_figure("subway_trend", (), lambda: charts.vega_spec(
+        alt.Chart(trend.head(1)).mark_line().encode(
+            x=alt.X("날짜:T", title=None),
+            y=alt.Y("승객수:Q", title=None),
+            color=alt.Color("구분:N", title=None),
+            tooltip=["날짜:T", "구분:N", alt.Tooltip("승객수:Q", format=",.1f")],
+        )
+    ))
+    st.vega_lite_chart(trend, spec, use_container_width=True)
+
+# ------------------------------------
+# 역 검색 결과 (역 이름 → 누적합 배열 행: 모든 노선 / 선택한 기간)
+# ------------------------------------
+if selected_station is not None:
+    with profiling.stage("station"):
+        rows = station_index.rows(selected_station)
+        station_lines = prefix.stations["노선명"].to_numpy()[rows].tolist()
+        station_by_line = pd.DataFrame({
+            "노선명": station_lines,
+            "기간합계": prefix.range_total(start_day, end_day)[rows],
+            "최근7일평균": prefix.rolling_mean(end_day, 7)[rows].round(1),
+            "전주대비": prefix.week_over_week(end_day)[rows],
+        }).sort_values("기간합계", ascending=False)
+
+        station_daily = prefix.daily(rows, start_day, end_day)
+        station_daily.columns = station_lines
+        station_daily = charts.downsample(charts.compact_frame(station_daily))
+        station_daily = station_daily.rename_axis("날짜").reset_index().melt(
+            "날짜", var_name="노선명", value_name="승객수"
+        )
+
+    with profiling.stage("station_render"):
+        st.write(f"### 🚉 {selected_station} ({start_day} ~ {end_day})")
+        col1, col2 = st.columns([1, 2])
+        with col1:
+            st.dataframe(station_by_line.reset_index(drop=True))
+        with col2:
+            station_spec = charts.cached_figure("station_daily", (), lambda: charts.vega_spec(
+                alt.Chart(station_daily.head(1)).mark_line().encode(
+                    x=alt.X("날짜:T", title=None),
+                    y=alt.Y("승객수:Q", title="일 승객수"),
+                    color=alt.Color("노선명:N", title=None),
+                    tooltip=["날짜:T", "노선명:N", alt.Tooltip("승객수:Q", format=",d")],
+                )
+            ))
+            st.vega_lite_chart(station_daily, station_spec, use_container_width=True)
+
+with profiling.stage("prefetch"):
+    # 다음/이전 날짜, 옆 노선의 Top 10 그래프를 백그라운드에서 미리 (다음 클릭은 캐시 적중: core/prefetch.py)
+    candidates = [(d, selected_line) for d in prefetch.neighbors(unique_dates, selected_date)]
+    candidates += [(selected_date, line) for line in prefetch.neighbors(unique_lines, selected_line)]
+    prefetch.schedule([
+        charts.figure_job("subway_top10", key, functools.partial(build_top10, *key), depends=["subway_partitions"])
+        for key in candidates
+    ])
 
-st.write("### 📌 데이터 미리보기")
-st.dataframe(top10)
+profiling.finish()
@@ -0,0 +1,86 @@
+import streamlit as st
+import altair as alt
+
+from core import charts, profiling, queries, warmup
+from core.subway_anomaly import RECORD_Z, WEEKS
+
+st.set_page_config(page_title="지하철 이상 탐지", layout="wide")
+profiling.begin("05_지하철이상탐지")
+warmup.start()
+
+st.title("🚨 지하철 승객수 이상 탐지")
+st.caption(
+    f"역마다 같은 요일 최근 {WEEKS}주의 중앙값과 MAD 로 robust z 를 매깁니다. "
+    "새 달 파일이 들어오면 그 날짜만 이어서 계산합니다."
+)
+
+with profiling.stage("load"):
+    # 역/요일별 기준 버퍼를 새 원본 파일분만 갱신 (모든 세션이 한 벌 공유: core/subway_anomaly.py)
+    sources = queries.subway_sources()
+    report = queries.subway_anomalies(sources)
+
+if not report.days:
+    st.warning("지하철 데이터가 없습니다.")
+    st.stop()
+
+# 기준이 쌓여 점수가 있는 날만 (최근 날짜부터)
+scored_days = report.scored_days[::-1] or report.days[::-1]
+lines = sorted(report.trends["노선명"].unique())
+
+st.sidebar.header("🔎 조건 선택")
+selected_day = st.sidebar.selectbox("📅 날짜 선택", scored_days)
+min_z = st.sidebar.slider("|z| 기준", min_value=RECORD_Z, max_value=10.0, value=3.5, step=0.5)
+kind = st.sidebar.radio("구분", ["전체", "승차", "하차"], horizontal=True)
+selected_lines = st.sidebar.multiselect("노선", lines)
+
+with profiling.stage("filter"):
+    flagged = report.on(selected_day, min_z)
+    if kind != "전체":
+        flagged = flagged[flagged["구분"] == kind]
+    if selected_lines:
+        flagged = flagged[flagged["노선명"].isin(selected_lines)]
+    # 기준(같은 요일 중앙값)이 0 인 역(주말 휴업 등)은 변화율을 비워 둠
+    base = flagged["기준"].where(flagged["기준"] > 0)
+    flagged = flagged.drop(columns="날짜").assign(변화율=((flagged["승객수"] / base - 1) * 100).round(1))
+
+with profiling.stage("render"):
+    st.write(f"### 📌 {selected_day} 이상 역")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("이상 역", f"{flagged[['노선명', '역명']].drop_duplicates().shape[0]}곳")
+    col2.metric("평소보다 많음", f"{int((flagged['z'] > 0).sum())}건")
+    col3.metric("평소보다 적음", f"{int((flagged['z'] < 0).sum())}건")
+    st.dataframe(flagged, hide_index=True)
+
+# ------------------------------------
+# 노선별 추세 (요일 효과를 뺀 비율의 빠른/느린 EWMA)
+# ------------------------------------
+st.write("### 📈 노선별 추세")
+trend_line = st.selectbox("노선 선택", lines)
+
+with profiling.stage("trend"):
+    trend = report.trends[report.trends["노선명"] == trend_line].set_index("날짜")[["요일비", "빠른추세", "느린추세"]]
+    trend = charts.downsample(charts.compact_frame(trend))
+    trend = trend.reset_index().melt("날짜", var_name="구분", value_name="비율")
+    changes = report.changes
+    if selected_lines:
+        changes = changes[changes["노선명"].isin(selected_lines)]
+    changes = changes.sort_values("날짜", ascending=False, kind="stable").head(20)
+
+with profiling.stage("trend_render"):
+    col_a, col_b = st.columns([2, 1])
+    with col_a:
+        st.caption("1 = 같은 요일 평소 수준. 빠른추세(7일)가 느린추세(28일)를 넘어서면 상승, 밑돌면 하락.")
+        spec = charts.cached_figure("anomaly_trend", (), lambda: charts.vega_spec(
+            alt.Chart(trend.head(1)).mark_line().encode(
+                x=alt.X("날짜:T", title=None),
+                y=alt.Y("비율:Q", title=None, scale=alt.Scale(zero=False)),
+                color=alt.Color("구분:N", title=None),
+                tooltip=["날짜:T", "구분:N", alt.Tooltip("비율:Q", format=".3f")],
+            )
+        ))
+        st.vega_lite_chart(trend, spec, use_container_width=True)
+    with col_b:
+        st.write("**최근 추세 전환**")
+        st.dataframe(changes.assign(날짜=changes["날짜"].dt.date), hide_index=True)
+
+profiling.finish()
@@ -1,41 +1,39 @@
 # pages/price_by_region.py
+import functools
+
 import streamlit as st
+import numpy as np
 import pandas as pd
 import altair as alt
 
+from core import charts, prefetch, profiling, queries, warmup
+
 st.set_page_config(page_title="지역별 가격 비교", layout="wide")
+profiling.begin("07_수행평가")
+warmup.start()
+
+PP_CSV = queries.PP_CSV
+# 처음 보여줄 장바구니 (데이터에 있는 것만)
+DEFAULT_BASKET = {"자장면": 2, "김치찌개백반": 2, "삼겹살": 1, "목욕료": 1, "미용료": 1}
 
 st.title("상품별 지역 가격 비교")
 st.markdown("`pp.csv` (루트)에 있는 데이터를 사용합니다. 상품을 선택하면 동네별 가격을 그래프로 보여주고, 가장 싼/비싼 동네를 표시합니다.")
 
-@st.cache_data
-def load_data(path="pp.csv"):
-    # 인코딩 문제를 대비해 여러 인코딩 시도
-    encodings = ["cp949", "euc-kr", "utf-8-sig", "utf-8", "latin1"]
-    for e in encodings:
-        try:
-            df = pd.read_csv(path, encoding=e)
-            return df, e
-        except Exception:
-            continue
-    raise ValueError(f"파일을 읽을 수 없습니다. 시도한 인코딩: {encodings}")
-
-df, used_encoding = load_data("pp.csv")
+with profiling.stage("load"):
+    # 인코딩 자동 판별 + 가격 float32 변환을 한 번만 하고 모든 세션이 공유 (core/queries.py)
+    df, used_encoding = queries.price_frame(PP_CSV)
 st.caption(f"데이터 로드: {used_encoding} 인코딩 사용")
 
-# 기본 컬럼 이름 추출
-all_cols = list(df.columns)
-# 보통 앞쪽에 '품목', '조사기준', '구평균가격' 같은 컬럼이 있으므로 제외하고 동네 컬럼만 선택
-non_region_cols = {"품목", "조사기준", "구평균가격"}
-region_cols = [c for c in all_cols if c not in non_region_cols]
-
 if "품목" not in df.columns:
     st.error("CSV에 '품목' 컬럼이 없습니다. 컬럼명을 확인해주세요.")
     st.stop()
 
+with profiling.stage("preprocess"):
+    # 표 전체를 한 번만 숫자 행렬로 바꾸고 품목별 평균/최저/최고/순위를 미리 계산
+    table = queries.price_table(PP_CSV)
+
 # 상품 리스트
-products = df["품목"].astype(str).unique().tolist()
-products.sort()
+products = table.products
 
 col1, col2 = st.columns([2, 1])
 
@@ -45,88 +43,166 @@ with col1:
 with col2:
     st.write("데이터 요약")
     st.write(f"전체 행: {len(df)}")
-    st.write(f"지역(동네) 수: {len(region_cols)}")
-
-# 선택된 상품의 행(들) 필터
-sel_df = df[df["품목"].astype(str) == str(selected)]
-
-if sel_df.empty:
-    st.warning("선택한 상품의 데이터가 없습니다.")
-    st.stop()
-
-# 여러 행이 있을 수 있으므로(조사기준 등), 평균을 내거나 첫 행 사용
-# 우선 각 동네별 숫자값으로 변환(문자열에 콤마가 있는 경우 처리)
-def to_numeric_series(s):
-    return pd.to_numeric(s.astype(str).str.replace(",", "").str.strip(), errors="coerce")
-
-# 합치기: 동네별 평균(숫자)
-region_values = {}
-for c in region_cols:
-    vals = to_numeric_series(sel_df[c])
-    # 평균을 사용 (가능하면 single value)
-    region_values[c] = vals.mean(skipna=True)
-
-region_ser = pd.Series(region_values).dropna()
-if region_ser.empty:
-    st.error("동네별 숫자 데이터가 없습니다. CSV 값을 확인하세요.")
-    st.stop()
+    st.write(f"지역(동네) 수: {len(table.regions)}")
+
+with profiling.stage("filter"):
+    # 선택된 상품의 행(들)
+    sel_df = df.iloc[table.rows[selected]]
+
+    if sel_df.empty:
+        st.warning("선택한 상품의 데이터가 없습니다.")
+        st.stop()
+
+    # 동네별 가격: 여러 행이 있으면(조사기준 등) 동네별 평균 — 미리 계산된 행렬에서 한 행 조회
+    region_ser = table.region_prices(selected)
+    if region_ser.empty:
+        st.error("동네별 숫자 데이터가 없습니다. CSV 값을 확인하세요.")
+        st.stop()
+
+    # 최저/최고 동네
+    min_region, min_price, max_region, max_price, _ = table.summary(selected)
+
+# 그래프 모양(Vega-Lite spec)은 강조할 동네마다 한 번만 만들고, 값은 Arrow 로 따로 보냄 (core/charts.py)
+def build_spec(min_region, max_region):
+    # 그래프 준비 (Altair)
+    sample = pd.DataFrame({"dong": [""], "price": [0.0]})
+    base = alt.Chart(sample).encode(
+        x=alt.X("dong:N", sort="-y", title="동네"),
+        y=alt.Y("price:Q", title="가격"),
+        tooltip=["dong", alt.Tooltip("price", format=",.0f")]
+    )
 
-# 최저/최고 동네
-min_region = region_ser.idxmin()
-min_price = region_ser.min()
-max_region = region_ser.idxmax()
-max_price = region_ser.max()
-
-# 그래프 준비 (Altair)
-chart_df = region_ser.reset_index()
-chart_df.columns = ["dong", "price"]
-chart_df = chart_df.sort_values("price", ascending=False)
-
-highlight = alt.selection_single(fields=["dong"], bind="legend", empty="none")
-base = alt.Chart(chart_df).encode(
-    x=alt.X("dong:N", sort="-y", title="동네"),
-    y=alt.Y("price:Q", title="가격"),
-    tooltip=["dong", alt.Tooltip("price", format=",.0f")]
-)
+    bars = base.mark_bar().encode(
+        color=alt.condition(
+            (alt.datum.dong == min_region) | (alt.datum.dong == max_region),
+            alt.value("#d62728"),  # 강조 색 (altair 기본 색상 사용하지 못하면 색 지정됨)
+            alt.value("#1f77b4")
+        )
+    )
 
-bars = base.mark_bar().encode(
-    color=alt.condition(
-        (alt.datum.dong == min_region) | (alt.datum.dong == max_region),
-        alt.value("#d62728"),  # 강조 색 (altair 기본 색상 사용하지 못하면 색 지정됨)
-        alt.value("#1f77b4")
+    text = base.mark_text(
+        dy=-8,
+        size=12
+    ).encode(
+        text=alt.Text("price:Q", format=",.0f")
     )
-)
+    return charts.vega_spec((bars + text).properties(height=450, width=900))
+
+with profiling.stage("figure"):
+    chart_df = region_ser.reset_index()
+    chart_df.columns = ["dong", "price"]
+    # 동네가 많으면 비싼 MAX_BARS 곳 + 가장 싼 동네만 막대로, 나머지는 "기타 (N)" 평균 한 막대로
+    bar_df = charts.top_n_with_others(region_ser, charts.MAX_BARS, agg="mean", keep=[min_region]).reset_index()
+    bar_df.columns = ["dong", "price"]
+    spec = charts.cached_figure("price_bars", (min_region, max_region), lambda: build_spec(min_region, max_region))
+
+with profiling.stage("render"):
+    st.subheader(f"{selected} — 지역별 가격 (평균 기준)")
+    st.vega_lite_chart(bar_df, spec, use_container_width=True)
+
+    # 정보 박스: 최저/최고 동네
+    st.markdown("---")
+    col_a, col_b = st.columns(2)
+    with col_a:
+        st.metric(label="가장 싼 동네", value=f"{min_region}", delta=f"{int(min_price):,} (원)")
+        st.caption("같은 상품의 해당 동네 가격의 평균값을 사용합니다.")
+    with col_b:
+        st.metric(label="가장 비싼 동네", value=f"{max_region}", delta=f"{int(max_price):,} (원)")
+        st.caption("같은 상품의 해당 동네 가격의 평균값을 사용합니다.")
+
+    # 상/하위 표
+    st.markdown("### 상/하위 지역 (가격 기준)")
+    top_n = 5
+    cols = st.columns(2)
+    with cols[0]:
+        st.write(f"가장 저렴한 {top_n} 동네")
+        st.table(chart_df.sort_values("price").head(top_n).assign(price=lambda d: d["price"].map(lambda x: f"{int(x):,}")))
+    with cols[1]:
+        st.write(f"가장 비싼 {top_n} 동네")
+        st.table(chart_df.head(top_n).assign(price=lambda d: d["price"].map(lambda x: f"{int(x):,}")))
+
+    st.markdown("**원본 데이터 (선택된 상품의 행)**")
+    st.dataframe(sel_df.reset_index(drop=True))
+
+# ------------------------------------
+# 동네별 장바구니 물가 (모든 품목, 빈 칸은 구평균가격으로 채운 행렬에서)
+# ------------------------------------
+st.markdown("---")
+st.markdown("### 🧺 동네별 장바구니 물가")
+st.caption("빈 칸은 구평균가격(없으면 다른 동네 평균)으로 채워 계산합니다.")
 
-text = base.mark_text(
-    dy=-8,
-    size=12
-).encode(
-    text=alt.Text("price:Q", format=",.0f")
+basket_items = st.multiselect(
+    "장바구니 품목",
+    products,
+    default=[p for p in DEFAULT_BASKET if p in table.index] or products[:5],
+)
+basket = st.data_editor(
+    pd.DataFrame({"품목": basket_items, "수량": [float(DEFAULT_BASKET.get(p, 1)) for p in basket_items]}),
+    disabled=["품목"],
+    hide_index=True,
 )
 
-st.subheader(f"{selected} — 지역별 가격 (평균 기준)")
-st.altair_chart((bars + text).properties(height=450, width=900), use_container_width=True)
-
-# 정보 박스: 최저/최고 동네
-st.markdown("---")
-col_a, col_b = st.columns(2)
-with col_a:
-    st.metric(label="가장 싼 동네", value=f"{min_region}", delta=f"{int(min_price):,} (원)")
-    st.caption("같은 상품의 해당 동네 가격의 평균값을 사용합니다.")
-with col_b:
-    st.metric(label="가장 비싼 동네", value=f"{max_region}", delta=f"{int(max_price):,} (원)")
-    st.caption("같은 상품의 해당 동네 가격의 평균값을 사용합니다.")
-
-# 상/하위 표
-st.markdown("### 상/하위 지역 (가격 기준)")
-top_n = 5
-cols = st.columns(2)
-with cols[0]:
-    st.write(f"가장 저렴한 {top_n} 동네")
-    st.table(chart_df.sort_values("price").head(top_n).assign(price=lambda d: d["price"].map(lambda x: f"{int(x):,}")))
-with cols[1]:
-    st.write(f"가장 비싼 {top_n} 동네")
-    st.table(chart_df.head(top_n).assign(price=lambda d: d["price"].map(lambda x: f"{int(x):,}")))
-
-st.markdown("**원본 데이터 (선택된 상품의 행)**")
-st.dataframe(sel_df.reset_index(drop=True))
+if basket.empty:
+    st.info("품목을 하나 이상 골라 주세요.")
+else:
+    with profiling.stage("basket"):
+        # 수량 벡터 한 개 × 미리 채워 둔 (품목 × 동네) 행렬 — 품목이 수백 개여도 곱셈 한 번
+        item_rows = np.array([table.index[p] for p in basket["품목"]])
+        weights = np.zeros(len(products), dtype=np.float32)
+        np.add.at(weights, item_rows, basket["수량"].fillna(0).to_numpy(dtype=np.float32))
+        cost, imputed_share = table.basket_cost(weights)
+
+        basket_rank = pd.DataFrame({
+            "동네": table.regions,
+            "장바구니 비용": cost.round(),
+            "평균 대비(%)": ((cost / cost.mean() - 1) * 100).round(1) if cost.mean() else 0.0,
+            "채운 값 비율(%)": (imputed_share * 100).round(1),
+        }).sort_values("장바구니 비용", kind="stable").reset_index(drop=True)
+        basket_rank.insert(0, "순위", np.arange(1, len(basket_rank) + 1))
+
+        # 히트맵: 품목 × 동네 가격 지수 (품목의 동네 평균 = 100), 비용이 큰 품목 MAX_BARS 개까지
+        item_rows = np.unique(item_rows)
+        spend = weights[item_rows] * table.filled[item_rows].mean(axis=1)
+        item_rows = item_rows[np.argsort(-spend, kind="stable")[:charts.MAX_BARS]]
+        filled = table.filled[item_rows]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            index_values = filled / filled.mean(axis=1, keepdims=True) * 100
+        region_rank = dict(zip(basket_rank["동네"], basket_rank["순위"]))
+        heat = pd.DataFrame({
+            "품목": np.repeat([products[i] for i in item_rows], len(table.regions)),
+            "동네": np.tile(table.regions, len(item_rows)),
+            "순위": np.tile([region_rank[r] for r in table.regions], len(item_rows)),
+            "가격": filled.ravel(),
+            "지수": charts.compact(np.nan_to_num(index_values).ravel().round(1)),
+            "값": np.where(table.missing[item_rows].ravel(), "채움", "조사"),
+        })
+
+    with profiling.stage("basket_render"):
+        col_a, col_b = st.columns([1, 2])
+        with col_a:
+            st.dataframe(basket_rank, hide_index=True)
+        with col_b:
+            # 동네 순서는 데이터의 순위 컬럼으로 정하므로 모양(spec)은 한 번만 만들어 재사용
+            heat_spec = charts.cached_figure("basket_heatmap", (), lambda: charts.vega_spec(
+                alt.Chart(heat.head(1)).mark_rect().encode(
+                    x=alt.X("동네:N", sort=alt.EncodingSortField("순위"), title="동네 (장바구니 비용 낮은 순)"),
+                    y=alt.Y("품목:N", title=None),
+                    color=alt.Color("지수:Q", scale=alt.Scale(scheme="redblue", reverse=True, domainMid=100),
+                                    title="가격 지수"),
+                    tooltip=["품목", "동네", alt.Tooltip("가격:Q", format=",.0f"), "지수:Q", "값:N"],
+                ).properties(height=alt.Step(22))
+            ))
+            st.vega_lite_chart(heat, heat_spec, use_container_width=True)
+
+with profiling.stage("prefetch"):
+    # 다음/이전 상품의 막대 그래프 모양을 백그라운드에서 미리 (강조할 동네 조합이 같으면 이미 캐시에 있음)
+    keys = {}
+    for product in prefetch.neighbors(products, selected, 2):
+        lo, _, hi, _, _ = table.summary(product)
+        if lo is not None:
+            keys[(lo, hi)] = None
+    prefetch.schedule([
+        charts.figure_job("price_bars", key, functools.partial(build_spec, *key)) for key in keys
+    ])
+
+profiling.finish()